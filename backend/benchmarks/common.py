@@ -0,0 +1,166 @@
+"""
+Shared helpers for the backend benchmarks: fixed inputs sampled from the bundled datasets,
+latency summaries with percentiles and a JSON result format that can be compared across
+commits (see compare.py).
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS_DIR = os.path.join(BACKEND_DIR, 'notebooks', 'datasets')
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Stroke dataset vocabulary -> the values the API (and the frontend) sends
+WORK_TYPES = {'Private': 'privatejob', 'Self-employed': 'selfemp', 'Govt_job': 'govtemp',
+              'children': 'age', 'Never_worked': 'nojob'}
+SMOKING = {'formerly smoked': 'formerly_smoked', 'never smoked': 'non_smoker',
+           'smokes': 'smoker', 'Unknown': 'non_smoker'}
+
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples_ms, percentiles=PERCENTILES):
+    """count / mean / min / max / percentiles (all in ms) of a list of latencies."""
+    values = sorted(samples_ms)
+    if not values:
+        return {'count': 0}
+    summary = {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 4),
+        'min_ms': round(values[0], 4),
+        'max_ms': round(values[-1], 4),
+    }
+    for p in percentiles:
+        summary[f'p{p}_ms'] = round(percentile(values, p), 4)
+    return summary
+
+
+def time_calls(fn, inputs, iterations, warmup=20):
+    """Calls fn(x) cycling through `inputs`; returns per-call latencies in ms."""
+    for i in range(min(warmup, iterations)):
+        fn(inputs[i % len(inputs)])
+    samples = []
+    for i in range(iterations):
+        x = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(x)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_metadata(**extra):
+    meta = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_results(results, out_path=None, prefix='bench'):
+    """Writes the result dict as JSON; defaults to benchmarks/results/<prefix>-<commit>-<time>.json."""
+    if out_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = results.get('meta', {}).get('commit') or 'nocommit'
+        out_path = os.path.join(RESULTS_DIR, f"{prefix}-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return out_path
+
+
+# -- Fixed inputs --
+
+def _num(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if value != value else value  # NaN -> default
+
+
+def full_checkup_payloads(n=200, seed=42):
+    """
+    `n` /full-checkup payloads built from real dataset rows (same seed -> same payloads).
+
+    Demographics, glucose and BMI come from a stroke-dataset row, the cardiac fields from a
+    heart-dataset row and blood pressure from a diabetes-dataset row.
+    """
+    full_dir = os.path.join(DATASETS_DIR, 'full_checkup')
+    stroke = pd.read_csv(os.path.join(full_dir, 'stroke-dataset.csv'))
+    heart = pd.read_csv(os.path.join(full_dir, 'HeartD-dataset.csv'))
+    diabetes = pd.read_csv(os.path.join(full_dir, 'diabetes-dataset.csv'))
+    stroke = stroke[stroke['gender'].isin(['Male', 'Female'])]
+
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        s = stroke.iloc[rng.randrange(len(stroke))]
+        h = heart.iloc[rng.randrange(len(heart))]
+        d = diabetes.iloc[rng.randrange(len(diabetes))]
+        payloads.append({
+            'age': _num(s['age'], 50.0),
+            'sex': 1 if s['gender'] == 'Male' else 0,
+            'bmi': _num(s['bmi'], 28.0),
+            'glucose': _num(s['avg_glucose_level'], 100.0),
+            'bloodpressure': _num(d['BloodPressure'], 80.0),
+            'hypertension': 'hypten' if s['hypertension'] == 1 else 'nohypten',
+            'heartdisease': 'heartdis' if s['heart_disease'] == 1 else 'noheartdis',
+            'maritalstatus': 'yes' if s['ever_married'] == 'Yes' else 'no',
+            'worktype': WORK_TYPES[s['work_type']],
+            'residence': s['Residence_type'].lower(),
+            'smoke': SMOKING[s['smoking_status']],
+            'cp': int(h['cp']),
+            'chol': _num(h['chol'], 200.0),
+            'fbs': int(h['fbs']),
+            'restecg': int(h['restecg']),
+            'thalach': _num(h['thalach'], 150.0),
+            'exang': int(h['exang']),
+            'oldpeak': _num(h['oldpeak'], 0.0),
+            'slope': int(h['slope']),
+            'ca': int(h['ca']),
+            'thal': int(h['thal']),
+        })
+    return payloads
+
+
+def quick_checkup_payloads(n=200, seed=42, max_symptoms=4):
+    """`n` /quick-checkup payloads with the first symptoms of random symptom-disease rows."""
+    df = pd.read_csv(os.path.join(DATASETS_DIR, 'quick_checkup', 'symptom-disease.csv'))
+    symptom_cols = [c for c in df.columns if c.startswith('Symptom_')]
+
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        row = df.iloc[rng.randrange(len(df))]
+        symptoms = [str(row[c]).strip() for c in symptom_cols if isinstance(row[c], str) and row[c].strip()]
+        payloads.append({f'Symptom_{i + 1}': s for i, s in enumerate(symptoms[:max_symptoms])})
+    return payloads
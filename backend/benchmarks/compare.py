@@ -0,0 +1,51 @@
+"""
+Compares two benchmark result files written by run_benchmarks.py.
+
+    python benchmarks/compare.py before.json after.json [--metric p50_ms]
+
+Prints every latency summary present in both files with the relative change; negative is
+faster. Batch results are compared on rows_per_sec (positive is faster).
+"""
+import argparse
+import json
+import sys
+
+
+def _rows(results, metric):
+    for group, entries in results.items():
+        if group == 'meta' or not isinstance(entries, dict):
+            continue
+        for name, summary in entries.items():
+            if not isinstance(summary, dict):
+                continue
+            key = 'rows_per_sec' if group == 'batch' else metric
+            if key in summary:
+                yield (group, name, key), summary[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--metric', default='p50_ms', help="Latency field to compare (default: %(default)s).")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before.get('meta', {}).get('commit')}  after: {after.get('meta', {}).get('commit')}")
+    old = dict(_rows(before, args.metric))
+    for key, new_value in _rows(after, args.metric):
+        if key not in old:
+            continue
+        old_value = old[key]
+        change = (new_value - old_value) / old_value * 100.0 if old_value else 0.0
+        group, name, field = key
+        print(f"  {group:<10} {name:<16} {field:<12} {old_value:>12.4f} -> {new_value:>12.4f}  ({change:+.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
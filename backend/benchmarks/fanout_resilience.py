@@ -0,0 +1,167 @@
+"""
+Circuit breaker and hedging behaviour of the split-service fan-out (src/api/full_checkup.py)
+against local stand-in services with injected faults (see legacy_fanout.py).
+
+    dead_service  - the stroke service answers every call with HTTP 500. Without a breaker
+                    every fan-out waits through all retries; with it, fan-outs fail fast
+                    once the breaker opens, and the dead service stops receiving traffic.
+    recovery      - the service comes back; after the reset period a half-open probe
+                    closes the breaker again.
+    tail_latency  - primaries and replicas answer 2% of calls slowly. Hedging after the
+                    p95 delay sends those calls to the replica as well; reports the latency
+                    curve, hedge count, replica win rate and the extra load it costs.
+
+Example, from the backend folder:
+    python benchmarks/fanout_resilience.py --iterations 300
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import full_checkup_payloads, run_metadata, summarize, write_results
+from benchmarks.legacy_fanout import (SERVICES, connection_counts, control_stand_in, start_stand_in,
+                                      wait_for_stand_ins)
+
+TAIL_PERCENTILES = (50, 90, 95, 99)
+
+
+def run_fanouts(full_checkup, pairs_list, iterations):
+    samples, errors = [], 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        results = full_checkup.parallel_requests(pairs_list[i % len(pairs_list)])
+        samples.append((time.perf_counter() - start) * 1000.0)
+        errors += sum(1 for r in results.values() if 'error' in r)
+    return {'latency': summarize(samples, TAIL_PERCENTILES), 'downstream_errors': errors}
+
+
+def reset_breakers(full_checkup):
+    for downstream in full_checkup._downstreams.values():
+        downstream.breaker = full_checkup.CircuitBreaker(downstream.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breaker and hedging benchmark for the split-service fan-out.")
+    parser.add_argument('--iterations', type=int, default=300, help="Fan-outs per hedging run.")
+    parser.add_argument('--dead-iterations', type=int, default=40, help="Fan-outs while a service is down.")
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="Normal stand-in service time.")
+    parser.add_argument('--slow-rate', type=float, default=0.02,
+                        help="Share of slow answers (tail_latency); must stay below 1 - hedge percentile.")
+    parser.add_argument('--slow-ms', type=float, default=200.0, help="Service time of a slow answer.")
+    parser.add_argument('--reset-seconds', type=float, default=1.0, help="Breaker reset period for the run.")
+    parser.add_argument('--base-port', type=int, default=5321)
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/resilience-<commit>-<time>.json).")
+    args = parser.parse_args()
+
+    procs, primaries, replicas = [], {}, {}
+    for i, (path, name) in enumerate(SERVICES):
+        proc, primaries[name] = start_stand_in(args.base_port + i, path, args.latency_ms, seed=i)
+        procs.append(proc)
+        proc, replicas[name] = start_stand_in(args.base_port + 3 + i, path, args.latency_ms, seed=100 + i)
+        procs.append(proc)
+
+    try:
+        wait_for_stand_ins(list(primaries.values()) + list(replicas.values()))
+        # full_checkup reads its configuration at import
+        os.environ.update(primaries)
+        os.environ.update({name.replace('_API_URL', '_API_REPLICA_URL'): url for name, url in replicas.items()})
+        os.environ['FANOUT_BREAKER_RESET_SECONDS'] = str(args.reset_seconds)
+        from src.api import full_checkup
+
+        payloads = full_checkup_payloads(50)
+        pairs = []
+        for p in payloads:
+            stroke_data, heartd_data, diabetes_data = full_checkup.prepare_data_for_models(p)
+            pairs.append([(primaries['STROKE_API_URL'], stroke_data), (primaries['HEARTD_API_URL'], heartd_data),
+                          (primaries['DIABETES_API_URL'], diabetes_data)])
+        stroke_url = primaries['STROKE_API_URL']
+        results = {'meta': run_metadata(**vars(args))}
+
+        # -- Dead service: breaker off vs on (no replica failover, to isolate the breaker) --
+        all_replicas = dict(full_checkup.REPLICA_URLS)
+        full_checkup.REPLICA_URLS.clear()
+        full_checkup.HEDGE_ENABLED = False
+        control_stand_in(stroke_url, error_rate=1.0)
+        dead = {}
+        for enabled in (False, True):
+            full_checkup.BREAKER_ENABLED = enabled
+            reset_breakers(full_checkup)
+            before = connection_counts([stroke_url])['requests']
+            run = run_fanouts(full_checkup, pairs, args.dead_iterations)
+            run['calls_to_dead_service'] = connection_counts([stroke_url])['requests'] - before
+            dead['breaker_on' if enabled else 'breaker_off'] = run
+        results['dead_service'] = dead
+
+        # -- Recovery: the service comes back, the half-open probe closes the breaker --
+        control_stand_in(stroke_url, error_rate=0.0)
+        stroke = full_checkup.get_downstream(stroke_url)
+        start = time.perf_counter()
+        while stroke.breaker.state != full_checkup.CircuitBreaker.CLOSED and time.perf_counter() - start < args.reset_seconds + 10:
+            full_checkup.parallel_requests(pairs[0])
+            time.sleep(0.05)
+        results['recovery'] = {
+            'breaker_state': stroke.breaker.state,
+            'seconds_to_close': round(time.perf_counter() - start, 3),
+            'after': run_fanouts(full_checkup, pairs, 20),
+        }
+
+        # -- Tail latency: hedging off vs on --
+        full_checkup.REPLICA_URLS.update(all_replicas)
+        for url in list(primaries.values()) + list(replicas.values()):
+            control_stand_in(url, slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+        tail = {}
+        for enabled in (False, True):
+            full_checkup.HEDGE_ENABLED = enabled
+            run_fanouts(full_checkup, pairs, 30)    # fills the latency windows the hedge delay comes from
+            before = connection_counts(list(primaries.values()) + list(replicas.values()))['requests']
+            hedges_before = _hedge_totals(full_checkup)
+            run = run_fanouts(full_checkup, pairs, args.iterations)
+            sent = connection_counts(list(primaries.values()) + list(replicas.values()))['requests'] - before
+            hedges, wins = (a - b for a, b in zip(_hedge_totals(full_checkup), hedges_before))
+            run.update({
+                'downstream_calls': sent,
+                'extra_load': round(sent / (3 * args.iterations) - 1, 4),
+                'hedges_sent': hedges,
+                'replica_win_rate': round(wins / hedges, 4) if hedges else 0.0,
+            })
+            tail['hedging_on' if enabled else 'hedging_off'] = run
+        results['tail_latency'] = tail
+        results['fanout_stats'] = full_checkup.fanout_stats()
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+    for name, run in dead.items():
+        lat = run['latency']
+        print(f"dead_service {name:<12} p50={lat['p50_ms']:>8.2f}  p99={lat['p99_ms']:>8.2f} ms  "
+              f"calls_to_dead_service={run['calls_to_dead_service']}")
+    rec = results['recovery']
+    print(f"recovery     breaker={rec['breaker_state']} after {rec['seconds_to_close']} s, "
+          f"errors afterwards={rec['after']['downstream_errors']}")
+    for name, run in tail.items():
+        lat = run['latency']
+        print(f"tail_latency {name:<12} p50={lat['p50_ms']:>8.2f}  p95={lat['p95_ms']:>8.2f}  p99={lat['p99_ms']:>8.2f} ms  "
+              f"hedges={run['hedges_sent']}  replica_win_rate={run['replica_win_rate']:.1%}  extra_load={run['extra_load']:.1%}")
+    print(f"Results written to {write_results(results, args.out, prefix='resilience')}")
+
+    ok = (dead['breaker_on']['calls_to_dead_service'] < dead['breaker_off']['calls_to_dead_service']
+          and rec['breaker_state'] == 'closed' and rec['after']['downstream_errors'] == 0
+          and tail['hedging_on']['downstream_errors'] == 0)
+    print("SUCCESS: breaker shed load and recovered, hedged runs had no errors." if ok
+          else "FAILURE: see the results above.")
+    return 0 if ok else 1
+
+
+def _hedge_totals(full_checkup):
+    hedges = full_checkup.fanout_stats()['hedging']['hedges'].values()
+    return sum(h['sent'] for h in hedges), sum(h['replica_wins'] for h in hedges)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Startup time and memory of the Streamlit frontend's services in each inference mode
+(frontend_st/services/checkup_services.py, STREAMLIT_INFERENCE_MODE):
+
+    local         - every model and CSV loaded into the frontend process
+    remote        - thin clients of a backend started for the run (`main.py serve`)
+    remote_down   - remote mode with the backend unreachable: the local models are loaded
+                    on the first prediction and answer instead
+
+Each mode runs in its own subprocess from the frontend_st folder, timing the imports and
+service construction the pages do on their first run (startup), the RSS at that point,
+then --full full-checkup and --quick quick-checkup predictions on distinct inputs (so the
+result cache never hits), and the RSS afterwards. Streamlit itself is imported but no
+server is started, so its own runtime is not part of the numbers.
+
+Example, from the backend folder:
+    python benchmarks/frontend_modes.py --full 200 --quick 200
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend_st')
+sys.path.append(BACKEND_DIR)
+
+MODES = ('local', 'remote', 'remote_down')
+
+
+def rss_kib():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return None
+
+
+def form_payloads(n, seed=42):
+    """Full-checkup payloads as frontend_st/views/full_checkup.py builds them."""
+    rng = random.Random(seed)
+    return [{
+        'age': rng.randint(1, 90), 'sex': rng.randint(0, 1),
+        'bmi': round(rng.uniform(15, 45), 1), 'glucose': round(rng.uniform(60, 250), 1),
+        'bloodpressure': rng.randint(80, 180), 'hypertension': rng.randint(0, 1),
+        'heartdisease': rng.randint(0, 1), 'maritalstatus': rng.randint(0, 1),
+        'worktype': rng.choice(['privatejob', 'selfemp', 'govtemp', 'children', 'never_worked']),
+        'residence': rng.randint(0, 1),
+        'smoke': rng.choice(['formerly_smoked', 'never_smoked', 'smokes', 'Unknown']),
+        'cp': rng.randint(0, 3), 'chol': rng.randint(120, 400), 'fbs': rng.randint(0, 1),
+        'restecg': rng.randint(0, 2), 'thalach': rng.randint(80, 200), 'exang': rng.randint(0, 1),
+        'oldpeak': round(rng.uniform(0, 5), 1), 'slope': rng.randint(0, 2), 'ca': rng.randint(0, 3),
+        'thal': rng.randint(0, 3),
+    } for _ in range(n)]
+
+
+def run_child(inputs_path, out_path):
+    # Nothing heavy may be imported before the startup measurement
+    os.chdir(FRONTEND_DIR)
+    sys.path.insert(0, FRONTEND_DIR)
+    with open(inputs_path) as f:
+        inputs = json.load(f)
+
+    rss_base = rss_kib()
+    start = time.perf_counter()
+    from services import checkup_services
+    quick = checkup_services.get_quick_checkup_service()
+    checkup_services.load_full_checkup_services()
+    startup = time.perf_counter() - start
+    rss_startup = rss_kib()
+    local_loaded_at_startup = 'sklearn' in sys.modules
+
+    def timed(fn, args):
+        samples, errors = [], 0
+        for arg in args:
+            t = time.perf_counter()
+            result = fn(arg)
+            samples.append((time.perf_counter() - t) * 1000.0)
+            values = result.values() if 'diabetes' in result else [result]
+            errors += sum(1 for r in values if 'error' in r)
+        return samples, errors
+
+    full_ms, full_errors = timed(checkup_services.predict_full_checkup, inputs['full'])
+    quick_ms, quick_errors = timed(quick.predict, inputs['quick'])
+    rss_after = rss_kib()
+    local_loaded_at_end = 'sklearn' in sys.modules
+
+    from benchmarks.common import summarize
+    result = {
+        'startup_ms': round(startup * 1000.0, 1),
+        'rss_base_mib': round(rss_base / 1024, 1),
+        'rss_startup_mib': round(rss_startup / 1024, 1),
+        'rss_after_mib': round(rss_after / 1024, 1),
+        'local_models_at_startup': local_loaded_at_startup,
+        'local_models_at_end': local_loaded_at_end,
+        'first_full_checkup_ms': round(full_ms[0], 2),
+        'full_checkup': summarize(full_ms[1:]),
+        'quick_checkup': summarize(quick_ms[1:]),
+        'errors': full_errors + quick_errors,
+    }
+    with open(out_path, 'w') as f:
+        json.dump(result, f)
+
+
+def run_mode(mode, inputs_path, backend_url):
+    with tempfile.TemporaryDirectory() as workdir:
+        out_path = os.path.join(workdir, 'result.json')
+        env = dict(os.environ, STREAMLIT_INFERENCE_MODE='local' if mode == 'local' else 'remote',
+                   BACKEND_URL=backend_url)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', inputs_path, '--child-out', out_path],
+                       env=env, stdout=subprocess.DEVNULL, check=True)
+        with open(out_path) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit services: local vs remote inference startup and memory.")
+    parser.add_argument('--full', type=int, default=200, help="Full-checkup predictions per mode.")
+    parser.add_argument('--quick', type=int, default=200, help="Quick-checkup predictions per mode.")
+    parser.add_argument('--port', type=int, default=5056, help="Port of the backend started for the remote mode.")
+    parser.add_argument('--workers', type=int, default=1, help="Backend worker processes.")
+    parser.add_argument('--unused-port', type=int, default=5057, help="Port nothing listens on (remote_down).")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--child-out', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/frontend-<commit>-<time>.json).")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.child_out)
+        return 0
+
+    from benchmarks.common import quick_checkup_payloads, run_metadata, write_results
+    from benchmarks.load_generator import spawn_backend
+
+    symptom_lists = [[v for k, v in sorted(p.items(), key=lambda kv: int(kv[0].split('_')[1]))]
+                     for p in quick_checkup_payloads(args.quick)]
+    results = {'meta': run_metadata(full=args.full, quick=args.quick, workers=args.workers)}
+    print(f"Starting backend on port {args.port}...")
+    backend = spawn_backend(args.port, args.workers)
+    try:
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'full': form_payloads(args.full), 'quick': symptom_lists}, f)
+            inputs_path = f.name
+        for mode in MODES:
+            port = args.unused_port if mode == 'remote_down' else args.port
+            results[mode] = run_mode(mode, inputs_path, f'http://127.0.0.1:{port}')
+    finally:
+        backend.terminate()
+        backend.wait(timeout=10)
+        os.unlink(inputs_path)
+
+    for mode in MODES:
+        r = results[mode]
+        print(f"{mode:<12} startup {r['startup_ms']:>8.1f} ms   RSS startup {r['rss_startup_mib']:>6.1f} MiB, "
+              f"after {r['rss_after_mib']:>6.1f} MiB   full p50={r['full_checkup']['p50_ms']:.2f} ms   "
+              f"quick p50={r['quick_checkup']['p50_ms']:.2f} ms   errors {r['errors']}")
+    print(f"Results written to {write_results(results, args.out, prefix='frontend')}")
+
+    local, remote, down = results['local'], results['remote'], results['remote_down']
+    ok = (remote['rss_after_mib'] < local['rss_after_mib'] and not remote['local_models_at_end']
+          and down['local_models_at_end'] and not any(results[m]['errors'] for m in MODES))
+    print("SUCCESS: remote mode ran without local models; the fallback answered while the backend was down." if ok
+          else "FAILURE: see the results above.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
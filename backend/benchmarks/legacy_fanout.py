@@ -0,0 +1,317 @@
+"""
+Benchmark of the split-service /full-checkup fan-out (src/api/full_checkup.py).
+
+Starts three local stand-ins for the stroke, heart and diabetes model services (tiny HTTP
+servers returning a canned prediction after a configurable delay), then compares:
+
+    legacy  - the previous client: a ThreadPoolExecutor per request, `requests.post` without
+              a Session (one TCP handshake per call), fixed 2 s sleeps between retries
+    pooled  - the current client: keep-alive pool per downstream, process-wide executor,
+              jittered backoff within the fan-out deadline
+
+for sequential and concurrent fan-outs, and with one downstream unreachable. Stand-in
+connection counts show how many TCP connections each client opened. The stand-ins can
+also inject latency and errors (see run_stand_in); fanout_resilience.py uses that to
+exercise the circuit breakers and hedging.
+
+Example, from the backend folder:
+    python benchmarks/legacy_fanout.py --iterations 300 --latency-ms 2
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import full_checkup_payloads, run_metadata, summarize, write_results
+
+# Canned answers of the stand-ins, shaped like the real fc-* services
+STAND_IN_RESPONSES = {
+    '/fc-stroke': {'prediksi_stroke': 'Tidak Stroke', 'saran_stroke': 'Jaga pola hidup sehat.',
+                   'faktor_risiko_stroke': ['Usia']},
+    '/fc-heartd': {'prediksi_heartd': 'Tidak Sakit Jantung', 'saran_heartd': 'Olahraga teratur.',
+                   'faktor_risiko_heartd': ['Kolesterol']},
+    '/fc-diabetes': {'prediksi_diabetes': 'Tidak Diabetes', 'saran_diabetes': 'Kurangi gula.',
+                     'faktor_risiko_diabetes': ['BMI']},
+}
+
+
+# -- Stand-in model service --
+
+def run_stand_in(port, latency_ms, error_rate=0.0, slow_rate=0.0, slow_ms=0.0, seed=None):
+    """
+    Serves the canned fc-* answers on `port` until killed.
+
+    Fault injection: every answer takes `latency_ms`; a `slow_rate` share takes `slow_ms`
+    instead (tail latency) and an `error_rate` share is answered with HTTP 500. GET /stats
+    returns counters, POST /control {"error_rate": .., "latency_ms": .., ...} changes the
+    injection while running.
+    """
+    counters = {'connections': 0, 'requests': 0}
+    faults = {'latency_ms': latency_ms, 'error_rate': error_rate, 'slow_rate': slow_rate, 'slow_ms': slow_ms}
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'   # keep-alive
+        # Headers and body in one segment: with keep-alive, separate small writes hit
+        # Nagle + delayed ACK and add ~40 ms per response
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with lock:
+                counters['connections'] += 1
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with lock:
+                stats = dict(counters, **faults)
+            self._send(200, stats)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/control':
+                with lock:
+                    faults.update({k: float(v) for k, v in json.loads(body).items() if k in faults})
+                    current = dict(faults)
+                self._send(200, current)
+                return
+
+            with lock:
+                counters['requests'] += 1
+                f = dict(faults)
+                slow = rng.random() < f['slow_rate']
+                fail = rng.random() < f['error_rate']
+            delay_ms = f['slow_ms'] if slow else f['latency_ms']
+            if delay_ms:
+                time.sleep(delay_ms / 1000.0)
+            if fail:
+                self._send(500, {'error': 'injected failure'})
+                return
+            response = STAND_IN_RESPONSES.get(self.path)
+            self._send(200 if response else 404, response or {'error': 'unknown route'})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+SERVICES = (('/fc-stroke', 'STROKE_API_URL'), ('/fc-heartd', 'HEARTD_API_URL'), ('/fc-diabetes', 'DIABETES_API_URL'))
+
+
+def start_stand_in(port, path, latency_ms, error_rate=0.0, slow_rate=0.0, slow_ms=0.0, seed=None):
+    """Starts one stand-in process; returns (process, url of `path`)."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--stand-in', str(port), '--latency-ms', str(latency_ms),
+           '--error-rate', str(error_rate), '--slow-rate', str(slow_rate), '--slow-ms', str(slow_ms)]
+    if seed is not None:
+        cmd += ['--seed', str(seed)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, f'http://127.0.0.1:{port}{path}'
+
+
+def wait_for_stand_ins(urls, timeout=15):
+    deadline = time.time() + timeout
+    for url in urls:
+        while True:
+            try:
+                requests.get(_stats_url(url), timeout=0.5)
+                break
+            except requests.RequestException:
+                if time.time() > deadline:
+                    raise RuntimeError(f"Stand-in at {url} did not start.")
+                time.sleep(0.05)
+
+
+def start_stand_ins(base_port, latency_ms, **faults):
+    """Starts one stand-in process per model service; returns (processes, {env var: url})."""
+    procs, urls = [], {}
+    for i, (path, name) in enumerate(SERVICES):
+        proc, urls[name] = start_stand_in(base_port + i, path, latency_ms, **faults)
+        procs.append(proc)
+    wait_for_stand_ins(urls.values())
+    return procs, urls
+
+
+def control_stand_in(url, **faults):
+    """Changes the fault injection of a running stand-in."""
+    return requests.post(url.rsplit('/', 1)[0] + '/control', json=faults, timeout=2).json()
+
+
+def _stats_url(url):
+    return url.rsplit('/', 1)[0] + '/stats'
+
+
+def connection_counts(urls):
+    """Summed stand-in counters; `probes` is the number of connections this query opened itself."""
+    total = {'connections': 0, 'requests': 0, 'probes': 0}
+    for url in urls:
+        try:
+            stats = requests.get(_stats_url(url), timeout=1).json()
+        except requests.RequestException:
+            continue    # unreachable downstream
+        total['connections'] += stats['connections']
+        total['requests'] += stats['requests']
+        total['probes'] += 1
+    return total
+
+
+# -- The previous client, kept here as the baseline --
+
+def legacy_request_prediction(api_url, model_data, retries=3, delay=2):
+    for i in range(retries):
+        try:
+            response = requests.post(api_url, json=model_data, timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException:
+            time.sleep(delay)
+    return {'error': f"Failed to connect to {api_url} after {retries} retries"}
+
+
+def legacy_parallel_requests(url_data_pairs):
+    results = {}
+    with ThreadPoolExecutor() as executor:
+        future_to_url = {executor.submit(legacy_request_prediction, url, data): url for url, data in url_data_pairs}
+        for future in as_completed(future_to_url):
+            results[future_to_url[future]] = future.result()
+    return results
+
+
+# -- Scenarios --
+
+def run_scenario(fanout, pairs_list, iterations, concurrency, urls):
+    """Latency of `iterations` fan-outs from `concurrency` client threads, plus connections opened."""
+    before = connection_counts(urls)
+    samples, errors = [], 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        start = time.perf_counter()
+        results = fanout(pairs_list[i % len(pairs_list)])
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with lock:
+            samples.append(elapsed)
+            errors += sum(1 for r in results.values() if 'error' in r)
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(iterations):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            list(clients.map(one, range(iterations)))
+    wall = time.perf_counter() - start
+
+    after = connection_counts(urls)
+    return {
+        'latency': summarize(samples),
+        'fanouts_per_s': round(iterations / wall, 2),
+        'downstream_errors': errors,
+        'tcp_connections': after['connections'] - before['connections'] - after['probes'],
+        'downstream_requests': after['requests'] - before['requests'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the split-service full-checkup fan-out.")
+    parser.add_argument('--stand-in', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    parser.add_argument('--error-rate', type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument('--slow-rate', type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument('--slow-ms', type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument('--seed', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--iterations', type=int, default=300, help="Fan-outs per healthy scenario.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads in the concurrent scenario.")
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="Stand-in service time.")
+    parser.add_argument('--down-iterations', type=int, default=3,
+                        help="Fan-outs with one downstream unreachable (the legacy client needs ~6 s each).")
+    parser.add_argument('--base-port', type=int, default=5301)
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/fanout-<commit>-<time>.json).")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        run_stand_in(args.stand_in, args.latency_ms, args.error_rate, args.slow_rate, args.slow_ms, args.seed)
+        return 0
+
+    procs, urls = start_stand_ins(args.base_port, args.latency_ms)
+    try:
+        # full_checkup reads the downstream URLs at import
+        os.environ.update(urls)
+        from src.api import full_checkup
+
+        payloads = full_checkup_payloads(50)
+
+        def pairs_for(stroke_url, heart_url, diabetes_url):
+            pairs = []
+            for p in payloads:
+                stroke_data, heartd_data, diabetes_data = full_checkup.prepare_data_for_models(p)
+                pairs.append([(stroke_url, stroke_data), (heart_url, heartd_data), (diabetes_url, diabetes_data)])
+            return pairs
+
+        healthy = pairs_for(urls['STROKE_API_URL'], urls['HEARTD_API_URL'], urls['DIABETES_API_URL'])
+        # Nothing listens on this port: every attempt is refused
+        down_url = f'http://127.0.0.1:{args.base_port + 3}/fc-diabetes'
+        degraded = pairs_for(urls['STROKE_API_URL'], urls['HEARTD_API_URL'], down_url)
+        all_urls = list(urls.values())
+
+        clients = {'legacy': legacy_parallel_requests, 'pooled': full_checkup.parallel_requests}
+        results = {
+            'meta': run_metadata(latency_ms=args.latency_ms, iterations=args.iterations,
+                                 concurrency=args.concurrency, down_iterations=args.down_iterations,
+                                 deadline_s=full_checkup.FANOUT_DEADLINE_SECONDS),
+        }
+        for name, fanout in clients.items():
+            fanout(healthy[0])  # warm-up (pooled: opens the keep-alive connections)
+            results[name] = {
+                'sequential': run_scenario(fanout, healthy, args.iterations, 1, all_urls),
+                'concurrent': run_scenario(fanout, healthy, args.iterations, args.concurrency, all_urls),
+                'one_downstream_down': run_scenario(fanout, degraded, args.down_iterations, 1, all_urls),
+            }
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+    for scenario in ('sequential', 'concurrent', 'one_downstream_down'):
+        print(f"{scenario}:")
+        for name in clients:
+            r = results[name][scenario]
+            lat = r['latency']
+            print(f"  {name:<7} p50={lat['p50_ms']:>9.2f}  p99={lat['p99_ms']:>9.2f} ms  "
+                  f"{r['fanouts_per_s']:>8} fan-outs/s  tcp_connections={r['tcp_connections']}  "
+                  f"errors={r['downstream_errors']}")
+
+    print(f"Results written to {write_results(results, args.out, prefix='fanout')}")
+    pooled, legacy = results['pooled']['sequential'], results['legacy']['sequential']
+    if pooled['downstream_errors'] == 0 and legacy['downstream_errors'] == 0:
+        print("SUCCESS: both clients answered every healthy fan-out.")
+        return 0
+    print("FAILURE: healthy fan-outs returned errors.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
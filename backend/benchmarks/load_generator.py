@@ -0,0 +1,262 @@
+"""
+Sustained-load generator for a locally running backend.
+
+Replays realistic patients (payloads sampled from the stroke, heart, diabetes and
+symptom-disease datasets) against /full-checkup and /quick-checkup.
+
+Open loop (default, --rate): requests are scheduled at fixed intervals regardless of how
+fast the server answers, and latency is measured from the *scheduled* send time. A stalled
+server therefore shows up in the tail instead of silently lowering the offered load
+(coordinated omission). Closed loop (--concurrency without --rate): N clients send back to
+back; useful for finding peak throughput, but its latencies hide queueing.
+
+Examples, from the backend folder:
+    python main.py serve --workers 4 &
+    python benchmarks/load_generator.py --rate 200 --duration 30
+    python benchmarks/load_generator.py --spawn --workers 4 --rate 300 --quick-ratio 0.5
+    python benchmarks/load_generator.py --concurrency 16 --duration 20
+"""
+import argparse
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import (full_checkup_payloads, quick_checkup_payloads, run_metadata,
+                               summarize, write_results)
+
+LOAD_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class _Result:
+    __slots__ = ('route', 'scheduled', 'sent', 'done', 'ok', 'status')
+
+    def __init__(self, route, scheduled, sent, done, ok, status):
+        self.route = route
+        self.scheduled = scheduled
+        self.sent = sent
+        self.done = done
+        self.ok = ok
+        self.status = status
+
+
+class LoadGenerator:
+    def __init__(self, base_url, full_payloads, quick_payloads, quick_ratio=0.3, timeout=10.0, seed=42):
+        self.base_url = base_url.rstrip('/')
+        self.full_payloads = full_payloads
+        self.quick_payloads = quick_payloads
+        self.quick_ratio = quick_ratio
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+
+        self.results = []
+        self._results_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _next_request(self):
+        if self.rng.random() < self.quick_ratio:
+            return '/quick-checkup', self.rng.choice(self.quick_payloads)
+        return '/full-checkup', self.rng.choice(self.full_payloads)
+
+    def _session(self):
+        # One keep-alive connection per client thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, route, payload, scheduled):
+        sent = time.perf_counter()
+        try:
+            response = self._session().post(self.base_url + route, json=payload, timeout=self.timeout)
+            status = response.status_code
+            ok = status < 400
+        except requests.RequestException:
+            status, ok = None, False
+        result = _Result(route, scheduled, sent, time.perf_counter(), ok, status)
+        with self._results_lock:
+            self.results.append(result)
+
+    def run_open_loop(self, rate, duration, max_inflight):
+        """Sends `rate` requests/s for `duration` s from a pool of `max_inflight` clients."""
+        jobs = queue.Queue()
+
+        def client():
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                self._send(*job)
+
+        clients = [threading.Thread(target=client, daemon=True) for _ in range(max_inflight)]
+        for t in clients:
+            t.start()
+
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        total = int(rate * duration)
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            route, payload = self._next_request()
+            jobs.put((route, payload, scheduled))
+
+        for _ in clients:
+            jobs.put(None)
+        for t in clients:
+            t.join()
+        return time.perf_counter() - start
+
+    def run_closed_loop(self, concurrency, duration):
+        """`concurrency` clients each sending the next request as soon as the last one returns."""
+        deadline = time.perf_counter() + duration
+        lock = threading.Lock()
+
+        def client():
+            while time.perf_counter() < deadline:
+                with lock:
+                    route, payload = self._next_request()
+                self._send(route, payload, time.perf_counter())
+
+        start = time.perf_counter()
+        clients = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        return time.perf_counter() - start
+
+    def report(self, elapsed, warmup=0.0):
+        """Throughput, error rate and the latency curve, overall and per route."""
+        if not self.results:
+            return {'requests': 0}
+        origin = min(r.scheduled for r in self.results)
+        measured = [r for r in self.results if r.scheduled - origin >= warmup]
+        window = max(elapsed - warmup, 1e-9)
+
+        def block(rows):
+            errors = sum(1 for r in rows if not r.ok)
+            return {
+                'requests': len(rows),
+                'throughput_rps': round(len(rows) / window, 2),
+                'errors': errors,
+                'error_rate': round(errors / len(rows), 5) if rows else 0.0,
+                # From the scheduled send time: what a patient at the kiosk would experience
+                'latency': summarize([(r.done - r.scheduled) * 1000.0 for r in rows], LOAD_PERCENTILES),
+                # From the actual send time: how long the server took once it got the request
+                'service_time': summarize([(r.done - r.sent) * 1000.0 for r in rows], LOAD_PERCENTILES),
+                'statuses': _count(r.status for r in rows),
+            }
+
+        report = {'overall': block(measured)}
+        for route in sorted({r.route for r in measured}):
+            report[route] = block([r for r in measured if r.route == route])
+        return report
+
+
+def _count(values):
+    counts = {}
+    for v in values:
+        key = str(v) if v is not None else 'connection_error'
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def spawn_backend(port, workers):
+    """Starts `main.py serve` on `port` and waits for /health. Returns the process."""
+    proc = subprocess.Popen(
+        [sys.executable, 'main.py', 'serve', '--workers', str(workers), '--port', str(port), '--host', '127.0.0.1'],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'http://127.0.0.1:{port}/health'
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {proc.returncode} during startup.")
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("Backend did not become healthy within 120 s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the checkup backend.")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Backend base URL.")
+    parser.add_argument('--rate', type=float, help="Target requests per second (open loop).")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="Closed-loop clients when --rate is not given.")
+    parser.add_argument('--max-inflight', type=int, default=128,
+                        help="Client threads available to the open-loop scheduler.")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds of load.")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Seconds excluded from the statistics.")
+    parser.add_argument('--quick-ratio', type=float, default=0.3, help="Share of /quick-checkup requests.")
+    parser.add_argument('--inputs', type=int, default=1000, help="Distinct payloads per route.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--spawn', action='store_true', help="Start `main.py serve` locally for the run.")
+    parser.add_argument('--port', type=int, default=5055, help="Port for --spawn.")
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes for --spawn.")
+    parser.add_argument('--out', help="Write the report as JSON (default: print only).")
+    args = parser.parse_args()
+
+    full_payloads = full_checkup_payloads(args.inputs, args.seed)
+    quick_payloads = quick_checkup_payloads(args.inputs, args.seed)
+
+    proc = None
+    url = args.url
+    if args.spawn:
+        print(f"Starting backend on port {args.port} with {args.workers} workers...")
+        proc = spawn_backend(args.port, args.workers)
+        url = f'http://127.0.0.1:{args.port}'
+
+    try:
+        gen = LoadGenerator(url, full_payloads, quick_payloads, args.quick_ratio, args.timeout, args.seed)
+        if args.rate:
+            mode = 'open_loop'
+            print(f"Open loop: {args.rate} req/s for {args.duration} s against {url}")
+            elapsed = gen.run_open_loop(args.rate, args.duration, args.max_inflight)
+        else:
+            mode = 'closed_loop'
+            print(f"Closed loop: {args.concurrency} clients for {args.duration} s against {url} "
+                  "(latencies exclude queueing; use --rate for tail latency)")
+            elapsed = gen.run_closed_loop(args.concurrency, args.duration)
+        report = gen.report(elapsed, args.warmup)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    for name, block in report.items():
+        if not isinstance(block, dict) or 'latency' not in block:
+            continue
+        lat = block['latency']
+        print(f"  {name:<15} {block['throughput_rps']:>9} req/s  errors={block['error_rate']:.2%}  "
+              f"p50={lat.get('p50_ms')}  p95={lat.get('p95_ms')}  p99={lat.get('p99_ms')}  p99.9={lat.get('p99.9_ms')} ms")
+
+    if args.out:
+        results = {
+            'meta': run_metadata(mode=mode, url=url, rate=args.rate, concurrency=args.concurrency,
+                                 duration=args.duration, warmup=args.warmup, quick_ratio=args.quick_ratio,
+                                 spawned_workers=args.workers if args.spawn else None),
+            'load': report,
+        }
+        print(f"Report written to {write_results(results, args.out, prefix='load')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
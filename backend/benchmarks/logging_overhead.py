@@ -0,0 +1,154 @@
+"""
+Request-thread time spent in logging: the previous setup (a FileHandler and a stdout
+handler per logger, written synchronously by the calling thread) against the queue-based
+pipeline of src/utils/logger.py, with and without per-route sampling.
+
+Every mode runs in its own subprocess (the logger reads its configuration at import) in a
+temporary working directory, with stdout discarded. Each of --threads threads logs
+--calls info records from inside a Flask request context for /full-checkup, timing
+every call. The report also gives the time to drain the queue afterwards and checks that
+the log file got every record that was not sampled out.
+
+Example, from the backend folder:
+    python benchmarks/logging_overhead.py --threads 8 --calls 5000
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import run_metadata, summarize, write_results
+
+MODES = {
+    # mode -> environment of the child
+    'legacy_sync': {},
+    'queue': {'LOG_SAMPLE_RATES': ''},
+    'queue_sampled': {'LOG_SAMPLE_RATES': '/full-checkup=0.01'},
+}
+MODULES = 20    # loggers set up, like the backend's modules
+
+
+def legacy_setup_logger(name, log_file='app.log', level=logging.INFO):
+    """The previous src/utils/logger.setup_logger, kept as the baseline."""
+    log_dir = os.path.join(os.getcwd(), 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter('[%(asctime)s] %(levelname)s [%(name)s]: %(message)s')
+    handler = logging.FileHandler(os.path.join(log_dir, log_file))
+    handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if not logger.handlers:
+        logger.addHandler(handler)
+        logger.addHandler(console_handler)
+    return logger
+
+
+def run_child(mode, threads, calls, out_path):
+    from flask import Flask
+
+    if mode == 'legacy_sync':
+        setup, flush, bind_route = legacy_setup_logger, lambda: None, lambda route: None
+    else:
+        from src.utils.logger import flush_logging, set_request_route, setup_logger
+        setup, flush, bind_route = setup_logger, flush_logging, set_request_route
+    loggers = [setup(f'bench.module{i}') for i in range(MODULES)]
+
+    app = Flask(__name__)
+    app.add_url_rule('/full-checkup', 'full_checkup', lambda: '', methods=['POST'])
+
+    samples = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(t):
+        logger = loggers[t % MODULES]
+        out = samples[t]
+        with app.test_request_context('/full-checkup', method='POST'):
+            bind_route('/full-checkup')     # what the app's before_request hook does
+            barrier.wait()
+            for i in range(calls):
+                start = time.perf_counter()
+                logger.info(f"Processing Full Checkup request {t}-{i}...")
+                out.append((time.perf_counter() - start) * 1e6)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    logging_wall = time.perf_counter() - start
+    start = time.perf_counter()
+    flush()
+    drain = time.perf_counter() - start
+
+    with open(os.path.join('logs', 'app.log')) as f:
+        lines = sum(1 for _ in f)
+    all_samples = [s for per_thread in samples for s in per_thread]
+    result = {
+        # summarize() labels are *_ms; values here are microseconds per call
+        'per_call_us': summarize(all_samples),
+        'request_thread_total_ms': round(sum(all_samples) / 1000.0, 2),
+        'wall_ms': round(logging_wall * 1000.0, 2),
+        'drain_ms': round(drain * 1000.0, 2),
+        'records': threads * calls,
+        'lines_written': lines,
+    }
+    with open(out_path, 'w') as f:
+        json.dump(result, f)
+
+
+def run_mode(mode, threads, calls):
+    with tempfile.TemporaryDirectory() as workdir:
+        out_path = os.path.join(workdir, 'result.json')
+        env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **MODES[mode])
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, '--threads', str(threads),
+                        '--calls', str(calls), '--child-out', out_path],
+                       cwd=workdir, env=env, stdout=subprocess.DEVNULL, check=True)
+        with open(out_path) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request-thread logging overhead, before and after.")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--calls', type=int, default=5000, help="Log calls per thread.")
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--child-out', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/logging-<commit>-<time>.json).")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.threads, args.calls, args.child_out)
+        return 0
+
+    results = {'meta': run_metadata(threads=args.threads, calls=args.calls)}
+    for mode in MODES:
+        results[mode] = run_mode(mode, args.threads, args.calls)
+        r = results[mode]
+        lat = r['per_call_us']
+        print(f"{mode:<14} per call p50={lat['p50_ms']:>7.2f}  p99={lat['p99_ms']:>8.2f} us   "
+              f"request threads {r['request_thread_total_ms']:>9.1f} ms   drain {r['drain_ms']:>7.1f} ms   "
+              f"lines {r['lines_written']}/{r['records']}")
+    print(f"Results written to {write_results(results, args.out, prefix='logging')}")
+
+    complete = results['queue']['lines_written'] == results['queue']['records']
+    sampled = results['queue_sampled']['lines_written'] < results['queue_sampled']['records']
+    if complete and sampled:
+        print("SUCCESS: the queue pipeline wrote every record; sampling dropped hot-path info logs.")
+        return 0
+    print("FAILURE: records were lost or sampling had no effect.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Benchmark suite for the backend services and routes.
+
+Measures, for StrokeService, HeartService, DiabetesService and QuickCheckupService:
+  - cold start: import + construction time in a fresh interpreter (median of --cold-runs)
+  - single-row predict latency over fixed dataset-sampled inputs
+  - batch throughput (predict_batch; quick checkup has none, so its model call is timed) over
+    --batch-size payloads sampled separately from the latency inputs; predict_batch scores
+    identical feature vectors once, so rows_per_sec counts the rows the model really scored
+and end-to-end latency of POST /full-checkup and /quick-checkup through the Flask test client.
+
+The result cache is disabled unless --with-cache is passed, so repeated inputs measure real
+work. Results are written as JSON (latencies in ms with p50/p90/p95/p99); compare two runs
+with benchmarks/compare.py.
+
+Run from the backend folder:
+    python benchmarks/run_benchmarks.py --iterations 500 --out before.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import (full_checkup_payloads, quick_checkup_payloads, run_metadata,
+                               summarize, time_calls, write_results)
+
+SERVICES = {
+    'stroke': ('src.services.stroke_service', 'StrokeService'),
+    'heart': ('src.services.heart_service', 'HeartService'),
+    'diabetes': ('src.services.diabetes_service', 'DiabetesService'),
+    'quick_checkup': ('src.services.quick_checkup_service', 'QuickCheckupService'),
+}
+
+
+def _load_class(name):
+    import importlib
+    module_name, class_name = SERVICES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def cold_start_child(name):
+    """Runs in a fresh interpreter: prints how long importing and constructing `name` took."""
+    start = time.perf_counter()
+    if name == 'app':
+        from src.app import create_app
+        create_app()
+    else:
+        _load_class(name)()
+    print(json.dumps({'ms': (time.perf_counter() - start) * 1000.0}))
+
+
+def bench_cold_start(names, runs):
+    results = {}
+    for name in names:
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--cold-start-child', name],
+                cwd=BACKEND_DIR, capture_output=True, text=True, env=os.environ.copy()
+            )
+            if out.returncode != 0:
+                print(f"Cold start of {name} failed:\n{out.stderr}")
+                break
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1])['ms'])
+        results[name] = summarize(samples)
+    return results
+
+
+def _quick_symptoms(payload):
+    return [payload[f'Symptom_{i}'] for i in range(1, 18) if payload.get(f'Symptom_{i}')]
+
+
+def bench_services(full_payloads, quick_payloads, iterations, batch_full_payloads, batch_quick_payloads, batch_repeats):
+    predict, batch = {}, {}
+    for name in SERVICES:
+        service = _load_class(name)()
+        if name == 'quick_checkup':
+            inputs = [_quick_symptoms(p) for p in quick_payloads]
+            rows = [_quick_symptoms(p) for p in batch_quick_payloads]
+        else:
+            inputs = full_payloads
+            rows = batch_full_payloads
+        predict[name] = summarize(time_calls(service.predict, inputs, iterations))
+
+        # Batch throughput over the `rows` payloads
+        unique_rows = len({tuple(service._encode(r)) for r in rows})
+        if name == 'quick_checkup':
+            import numpy as np
+            X = np.array([service._encode(r) for r in rows], dtype=float)
+            run_batch = lambda _: service._predict_matrix(X)
+            mode = 'model_only'
+            # Every row goes to the model, duplicates included
+            scored_rows = len(rows)
+        else:
+            run_batch = service.predict_batch
+            mode = 'predict_batch'
+            # Identical feature vectors are scored once
+            scored_rows = unique_rows
+        samples = time_calls(run_batch, [rows], batch_repeats, warmup=2)
+        summary = summarize(samples)
+        summary['mode'] = mode
+        summary['batch_size'] = len(rows)
+        summary['unique_rows'] = unique_rows
+        summary['rows_per_sec'] = round(scored_rows / (summary['p50_ms'] / 1000.0), 1)
+        batch[name] = summary
+    return predict, batch
+
+
+def bench_routes(full_payloads, quick_payloads, iterations):
+    from src.app import create_app
+    client = create_app().test_client()
+
+    def post(path):
+        def call(payload):
+            response = client.post(path, json=payload)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return call
+
+    return {
+        '/full-checkup': summarize(time_calls(post('/full-checkup'), full_payloads, iterations)),
+        '/quick-checkup': summarize(time_calls(post('/quick-checkup'), quick_payloads, iterations)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend services and routes.")
+    parser.add_argument('--iterations', type=int, default=300, help="Timed calls per latency benchmark.")
+    parser.add_argument('--inputs', type=int, default=200, help="Distinct dataset-sampled payloads.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batch-repeats', type=int, default=20)
+    parser.add_argument('--cold-runs', type=int, default=3)
+    parser.add_argument('--only', choices=['cold_start', 'services', 'routes'], action='append',
+                        help="Run only these groups (repeatable).")
+    parser.add_argument('--with-cache', action='store_true', help="Keep the prediction result cache enabled.")
+    parser.add_argument('--out', help="Output JSON path (default: benchmarks/results/bench-<commit>-<time>.json).")
+    parser.add_argument('--cold-start-child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Services resolve their assets from the working directory
+    os.chdir(BACKEND_DIR)
+    # The heart model was fitted on a DataFrame; the services pass plain arrays on purpose
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    if not args.with_cache:
+        os.environ['RESULT_CACHE_ENABLED'] = '0'
+
+    if args.cold_start_child:
+        cold_start_child(args.cold_start_child)
+        return 0
+
+    groups = args.only or ['cold_start', 'services', 'routes']
+    full_payloads = full_checkup_payloads(args.inputs, args.seed)
+    quick_payloads = quick_checkup_payloads(args.inputs, args.seed)
+    # Batches are not built by repeating the latency inputs, which predict_batch would deduplicate
+    batch_full_payloads = full_checkup_payloads(args.batch_size, args.seed + 1)
+    batch_quick_payloads = quick_checkup_payloads(args.batch_size, args.seed + 1)
+
+    results = {'meta': run_metadata(
+        iterations=args.iterations, inputs=args.inputs, seed=args.seed, batch_size=args.batch_size,
+        result_cache=args.with_cache, env={k: v for k, v in os.environ.items()
+                                           if k.endswith(('_ENGINE', '_ENABLED', '_ANSWER_TABLE', '_WINDOW_MS'))}
+    )}
+    if 'cold_start' in groups:
+        print("Measuring cold start...")
+        results['cold_start'] = bench_cold_start(list(SERVICES) + ['app'], args.cold_runs)
+    if 'services' in groups:
+        print("Measuring service predict latency and batch throughput...")
+        results['predict'], results['batch'] = bench_services(
+            full_payloads, quick_payloads, args.iterations, batch_full_payloads, batch_quick_payloads,
+            args.batch_repeats)
+    if 'routes' in groups:
+        print("Measuring end-to-end route latency...")
+        results['routes'] = bench_routes(full_payloads, quick_payloads, args.iterations)
+
+    path = write_results(results, args.out)
+    print(f"SUCCESS: results written to {path}")
+    for group in ('cold_start', 'predict', 'routes'):
+        for name, s in results.get(group, {}).items():
+            print(f"  {group:<10} {name:<16} p50={s.get('p50_ms')} ms  p99={s.get('p99_ms')} ms")
+    for name, s in results.get('batch', {}).items():
+        print(f"  {'batch':<10} {name:<16} {s['rows_per_sec']} rows/s "
+              f"({s['mode']}, {s['batch_size']} rows, {s['unique_rows']} unique)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
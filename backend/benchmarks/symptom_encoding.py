@@ -0,0 +1,177 @@
+"""
+Encoding time of the quick-checkup training data: the legacy iterrows() loops of the
+training scripts against src/utils/symptom_encoding.py, on symptom-disease.csv repeated
+--scales times (1x = 4,858 rows).
+
+    sorted_severity  - legacy_scripts/train_quick_checkup_sorted.py
+    bag_train_model  - notebooks/notebook/train_model.py (raw values, stripped)
+    bag_investigate  - legacy_scripts/investigate_data.py (cleaned values)
+
+Every vectorized result is checked to be identical to the legacy one (values, dtype,
+index and columns; the sparse variants after densifying) before it is timed. The legacy
+loops take minutes at 100x; --legacy-max-scale skips them above that scale.
+
+Example, from the backend folder:
+    python benchmarks/symptom_encoding.py --scales 1,10,100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.common import DATASETS_DIR, run_metadata, write_results
+from src.utils.symptom_encoding import bag_of_symptoms, clean_symptom_frame, sorted_severity_matrix
+
+DATA_PATH = os.path.join(DATASETS_DIR, 'quick_checkup', 'symptom-disease.csv')
+SEVERITY_PATH = os.path.join(DATASETS_DIR, 'quick_checkup', 'Symptom-severity.csv')
+
+
+# -- The previous encoders, kept as the baseline --
+
+def legacy_sorted_severity(df, symptom_weights):
+    X_list = []
+    symptom_cols = [col for col in df.columns if 'Symptom' in col]
+    for i, row in df.iterrows():
+        weights = []
+        for col in symptom_cols:
+            symptom = row[col]
+            if pd.notna(symptom) and symptom in symptom_weights:
+                weights.append(symptom_weights[symptom])
+            elif pd.notna(symptom):
+                weights.append(0)
+        weights.sort(reverse=True)
+        while len(weights) < 17:
+            weights.append(0)
+        weights = weights[:17]
+        X_list.append(weights)
+    return np.array(X_list)
+
+
+def legacy_bag_train_model(df):
+    symptom_cols = [col for col in df.columns if 'Symptom' in col]
+    all_symptoms = df[symptom_cols].values.flatten()
+    unique_symptoms = sorted(list(set([s.strip() for s in all_symptoms if pd.notna(s) and str(s).strip() != ''])))
+    X = pd.DataFrame(0, index=df.index, columns=unique_symptoms)
+    for i, row in df.iterrows():
+        row_symptoms = [str(val).strip() for val in row[symptom_cols].values if pd.notna(val)]
+        for sym in row_symptoms:
+            if sym in unique_symptoms:
+                X.at[i, sym] = 1
+    return X
+
+
+def legacy_bag_investigate(df):
+    all_symptoms = set()
+    symptom_cols = [col for col in df.columns if 'Symptom' in col]
+    for col in symptom_cols:
+        all_symptoms.update(df[col].dropna().unique())
+    feature_names = sorted(list(all_symptoms))
+    encoded_df = pd.DataFrame(0, index=df.index, columns=feature_names)
+    for i, row in df.iterrows():
+        for col in symptom_cols:
+            symptom = row[col]
+            if pd.notna(symptom) and symptom in feature_names:
+                encoded_df.at[i, symptom] = 1
+    return encoded_df
+
+
+# -- Benchmark --
+
+def load_inputs(scale):
+    raw = pd.read_csv(DATA_PATH)
+    raw = pd.concat([raw] * scale, ignore_index=True)
+    severity = clean_symptom_frame(pd.read_csv(SEVERITY_PATH)[['Symptom']])
+    weights = dict(zip(severity['Symptom'], pd.read_csv(SEVERITY_PATH)['weight']))
+    return raw, clean_symptom_frame(raw), weights
+
+
+def encoders(raw, clean, weights):
+    """name -> (legacy fn, vectorized fn, vectorized sparse fn); all return comparable results."""
+    return {
+        'sorted_severity': (
+            lambda: legacy_sorted_severity(clean, weights),
+            lambda: sorted_severity_matrix(clean, weights),
+            lambda: sorted_severity_matrix(clean, weights, sparse=True),
+        ),
+        'bag_train_model': (
+            lambda: legacy_bag_train_model(raw),
+            lambda: bag_of_symptoms(raw)[0],
+            lambda: bag_of_symptoms(raw, sparse=True)[0],
+        ),
+        'bag_investigate': (
+            lambda: legacy_bag_investigate(clean),
+            lambda: bag_of_symptoms(clean)[0],
+            lambda: bag_of_symptoms(clean, sparse=True)[0],
+        ),
+    }
+
+
+def identical(expected, actual):
+    if isinstance(expected, pd.DataFrame):
+        return (isinstance(actual, pd.DataFrame) and expected.index.equals(actual.index)
+                and list(expected.columns) == list(actual.columns)
+                and (expected.dtypes == actual.dtypes).all() and np.array_equal(expected.values, actual.values))
+    return expected.dtype == actual.dtype and expected.shape == actual.shape and np.array_equal(expected, actual)
+
+
+def densify(expected, sparse_matrix):
+    dense = sparse_matrix.toarray()
+    if isinstance(expected, pd.DataFrame):
+        return pd.DataFrame(dense, index=expected.index, columns=expected.columns)
+    return dense
+
+
+def timed(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs vectorized symptom encoding.")
+    parser.add_argument('--scales', default='1,10,100', help="Dataset repetitions (comma-separated).")
+    parser.add_argument('--legacy-max-scale', type=int, default=100, help="Skip the legacy loops above this scale.")
+    parser.add_argument('--repeat', type=int, default=3, help="Vectorized runs per scale (best is kept).")
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/encoding-<commit>-<time>.json).")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',')]
+    results = {'meta': run_metadata(scales=scales, legacy_max_scale=args.legacy_max_scale)}
+    ok = True
+    for scale in scales:
+        raw, clean, weights = load_inputs(scale)
+        per_scale = results[f'{scale}x'] = {'rows': len(raw)}
+        for name, (legacy, vectorized, vectorized_sparse) in encoders(raw, clean, weights).items():
+            entry = per_scale[name] = {}
+            dense_s, dense = timed(vectorized, args.repeat)
+            sparse_s, sparse = timed(vectorized_sparse, args.repeat)
+            entry['vectorized_s'] = round(dense_s, 4)
+            entry['vectorized_sparse_s'] = round(sparse_s, 4)
+            if scale <= args.legacy_max_scale:
+                legacy_s, expected = timed(legacy, 1)
+                entry['legacy_s'] = round(legacy_s, 3)
+                entry['speedup'] = round(legacy_s / dense_s, 1)
+                entry['identical'] = identical(expected, dense) and identical(expected, densify(expected, sparse))
+                ok = ok and entry['identical']
+            print(f"{scale:>4}x {len(raw):>8} rows  {name:<16} legacy {entry.get('legacy_s', '-'):>9} s   "
+                  f"vectorized {entry['vectorized_s']:>8} s (sparse {entry['vectorized_sparse_s']} s)   "
+                  f"speedup {entry.get('speedup', '-')}x   identical {entry.get('identical', '-')}")
+    print(f"Results written to {write_results(results, args.out, prefix='encoding')}")
+
+    print("SUCCESS: vectorized encodings are identical to the legacy loops." if ok
+          else "FAILURE: a vectorized encoding differs from the legacy loop.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Lets tests/ import the backend packages (src, scripts) when pytest runs from the backend folder.
@@ -1,6 +1,6 @@
 import pandas as pd
-import numpy as np
 import os
+import sys
 from sklearn.model_selection import cross_val_score, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier
 
@@ -8,12 +8,14 @@ from sklearn.ensemble import RandomForestClassifier
 BASE_DIR = os.getcwd()
 DATA_PATH = os.path.join(BASE_DIR, 'backend/notebooks/datasets/quick_checkup/symptom-disease.csv')
 
+sys.path.append(os.path.join(BASE_DIR, 'backend'))
+from src.utils.symptom_encoding import bag_of_symptoms, clean_symptom_frame
+
 print(f"Loading data from {DATA_PATH}...")
 df = pd.read_csv(DATA_PATH)
 
 # Clean column names and values
-for col in df.columns:
-    df[col] = df[col].str.replace('_',' ').str.strip()
+df = clean_symptom_frame(df)
 
 print(f"Original shape: {df.shape}")
 
@@ -30,20 +32,8 @@ print(f"Shape after dropping duplicates: {df_deduped.shape}")
 print("\nDuplicates distribution by Disease (Top 5):")
 print(df[df.duplicated()]['Disease'].value_counts().head())
 
-# Preprocessing for Bag of Symptoms (reusing logic for consistency)
-all_symptoms = set()
-symptom_cols = [col for col in df.columns if 'Symptom' in col]
-for col in symptom_cols:
-    unique_vals = df[col].dropna().unique()
-    all_symptoms.update(unique_vals)
-feature_names = sorted(list(all_symptoms))
-
-encoded_df = pd.DataFrame(0, index=df.index, columns=feature_names)
-for i, row in df.iterrows():
-    for col in symptom_cols:
-        symptom = row[col]
-        if pd.notna(symptom) and symptom in feature_names:
-            encoded_df.at[i, symptom] = 1
+# Preprocessing for Bag of Symptoms (same encoding as notebooks/notebook/train_model.py)
+encoded_df, feature_names = bag_of_symptoms(df)
 encoded_df['Disease'] = df['Disease']
 
 X = encoded_df.drop('Disease', axis=1)
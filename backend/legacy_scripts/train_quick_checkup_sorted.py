@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+import sys
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
@@ -14,13 +15,15 @@ MODEL_DIR = os.path.join(BASE_DIR, 'backend/assets/models/quick_checkup')
 MODEL_PATH = os.path.join(MODEL_DIR, 'rf_QuickCheckup.joblib')
 WEIGHTS_PATH = os.path.join(MODEL_DIR, 'symptom_weights.joblib')
 
+sys.path.append(os.path.join(BASE_DIR, 'backend'))
+from src.utils.symptom_encoding import clean_symptom_frame, sorted_severity_matrix
+
 print(f"Loading data from {DATA_PATH}...")
 df = pd.read_csv(DATA_PATH)
 severity_df = pd.read_csv(SEVERITY_PATH)
 
 # Clean column names and values in dataset
-for col in df.columns:
-    df[col] = df[col].str.replace('_',' ').str.strip()
+df = clean_symptom_frame(df)
 
 # Create Symptom -> Weight Map
 # Clean severity strings too (remove underscores)
@@ -30,38 +33,10 @@ symptom_weights = dict(zip(severity_df['Symptom'], severity_df['weight']))
 print(f"Loaded {len(symptom_weights)} symptom weights.")
 
 # Preprocessing: Convert Symptoms to Sorted Weights
-X_list = []
-y_list = []
-
-symptom_cols = [col for col in df.columns if 'Symptom' in col]
-
-for i, row in df.iterrows():
-    weights = []
-    for col in symptom_cols:
-        symptom = row[col]
-        if pd.notna(symptom) and symptom in symptom_weights:
-            weights.append(symptom_weights[symptom])
-        elif pd.notna(symptom):
-            # Unknown symptom? Assign 0 or log warning?
-            # For now, 0
-            weights.append(0)
-    
-    # CRITICAL FIX: SORT DESCENDING
-    # This ensures [HighSev, LowSev] and [LowSev, HighSev] become the same vector
-    weights.sort(reverse=True)
-    
-    # Pad to 17
-    while len(weights) < 17:
-        weights.append(0)
-    
-    # If > 17 (unlikely given columns), truncate
-    weights = weights[:17]
-    
-    X_list.append(weights)
-    y_list.append(row['Disease'])
-
-X = np.array(X_list)
-y = np.array(y_list)
+# Unknown symptoms weigh 0; weights are sorted descending so [HighSev, LowSev] and
+# [LowSev, HighSev] become the same vector, then padded/truncated to 17
+X = sorted_severity_matrix(df, symptom_weights)
+y = np.array(df['Disease'].tolist())
 
 print(f"Training shape: {X.shape}")
 
@@ -1,3 +1,4 @@
+import argparse
 import os 
 import sys
 
@@ -11,6 +12,22 @@ logger = setup_logger(__name__)
 app = create_app()
 
 if __name__ == "__main__":
-    logger.info("Starting Unified Backend Server on port 5000")
-    # Run single process
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False) 
+    parser = argparse.ArgumentParser(description="Unified Backend Server")
+    parser.add_argument('mode', nargs='?', choices=['dev', 'serve'], default='dev',
+                        help="'dev' runs the Flask development server, 'serve' the pre-forking production server.")
+    parser.add_argument('--host', default=os.getenv('BACKEND_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('BACKEND_PORT', '5000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('BACKEND_WORKERS', str(os.cpu_count() or 2))),
+                        help="Worker processes forked by 'serve'.")
+    parser.add_argument('--report-interval', type=float, default=float(os.getenv('BACKEND_MEMORY_REPORT_SECONDS', '0')),
+                        help="Log a per-worker memory report every N seconds (0 = only on SIGUSR1).")
+    args = parser.parse_args()
+
+    if args.mode == 'serve':
+        from src.serve import serve
+        logger.info(f"Starting Unified Backend Server on port {args.port} with {args.workers} workers")
+        serve(app, args.host, args.port, args.workers, args.report_interval)
+    else:
+        logger.info(f"Starting Unified Backend Server on port {args.port}")
+        # Run single process
+        app.run(host=args.host, port=args.port, debug=True, use_reloader=False)
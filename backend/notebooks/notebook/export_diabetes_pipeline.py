@@ -0,0 +1,88 @@
+import argparse
+import hashlib
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'datasets', 'full_checkup', 'diabetes-dataset.csv'))
+MODELS_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', '..', 'assets', 'models', 'full_checkup', 'diabetes_models'))
+SVC_PATH = os.path.join(MODELS_DIR, 'svc_diabetes.joblib')
+PIPELINE_PATH = os.path.join(MODELS_DIR, 'diabetes_pipeline.joblib')
+
+# Bump when the artifact layout changes; DiabetesService refuses versions it does not know.
+FORMAT_VERSION = 1
+
+# Columns used: [Glucose, BloodPressure, BMI, Age] -> Indices [1, 2, 5, 7]
+FEATURE_COLUMNS = [1, 2, 5, 7]
+FEATURE_NAMES = ['Glucose', 'BloodPressure', 'BMI', 'Age']
+
+
+def fit_scaler(dataset_path=DATASET_PATH):
+    """Refits the MinMaxScaler exactly the way the model was trained."""
+    raw_df = pd.read_csv(dataset_path)
+    X = raw_df.iloc[:, FEATURE_COLUMNS].values
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(X)
+    return scaler
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export(dataset_path=DATASET_PATH, svc_path=SVC_PATH, out_path=PIPELINE_PATH):
+    """Bundles the fitted scaler and the trained SVC into one versioned artifact."""
+    scaler = fit_scaler(dataset_path)
+    svc = joblib.load(svc_path)
+
+    artifact = {
+        'format_version': FORMAT_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'feature_names': FEATURE_NAMES,
+        'dataset_sha256': file_sha256(dataset_path),
+        'pipeline': Pipeline([('scaler', scaler), ('svc', svc)]),
+    }
+    joblib.dump(artifact, out_path)
+    print(f"Saved diabetes pipeline (v{FORMAT_VERSION}, sklearn {sklearn.__version__}) to {out_path}")
+
+
+def verify(dataset_path=DATASET_PATH, pipeline_path=PIPELINE_PATH):
+    """Checks the persisted scaler against one refit from the CSV. Returns True on match."""
+    artifact = joblib.load(pipeline_path)
+    persisted = artifact['pipeline'].named_steps['scaler']
+    expected = fit_scaler(dataset_path)
+
+    ok = True
+    for attr in ('data_min_', 'data_max_', 'scale_', 'min_'):
+        if not np.array_equal(getattr(persisted, attr), getattr(expected, attr)):
+            print(f"MISMATCH: scaler.{attr} differs from the CSV-derived scaler")
+            ok = False
+
+    if artifact.get('dataset_sha256') != file_sha256(dataset_path):
+        print("WARNING: dataset has changed since the pipeline was exported.")
+
+    print("SUCCESS: persisted scaler matches the CSV-derived scaler." if ok else "FAILURE: re-run the export.")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or verify the diabetes scaler+SVC pipeline artifact.")
+    parser.add_argument('--verify', action='store_true', help="Compare the saved scaler with one refit from the CSV.")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify() else 1)
+    export()
+    verify()
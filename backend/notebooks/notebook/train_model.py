@@ -1,7 +1,7 @@
 import pandas as pd
-import numpy as np
 import joblib
 import os
+import sys
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
@@ -16,32 +16,20 @@ if not os.path.exists(ASSETS_DIR):
 
 DATA_PATH = os.path.join(DATASET_DIR, 'symptom-disease.csv')
 
+sys.path.append(os.path.normpath(os.path.join(BASE_DIR, '..', '..')))
+from src.utils.symptom_encoding import bag_of_symptoms, symptom_vocabulary
+
 print("Loading data...")
 df = pd.read_csv(DATA_PATH)
 
-# Get all symptom columns (exclude Disease)
-symptom_cols = [col for col in df.columns if 'Symptom' in col]
-
-# 1. Collect all unique symptoms
+# 1. Collect all unique symptoms (stripped, deduplicated, sorted)
 print("Extracting unique symptoms...")
-all_symptoms = df[symptom_cols].values.flatten()
-# FIX: Use set() to deduplicate
-unique_symptoms = sorted(list(set([s.strip() for s in all_symptoms if pd.notna(s) and str(s).strip() != ''])))
+unique_symptoms = symptom_vocabulary(df)
 print(f"Found {len(unique_symptoms)} unique symptoms.")
 
-# 2. Create Bag of Symptoms (One-Hot / Multi-label)
-# Initialize zero matrix
-X = pd.DataFrame(0, index=df.index, columns=unique_symptoms)
-
-# Fill 1s where symptom exists
+# 2. Create Bag of Symptoms (One-Hot / Multi-label): 1 where the row lists the symptom
 print("Encoding data...")
-for i, row in df.iterrows():
-    # Get symptoms for this row
-    row_symptoms = [str(val).strip() for val in row[symptom_cols].values if pd.notna(val)]
-    # Set 1 for these symptoms
-    for sym in row_symptoms:
-        if sym in unique_symptoms:
-            X.at[i, sym] = 1
+X, unique_symptoms = bag_of_symptoms(df, vocabulary=unique_symptoms)
 
 y = df['Disease']
 
@@ -0,0 +1,314 @@
+"""
+Per-route throughput and latency report from the JSON access log (logs/access.log).
+
+Streams any number of log files (plain, .gz, or - for stdin) line by line in constant
+memory: latencies go into log-bucketed histograms (percentiles within --relative-error)
+instead of being kept, and each time window is printed and dropped as soon as the log
+has moved --lateness windows past it. Records that arrive later than that (e.g. from a
+prefork worker that flushed late) are counted as late, not silently merged.
+
+Run from the backend folder:
+    python scripts/access_log_report.py logs/access.log --window 60
+    python scripts/access_log_report.py logs/access.log.3.gz logs/access.log --format csv --slo-ms 250
+    cat logs/access.log | python scripts/access_log_report.py - --route /full-checkup --models
+"""
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import sys
+import time
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speedup
+    _loads = json.loads
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+class LogHistogram:
+    """
+    Latency histogram with geometrically growing buckets: every value lands in a bucket
+    whose bounds are within `relative_error` of it, so percentiles are accurate to that
+    relative error in a number of buckets that grows with log(max/min), not with count.
+    """
+    __slots__ = ('gamma', 'log_gamma', 'min_value', 'buckets', 'count', 'total', 'max')
+
+    def __init__(self, relative_error=0.01, min_value=0.001):
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        index = 0 if value <= self.min_value else math.ceil(math.log(value / self.min_value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100.0 * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                if index == 0:
+                    return self.min_value
+                # Midpoint (in relative terms) of the bucket's bounds
+                return min(self.max, self.min_value * self.gamma ** index * 2 / (1 + self.gamma))
+        return self.max
+
+
+class RouteStats:
+    __slots__ = ('relative_error', 'latency', 'statuses_4xx', 'statuses_5xx', 'within_slo', 'models')
+
+    def __init__(self, relative_error):
+        self.relative_error = relative_error
+        self.latency = LogHistogram(relative_error)
+        self.statuses_4xx = 0
+        self.statuses_5xx = 0
+        self.within_slo = 0
+        self.models = {}    # model -> LogHistogram
+
+    def add(self, record, slo_ms, with_models):
+        duration = record['duration_ms']
+        self.latency.add(duration)
+        status = record.get('status', 0)
+        if status >= 500:
+            self.statuses_5xx += 1
+        elif status >= 400:
+            self.statuses_4xx += 1
+        if slo_ms is not None and duration <= slo_ms and status < 500:
+            self.within_slo += 1
+        if with_models:
+            for model, ms in (record.get('model_ms') or {}).items():
+                if ms is None:
+                    continue
+                hist = self.models.get(model)
+                if hist is None:
+                    hist = self.models[model] = LogHistogram(self.relative_error)
+                hist.add(ms)
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.statuses_4xx += other.statuses_4xx
+        self.statuses_5xx += other.statuses_5xx
+        self.within_slo += other.within_slo
+        for model, hist in other.models.items():
+            if model not in self.models:
+                self.models[model] = LogHistogram(self.relative_error)
+            self.models[model].merge(hist)
+
+
+def read_records(paths, stats):
+    """Yields access records from every file in order; counts unparseable lines."""
+    for path in paths:
+        if path == '-':
+            f = sys.stdin.buffer
+        elif path.endswith('.gz'):
+            f = gzip.open(path, 'rb')
+        else:
+            f = open(path, 'rb')
+        try:
+            for line in f:
+                if not line.startswith(b'{'):
+                    stats['skipped'] += 1
+                    continue
+                try:
+                    record = _loads(line)
+                    record['ts'], record['route'], record['duration_ms']
+                except (ValueError, KeyError, TypeError):
+                    stats['skipped'] += 1
+                    continue
+                yield record
+        finally:
+            if f is not sys.stdin.buffer:
+                f.close()
+
+
+class Report:
+    """Windowed aggregation; closed windows are handed to `emit(window_start, route, stats)`."""
+
+    def __init__(self, window, lateness, emit, slo_ms=None, with_models=False, routes=None, relative_error=0.01):
+        self.window = window
+        self.lateness = lateness
+        self.emit = emit
+        self.slo_ms = slo_ms
+        self.with_models = with_models
+        self.routes = set(routes) if routes else None
+        self.relative_error = relative_error
+        self.open = {}          # window start -> {route: RouteStats}
+        self.closed_before = None
+        self.totals = {}        # route -> RouteStats over the whole log
+        self.first_ts = None
+        self.last_ts = None
+        self.counts = {'records': 0, 'late': 0, 'skipped': 0}
+
+    def add(self, record):
+        route = record['route']
+        if self.routes is not None and route not in self.routes:
+            return
+        ts = record['ts']
+        start = ts - ts % self.window
+        if self.closed_before is not None and start < self.closed_before:
+            self.counts['late'] += 1
+            return
+        self.counts['records'] += 1
+        self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+        routes = self.open.get(start)
+        if routes is None:
+            routes = self.open[start] = {}
+            self._close_older_than(start - self.lateness * self.window)
+        stats = routes.get(route)
+        if stats is None:
+            stats = routes[route] = RouteStats(self.relative_error)
+        stats.add(record, self.slo_ms, self.with_models)
+
+    def _close_older_than(self, limit):
+        for start in sorted(s for s in self.open if s < limit):
+            self._close(start)
+            self.closed_before = start + self.window
+
+    def _close(self, start):
+        for route, stats in sorted(self.open.pop(start).items()):
+            self.emit(start, route, stats)
+            total = self.totals.get(route)
+            if total is None:
+                total = self.totals[route] = RouteStats(self.relative_error)
+            total.merge(stats)
+
+    def finish(self):
+        for start in sorted(self.open):
+            self._close(start)
+
+
+def row(window_start, route, stats, seconds, percentiles, slo_ms, with_models):
+    n = stats.latency.count
+    out = {
+        'window': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(window_start)) if window_start is not None else 'total',
+        'route': route,
+        'requests': n,
+        'rps': round(n / seconds, 3) if seconds else None,
+        'errors_5xx': stats.statuses_5xx,
+        'errors_4xx': stats.statuses_4xx,
+        'mean_ms': round(stats.latency.total / n, 3) if n else None,
+    }
+    for p in percentiles:
+        value = stats.latency.percentile(p)
+        out[f'p{p:g}_ms'] = round(value, 3) if value is not None else None
+    out['max_ms'] = round(stats.latency.max, 3)
+    if slo_ms is not None:
+        out['slo_ok'] = round(stats.within_slo / n, 5) if n else None
+    if with_models:
+        # One column, so the table/CSV layout does not depend on which models a route calls
+        out['model_p95_ms'] = ';'.join(f'{model}={hist.percentile(95):.3f}'
+                                       for model, hist in sorted(stats.models.items()) if hist.count) or None
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency percentiles per route and time window.")
+    parser.add_argument('paths', nargs='+', help="Access log files (.gz allowed, - for stdin), oldest first.")
+    parser.add_argument('--window', type=float, default=60.0, help="Window length in seconds.")
+    parser.add_argument('--lateness', type=int, default=2,
+                        help="Windows kept open for out-of-order records before they are reported.")
+    parser.add_argument('--percentiles', default=','.join(str(p) for p in DEFAULT_PERCENTILES),
+                        help="Comma-separated percentiles (default: %(default)s).")
+    parser.add_argument('--route', action='append', help="Only this route (repeatable).")
+    parser.add_argument('--slo-ms', type=float, help="Also report the share of non-5xx requests within this latency.")
+    parser.add_argument('--models', action='store_true', help="Add per-model p95 columns.")
+    parser.add_argument('--relative-error', type=float, default=0.01, help="Percentile accuracy.")
+    parser.add_argument('--format', choices=('table', 'csv', 'jsonl'), default='table')
+    parser.add_argument('--no-windows', action='store_true', help="Only print the per-route totals.")
+    args = parser.parse_args()
+
+    percentiles = tuple(float(p) for p in args.percentiles.split(','))
+    writer = _Writer(args.format)
+
+    def emit(start, route, stats):
+        if not args.no_windows:
+            writer.write(row(start, route, stats, args.window, percentiles, args.slo_ms, args.models))
+
+    report = Report(args.window, args.lateness, emit, args.slo_ms, args.models, args.route, args.relative_error)
+    for record in read_records(args.paths, report.counts):
+        report.add(record)
+    report.finish()
+
+    span = covered = 0
+    if report.first_ts is not None:
+        span = report.last_ts - report.first_ts
+        # Totals use the same time base as the windows (whole windows covered)
+        covered = (report.last_ts - report.last_ts % args.window + args.window) - (report.first_ts - report.first_ts % args.window)
+    for route, stats in sorted(report.totals.items()):
+        writer.write(row(None, route, stats, covered, percentiles, args.slo_ms, args.models))
+    writer.close()
+
+    counts = report.counts
+    print(f"{counts['records']} records over {span:.0f} s, {counts['late']} late (beyond --lateness), "
+          f"{counts['skipped']} unparseable lines skipped.", file=sys.stderr)
+    return 0
+
+
+class _Writer:
+    """Streams rows as table, CSV or JSON lines; the column set is fixed by the first row."""
+
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.columns = None
+        self._csv = None
+
+    def write(self, out):
+        if self.fmt == 'jsonl':
+            print(json.dumps(out))
+            return
+        if self.columns is None:
+            self.columns = list(out)
+            if self.fmt == 'csv':
+                self._csv = csv.DictWriter(sys.stdout, self.columns, extrasaction='ignore')
+                self._csv.writeheader()
+            else:
+                print('  '.join(f'{c:>{self._width(c)}}' for c in self.columns))
+        if self.fmt == 'csv':
+            self._csv.writerow(out)
+        else:
+            print('  '.join(f'{_cell(out.get(c)):>{self._width(c)}}' for c in self.columns))
+
+    @staticmethod
+    def _width(column):
+        return 20 if column in ('window', 'route') else max(8, len(column))
+
+    def close(self):
+        sys.stdout.flush()
+
+
+def _cell(value):
+    return '-' if value is None else str(value)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        # Output piped into e.g. `head`: stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
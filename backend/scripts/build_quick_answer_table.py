@@ -0,0 +1,50 @@
+"""
+Build step for the quick-checkup answer table.
+
+Enumerates every sorted-weight vector reachable with up to N symptoms, runs the random
+forest once over all of them and stores vector -> (disease, description, precautions)
+next to the model as quick_answer_table.joblib. QuickCheckupService loads it at startup
+(or rebuilds it in memory if the model, weights or CSVs have changed since).
+
+Run from the backend folder:
+    python scripts/build_quick_answer_table.py --max-symptoms 4
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from src.services import quick_answer_table
+from src.services.quick_checkup_service import QuickCheckupService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the quick-checkup answer table.")
+    # The service only loads a table built for its $QUICK_CHECKUP_TABLE_SYMPTOMS
+    parser.add_argument('--max-symptoms', type=int,
+                        default=int(os.getenv('QUICK_CHECKUP_TABLE_SYMPTOMS', quick_answer_table.DEFAULT_MAX_SYMPTOMS)),
+                        help="Largest number of symptoms a request can carry (default: %(default)s).")
+    args = parser.parse_args()
+
+    service = QuickCheckupService(answer_table=False)
+    if not service.model or not service.symptom_weights:
+        print("FAILURE: quick-checkup model or weights missing, nothing to build.")
+        return 1
+
+    start = time.perf_counter()
+    answers = service.build_answer_table(args.max_symptoms)
+    elapsed = time.perf_counter() - start
+
+    quick_answer_table.save_answer_table(
+        service.answer_table_path, answers, service.source_fingerprint(), args.max_symptoms
+    )
+    diseases = len({disease for disease, _, _ in answers.values()})
+    print(f"Saved {len(answers)} vectors ({diseases} distinct diseases) to {service.answer_table_path} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Differential check: the compiled tree engine must reproduce sklearn's predictions exactly.
+
+Runs both the heart disease GradientBoosting model and the quick-checkup RandomForest over
+their training datasets (plus rows sitting exactly on split thresholds) and compares the
+compiled engine against `model.predict`, single rows and whole batches.
+
+Run from the backend folder:
+    python scripts/verify_tree_engine.py
+"""
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from src.services.tree_engine import CompiledTreeEnsemble
+
+FULL_DATA = os.path.join(BACKEND_DIR, 'notebooks', 'datasets', 'full_checkup')
+QUICK_DATA = os.path.join(BACKEND_DIR, 'notebooks', 'datasets', 'quick_checkup')
+HEART_MODEL = os.path.join(BACKEND_DIR, 'assets', 'models', 'full_checkup', 'heartd_models', 'heartD_model.joblib')
+QUICK_MODEL = os.path.join(BACKEND_DIR, 'assets', 'models', 'quick_checkup', 'rf_QuickCheckup.joblib')
+QUICK_WEIGHTS = os.path.join(BACKEND_DIR, 'assets', 'models', 'quick_checkup', 'symptom_weights.joblib')
+
+
+def heart_inputs():
+    df = pd.read_csv(os.path.join(FULL_DATA, 'HeartD-dataset.csv'))
+    return df.drop(columns=['target']).to_numpy(dtype=float)
+
+
+def quick_inputs():
+    """Sorted-severity vectors of symptom-disease.csv, encoded like train_quick_checkup_sorted.py."""
+    weights = joblib.load(QUICK_WEIGHTS)
+    df = pd.read_csv(os.path.join(QUICK_DATA, 'symptom-disease.csv'))
+    symptom_cols = [col for col in df.columns if 'Symptom' in col]
+    X = []
+    for row in df[symptom_cols].itertuples(index=False):
+        w = [weights.get(str(s).replace('_', ' ').strip(), 0) for s in row if pd.notna(s)]
+        w.sort(reverse=True)
+        X.append((w + [0] * 17)[:17])
+    return np.array(X, dtype=float), df['Disease'].str.strip().to_numpy()
+
+
+def threshold_inputs(engine, base, n=200, seed=0):
+    """Rows with one feature set exactly to a split threshold, to exercise the `<=` edge."""
+    rng = np.random.default_rng(seed)
+    internal = np.flatnonzero(np.isfinite(engine.threshold))
+    picks = rng.choice(internal, size=min(n, len(internal)), replace=False)
+    rows = base[rng.integers(0, len(base), size=len(picks))].copy()
+    rows[np.arange(len(picks)), engine.feature[picks]] = engine.threshold[picks]
+    return rows
+
+
+def compare(name, model, X):
+    engine = CompiledTreeEnsemble(model)
+    X = np.vstack([X, threshold_inputs(engine, X)])
+
+    expected = model.predict(X)
+    batch = engine.predict(X)
+    single = np.array([engine.predict(X[i:i + 1])[0] for i in range(len(X))])
+
+    ok = np.array_equal(expected, batch) and np.array_equal(expected, single)
+    if model.__class__.__name__ == 'GradientBoostingClassifier':
+        ok = ok and np.array_equal(model.decision_function(X), engine.decision_function(X))
+
+    t0 = time.perf_counter()
+    for i in range(200):
+        model.predict(X[i:i + 1])
+    t_sklearn = (time.perf_counter() - t0) / 200 * 1e6
+    t0 = time.perf_counter()
+    for i in range(200):
+        engine.predict(X[i:i + 1])
+    t_engine = (time.perf_counter() - t0) / 200 * 1e6
+
+    status = "SUCCESS" if ok else "FAILURE"
+    print(f"{status}: {name}: {len(X)} rows, compiled == sklearn -> {ok} "
+          f"(single-row predict: sklearn {t_sklearn:.0f} us, compiled {t_engine:.0f} us)")
+    return ok
+
+
+if __name__ == "__main__":
+    import warnings
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+    results = [compare('heartD_model (GradientBoosting)', joblib.load(HEART_MODEL), heart_inputs())]
+
+    X_quick, y_quick = quick_inputs()
+    if os.path.exists(QUICK_MODEL):
+        rf = joblib.load(QUICK_MODEL)
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+        print(f"{QUICK_MODEL} not found, fitting a stand-in forest on the same data.")
+        rf = RandomForestClassifier(random_state=42).fit(X_quick, y_quick)
+    results.append(compare('rf_QuickCheckup (RandomForest)', rf, X_quick))
+
+    sys.exit(0 if all(results) else 1)
@@ -1,11 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+import random
+import sys
+import threading
 import time
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
 from flask_cors import CORS 
 
+# Run as a script from the backend folder (python src/api/full_checkup.py): make `src` importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.utils import metrics
+
 app = Flask(__name__)
 
 # Enable CORS for the app
@@ -58,34 +68,342 @@ def prepare_data_for_models(data):
 
     return stroke_data, heartd_data, diabetes_data
 
+# -- Fan-out tuning --
+# Overall budget of one /full-checkup fan-out, retries and backoff included
+FANOUT_DEADLINE_SECONDS = float(os.getenv('FANOUT_DEADLINE_SECONDS', '5'))
+# Upper bound of a single attempt (connect and read), further capped by the deadline
+REQUEST_TIMEOUT_SECONDS = float(os.getenv('FANOUT_REQUEST_TIMEOUT_SECONDS', '5'))
+MAX_ATTEMPTS = int(os.getenv('FANOUT_MAX_ATTEMPTS', '3'))
+# Full-jitter exponential backoff: sleep uniform(0, min(MAX, BASE * 2**attempt))
+BACKOFF_BASE_SECONDS = float(os.getenv('FANOUT_BACKOFF_BASE_SECONDS', '0.1'))
+BACKOFF_MAX_SECONDS = float(os.getenv('FANOUT_BACKOFF_MAX_SECONDS', '1'))
+# Keep-alive connections kept per downstream service
+POOL_SIZE = int(os.getenv('FANOUT_POOL_SIZE', '32'))
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '32'))
+
+# Circuit breaker: open after N consecutive failures, probe again after the reset period
+BREAKER_ENABLED = os.getenv('FANOUT_BREAKER_ENABLED', '1') != '0'
+BREAKER_FAILURES = int(os.getenv('FANOUT_BREAKER_FAILURES', '5'))
+BREAKER_RESET_SECONDS = float(os.getenv('FANOUT_BREAKER_RESET_SECONDS', '10'))
+
+# Hedging: if the primary has not answered after its recent p95 latency, send the same
+# call to the replica (<NAME>_API_REPLICA_URL) and take whichever answers first
+HEDGE_ENABLED = os.getenv('FANOUT_HEDGE_ENABLED', '0') == '1'
+HEDGE_DEFAULT_DELAY_MS = float(os.getenv('FANOUT_HEDGE_DELAY_MS', '50'))    # until enough samples
+HEDGE_MIN_DELAY_MS = float(os.getenv('FANOUT_HEDGE_MIN_DELAY_MS', '5'))
+HEDGE_PERCENTILE = float(os.getenv('FANOUT_HEDGE_PERCENTILE', '95'))
+HEDGE_WINDOW = int(os.getenv('FANOUT_HEDGE_WINDOW', '256'))   # recent latencies kept per downstream
+
+# Optional second replica of each service, used for hedging and when the primary's breaker is open
+REPLICA_URLS = {
+    url: replica for url, replica in (
+        (STROKE_API_URL, os.getenv('STROKE_API_REPLICA_URL')),
+        (HEARTD_API_URL, os.getenv('HEARTD_API_REPLICA_URL')),
+        (DIABETES_API_URL, os.getenv('DIABETES_API_REPLICA_URL')),
+    ) if replica
+}
+
+class DownstreamError(Exception):
+    """A call that did not produce an answer; `retryable` is False when retrying is pointless."""
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker of one downstream.
+
+    closed: calls pass. After `failure_threshold` consecutive failures it opens: calls
+    are rejected at once instead of waiting on a dead service. After `reset_seconds` it
+    goes half-open and lets a single probe call through; success closes it again,
+    failure re-opens it for another period.
+    """
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURES, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def _transition(self, state):
+        # Caller holds the lock
+        logging.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+        self.state = state
+        metrics.registry.inc('downstream_breaker_transitions_total', (self.name, state))
+
+    def allow(self):
+        """Whether a call may go out now (claims the single half-open probe slot)."""
+        if not BREAKER_ENABLED:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self._transition(self.OPEN)
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
+
+class Downstream:
+    """
+    Pooled keep-alive HTTP client for one model service, with its circuit breaker and a
+    window of recent latencies (for the hedge delay).
+
+    One Session per downstream, so repeated calls reuse TCP connections instead of doing
+    a handshake per request. urllib3's pool is thread-safe; up to `pool_size` connections
+    are kept open.
+    """
+    def __init__(self, url, name=None, pool_size=POOL_SIZE):
+        self.url = url
+        self.name = name or url
+        self.pool_size = pool_size
+        self.session = self._new_session()
+        self.breaker = CircuitBreaker(self.name)
+        self._latencies = deque(maxlen=HEDGE_WINDOW)
+
+    def _new_session(self):
+        session = requests.Session()
+        # Retries are done by request_prediction, within the fan-out deadline
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def post(self, payload, timeout):
+        return self.session.post(self.url, json=payload, timeout=timeout)
+
+    def call(self, payload, timeout):
+        """
+        One attempt, recorded in the breaker and the metrics. Returns the decoded body (also
+        for 4xx answers, which a retry would not change); raises DownstreamError otherwise.
+        """
+        labels = (self.name,)
+        start = time.perf_counter()
+        try:
+            response = self.post(payload, timeout)
+            if response.status_code >= 500:
+                raise DownstreamError(f"HTTP {response.status_code}")
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError, DownstreamError) as e:
+            self.breaker.record_failure()
+            metrics.registry.inc('downstream_requests_total', (self.name, 'error'))
+            raise e if isinstance(e, DownstreamError) else DownstreamError(str(e))
+        elapsed = time.perf_counter() - start
+        self._latencies.append(elapsed)
+        self.breaker.record_success()
+        metrics.registry.inc('downstream_requests_total', (self.name, 'ok'))
+        metrics.registry.observe('downstream_request_duration_seconds', labels, elapsed)
+        return body
+
+    def hedge_delay(self):
+        """Seconds to wait for this downstream before hedging: its recent p95 latency."""
+        samples = sorted(self._latencies)
+        if len(samples) < 20:
+            return HEDGE_DEFAULT_DELAY_MS / 1000.0
+        p95 = samples[min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100.0))]
+        return max(HEDGE_MIN_DELAY_MS / 1000.0, p95)
+
+    def reset(self):
+        # Pooled sockets must not be shared with a forked child
+        self.session = self._new_session()
+
+_downstreams = {}
+_downstreams_lock = threading.Lock()
+_hedge_stats = {}   # downstream name -> {'sent': n, 'replica_wins': n}
+
+def get_downstream(api_url, name=None):
+    """The shared client for `api_url` (created on first use)."""
+    downstream = _downstreams.get(api_url)
+    if downstream is None:
+        with _downstreams_lock:
+            downstream = _downstreams.get(api_url)
+            if downstream is None:
+                downstream = _downstreams[api_url] = Downstream(api_url, name)
+    return downstream
+
+for _name, _url in (('stroke', STROKE_API_URL), ('heartd', HEARTD_API_URL), ('diabetes', DIABETES_API_URL)):
+    get_downstream(_url, _name)
+    if _url in REPLICA_URLS:
+        get_downstream(REPLICA_URLS[_url], f'{_name}_replica')
+
+def _breaker_states():
+    return {(d.name,): CircuitBreaker.STATE_VALUES[d.breaker.state] for d in list(_downstreams.values())}
+
+metrics.registry.register_gauge('downstream_breaker_state', _breaker_states)
+
+# One process-wide pool for the fan-out instead of one per request, and a separate one
+# for the racing primary/replica calls of hedged requests (a fan-out task waits on them)
+def _new_executor():
+    return ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+
+def _new_hedge_executor():
+    return ThreadPoolExecutor(max_workers=FANOUT_WORKERS * 2, thread_name_prefix='fanout-hedge')
+
+executor = _new_executor()
+hedge_executor = _new_hedge_executor()
+
+def _after_fork():
+    global executor, hedge_executor
+    executor = _new_executor()
+    hedge_executor = _new_hedge_executor()
+    for downstream in _downstreams.values():
+        downstream.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+def _record_hedge(primary, winner):
+    metrics.registry.inc('downstream_hedges_total', (primary.name, winner))
+    with _downstreams_lock:
+        stats = _hedge_stats.setdefault(primary.name, {'sent': 0, 'replica_wins': 0})
+        stats['sent'] += 1
+        if winner == 'replica':
+            stats['replica_wins'] += 1
+
+def _hedged_call(primary, replica, payload, deadline):
+    """Primary first; the replica joins if the primary is slower than its p95. First answer wins."""
+    timeout = min(REQUEST_TIMEOUT_SECONDS, deadline - time.monotonic())
+    first = hedge_executor.submit(primary.call, payload, timeout)
+    try:
+        return first.result(timeout=min(primary.hedge_delay(), max(0.0, deadline - time.monotonic())))
+    except FuturesTimeout:
+        pass
+    if not replica.breaker.allow():
+        try:
+            return first.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            raise DownstreamError('deadline exceeded')
+
+    second = hedge_executor.submit(replica.call, payload, min(REQUEST_TIMEOUT_SECONDS, deadline - time.monotonic()))
+    pending = {first: 'primary', second: 'replica'}
+    error = None
+    while pending:
+        done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            winner = pending.pop(future)
+            try:
+                result = future.result()
+            except DownstreamError as e:
+                error = e
+                continue
+            _record_hedge(primary, winner)
+            return result
+    _record_hedge(primary, 'none')
+    raise error or DownstreamError('deadline exceeded')
+
+def _attempt(api_url, model_data, deadline):
+    """One attempt through the breakers: primary (hedged if enabled), or the replica while it is open."""
+    primary = get_downstream(api_url)
+    replica_url = REPLICA_URLS.get(api_url)
+    replica = get_downstream(replica_url) if replica_url else None
+    timeout = min(REQUEST_TIMEOUT_SECONDS, deadline - time.monotonic())
+
+    if not primary.breaker.allow():
+        metrics.registry.inc('downstream_requests_total', (primary.name, 'rejected'))
+        if replica is not None and replica.breaker.allow():
+            return replica.call(model_data, timeout)
+        # Fail fast: the breaker stays open for longer than any backoff
+        raise DownstreamError(f"circuit open for {primary.name}", retryable=False)
+    if HEDGE_ENABLED and replica is not None:
+        return _hedged_call(primary, replica, model_data, deadline)
+    return primary.call(model_data, timeout)
+
 # Function to make a POST request to an API endpoint with retries
-def request_prediction(api_url, model_data, retries=3, delay=2):
+def request_prediction(api_url, model_data, deadline=None, retries=MAX_ATTEMPTS):
+    """
+    POSTs `model_data` to `api_url`, retrying connection errors, timeouts and 5xx answers
+    with jittered backoff. Never runs past `deadline` (a time.monotonic() value), and
+    fails fast while the service's circuit breaker is open.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + FANOUT_DEADLINE_SECONDS
+    last_error = None
     for i in range(retries):
+        if deadline - time.monotonic() <= 0:
+            break
         try:
-            logging.info(f"Attempt {i+1}: Requesting prediction from {api_url}")
-            response = requests.post(api_url, json=model_data, timeout=5)
-            response.raise_for_status()
-            logging.info(f"Received response from {api_url}: {response.json()}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Attempt {i+1} failed for {api_url}: {e}")
+            logging.debug(f"Attempt {i+1}: Requesting prediction from {api_url}")
+            return _attempt(api_url, model_data, deadline)
+        except DownstreamError as e:
+            last_error = str(e)
+            logging.error(f"Attempt {i+1} failed for {api_url}: {last_error}")
+            if not e.retryable:
+                break
+
+        if i + 1 < retries:
+            delay = backoff_delay(i)
+            if time.monotonic() + delay >= deadline:
+                break
             time.sleep(delay)  # Wait before retrying
-    return {'error': f"Failed to connect to {api_url} after {retries} retries"}
+    return {'error': f"Failed to get a prediction from {api_url} within {FANOUT_DEADLINE_SECONDS:g}s: {last_error or 'deadline exceeded'}"}
+
+def fanout_stats():
+    """Breaker state per downstream and hedge counts / replica win rate per service."""
+    with _downstreams_lock:
+        hedges = {name: dict(stats) for name, stats in _hedge_stats.items()}
+    for stats in hedges.values():
+        stats['replica_win_rate'] = round(stats['replica_wins'] / stats['sent'], 4) if stats['sent'] else 0.0
+    return {
+        'breakers': {d.name: d.breaker.stats() for d in list(_downstreams.values())},
+        'hedging': {'enabled': HEDGE_ENABLED, 'replicas': dict(REPLICA_URLS), 'hedges': hedges},
+    }
 
 # Function to execute parallel requests for predictions
-def parallel_requests(url_data_pairs):
+def parallel_requests(url_data_pairs, deadline_seconds=None):
+    """Fans the calls out on the shared executor; every call shares one deadline."""
+    deadline = time.monotonic() + (deadline_seconds if deadline_seconds is not None else FANOUT_DEADLINE_SECONDS)
+    future_to_url = {
+        executor.submit(request_prediction, url, data, deadline): url for url, data in url_data_pairs
+    }
+    # Small grace period: a read that started just before the deadline may overrun it slightly
+    wait(future_to_url, timeout=max(0.0, deadline - time.monotonic()) + 0.5)
+
     results = {}
-    with ThreadPoolExecutor() as executor:
-        future_to_url = {
-            executor.submit(request_prediction, url, data): url for url, data in url_data_pairs
-        }
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                results[url] = future.result()
-            except Exception as e:
-                logging.error(f"Request to {url} generated an exception: {e}")
-                results[url] = {'error': f"Error in prediction request for {url}"}
+    for future, url in future_to_url.items():
+        if not future.done():
+            future.cancel()
+            logging.error(f"Request to {url} did not finish within the deadline")
+            results[url] = {'error': f"Prediction request for {url} timed out"}
+            continue
+        try:
+            results[url] = future.result()
+        except Exception as e:
+            logging.error(f"Request to {url} generated an exception: {e}")
+            results[url] = {'error': f"Error in prediction request for {url}"}
     return results
 
 # Main route to handle JSON input and route to each model
@@ -130,6 +448,14 @@ def predict():
     else:
         return jsonify({"error": "Request must be JSON"}), 400
 
+@app.route('/fanout/stats', methods=['GET'])
+def fanout_stats_route():
+    return jsonify(fanout_stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 # Run the Flask app with a specific timeout to handle long requests
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5000, threaded=True)
@@ -1,9 +1,21 @@
-from flask import Blueprint, request, jsonify
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Blueprint, Response, g, request, jsonify
 from src.services.diabetes_service import DiabetesService
 from src.services.heart_service import HeartService
 from src.services.stroke_service import StrokeService
 from src.services.quick_checkup_service import QuickCheckupService
+from src.services.micro_batcher import MicroBatcher
+from src.services.patient_input import PatientInput
+from src.services.readiness import ServiceReadiness
+from src.services.result_cache import ResultCache
+from src.services.risk_factor_catalog import RiskFactorCatalog
+from src.utils import metrics, stage_timing
+from src.utils.json_fragments import FragmentTable, dumps
 from src.utils.logger import setup_logger
+from src.utils.stage_timing import stage
 
 # Define Blueprint
 bp = Blueprint('api', __name__)
@@ -11,16 +23,235 @@ logger = setup_logger(__name__)
 
 # -- Service Initialization --
 # We initialize services once at module level to keep the app fast.
-# If these fail, we log critical errors but allow the app to start so `/health` still works.
-try:
-    diabetes_service = DiabetesService()
-    heart_service = HeartService()
-    stroke_service = StrokeService()
-    quick_service = QuickCheckupService()
-except Exception as e:
-    logger.critical(f"Failed to initialize one or more services: {e}")
+# A service that fails is left as None and reported by `/ready`; the app still starts so
+# `/health` and the other services keep working.
+readiness = ServiceReadiness()
+diabetes_service = readiness.load('diabetes', DiabetesService)
+heart_service = readiness.load('heart', HeartService)
+stroke_service = readiness.load('stroke', StrokeService)
+quick_service = readiness.load('quick_checkup', QuickCheckupService)
+
+# Run one prediction per model before serving (also primes the pre-encoded fragments)
+WARMUP_ENABLED = os.getenv('BACKEND_WARMUP', '1') != '0'
+
+# Max patients accepted by /full-checkup/batch in one request
+BATCH_MAX_ROWS = int(os.getenv('FULL_CHECKUP_BATCH_MAX_ROWS', '10000'))
+
+# Total time budget for the three model calls of one /full-checkup request
+FULL_CHECKUP_DEADLINE_MS = float(os.getenv('FULL_CHECKUP_DEADLINE_MS', '2000'))
+
+# Calls a model may have still running past their deadline before further full-checkup
+# requests skip it (answered 'Timeout' at once) until some of them finish.
+FULL_CHECKUP_MAX_OVERDUE = int(os.getenv('FULL_CHECKUP_MAX_OVERDUE', '4'))
+
+# One long-lived pool for the per-model fan-out; sized for a few concurrent requests.
+def _new_model_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('FULL_CHECKUP_WORKERS', '12')),
+        thread_name_prefix='full-checkup'
+    )
+
+model_executor = _new_model_executor()
+
+# model name -> calls that missed their deadline and are still running. A running call
+# cannot be cancelled, so each one holds a pool thread until the model returns.
+_overdue = {}
+_overdue_lock = threading.Lock()
+
+def _overdue_finished(name):
+    with _overdue_lock:
+        _overdue[name] -= 1
+
+def _overdue_calls():
+    with _overdue_lock:
+        return {(name,): count for name, count in _overdue.items()}
+
+metrics.registry.register_gauge('full_checkup_overdue_calls', _overdue_calls)
+
+def _reset_model_executor():
+    # Pool threads are not copied into forked workers (src/serve.py); give each its own pool
+    global model_executor, _overdue, _overdue_lock
+    model_executor = _new_model_executor()
+    _overdue, _overdue_lock = {}, threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_model_executor)
+
+def _timed_call(fn, arg):
+    start = time.perf_counter()
+    result = fn(arg)
+    return result, round((time.perf_counter() - start) * 1000.0, 3)
+
+def _model_call(name, fn, arg):
+    """fn(arg), with its duration noted for the request's access log record."""
+    result, elapsed_ms = _timed_call(fn, arg)
+    g.model_ms = {name: elapsed_ms}
+    return result
+
+def _fan_out(calls, deadline_ms=None):
+    """
+    Runs `{name: (fn, arg)}` concurrently on the shared executor.
+
+    Returns (results, timings_ms, timed_out): calls that miss the deadline are reported
+    in `timed_out` without a result. The deadline bounds the response time only: a call
+    already running keeps its pool thread until it returns (counted in _overdue), and a
+    model with FULL_CHECKUP_MAX_OVERDUE such calls is not called at all, so one stuck
+    model cannot take every thread of the pool.
+    """
+    shed = []
+    if deadline_ms:
+        with _overdue_lock:
+            shed = [name for name in calls if _overdue.get(name, 0) >= FULL_CHECKUP_MAX_OVERDUE]
+        for name in shed:
+            metrics.registry.inc('full_checkup_shed_total', (name,))
+    futures = {
+        name: stage_timing.submit(model_executor, _timed_call, fn, arg)
+        for name, (fn, arg) in calls.items() if name not in shed
+    }
+    timeout = deadline_ms / 1000.0 if deadline_ms else None
+    wait(futures.values(), timeout=timeout)
+
+    results, timings_ms, timed_out = {}, {}, list(shed)
+    for name, future in futures.items():
+        if not future.done():
+            timed_out.append(name)
+            # cancel() only succeeds for a call still queued behind busy threads
+            if not future.cancel():
+                with _overdue_lock:
+                    _overdue[name] = _overdue.get(name, 0) + 1
+                future.add_done_callback(lambda _, name=name: _overdue_finished(name))
+            continue
+        try:
+            results[name], timings_ms[name] = future.result()
+        except Exception as e:
+            logger.exception(f"{name} prediction raised")
+            results[name], timings_ms[name] = {'error': str(e)}, None
+    return results, timings_ms, timed_out
+
+# Service response keys behind each full-checkup section: (Prediksi, Saran, Faktor Risiko)
+_SECTION_FIELDS = {
+    'Stroke': ('prediksi_stroke', 'saran_stroke', 'faktor_risiko_stroke'),
+    'Heart Disease': ('prediksi_heartd', 'saran_heartd', 'faktor_risiko_heartd'),
+    'Diabetes': ('prediksi_diabetes', 'saran_diabetes', 'faktor_risiko_diabetes'),
+}
+
+def _predictor(name, service, method='predict'):
+    """The service's predict method, or a stand-in answering with an error if it failed to load."""
+    if service is None:
+        error = {'error': f"{name} model not loaded"}
+        return lambda _: error
+    return getattr(service, method)
+
+def _unavailable(name):
+    return jsonify({'error': f"{name} model not loaded"}), 503
+
+def _section(name, res):
+    prediksi, saran, faktor = _SECTION_FIELDS[name]
+    section = {
+        'Prediksi': res.get(prediksi, 'Error'),
+        'Saran': res.get(saran, 'N/A'),
+        'Faktor Risiko': res.get(faktor, 'N/A')
+    }
+    # Say what went wrong, down to the offending payload fields for invalid input
+    if 'error' in res:
+        section['error'] = res['error']
+    if 'fields' in res:
+        section['fields'] = res['fields']
+    return section
+
+def _row_error(res):
+    """The error message and, for invalid input, the offending fields of one batch row."""
+    return {key: res[key] for key in ('error', 'fields') if key in res}
+
+def _combine_results(stroke_res, heart_res, diabetes_res):
+    """Groups the three service responses into the per-disease shape the frontend expects."""
+    return {
+        'Stroke': _section('Stroke', stroke_res),
+        'Heart Disease': _section('Heart Disease', heart_res),
+        'Diabetes': _section('Diabetes', diabetes_res)
+    }
+
+# -- Pre-encoded response fragments --
+# Every advice response is known in advance (one per model class), so its JSON is encoded
+# once per catalog generation and spliced into the body instead of re-encoded per request.
+_fragment_tables = {}   # key -> (source it was built from, FragmentTable)
+
+def _fragments(key, source, key_field, build_dicts):
+    # Rebuilt whenever the service hands out a new source (catalog reload, new index)
+    cached = _fragment_tables.get(key)
+    if cached is None or cached[0] is not source:
+        cached = (source, FragmentTable(key_field, build_dicts(source)))
+        _fragment_tables[key] = cached
+    return cached[1]
+
+def _section_fragment(name, service, section):
+    """Raw JSON for a full-checkup section if it is one of the service's pre-rendered answers."""
+    table = _fragments(('section', name), service.responses.responses(), 'Prediksi',
+                       lambda responses: [_section(name, r) for r in responses.values()])
+    return table.lookup(section)
+
+def _service_fragment(name, service, result):
+    """Raw JSON for a single-model endpoint response, or the response itself."""
+    if 'error' in result:
+        return result
+    table = _fragments(('service', name), service.responses.responses(), _SECTION_FIELDS[name][0],
+                       lambda responses: list(responses.values()))
+    return table.lookup(result) or result
+
+def _quick_fragment(result):
+    """Raw JSON for a quick-checkup answer of a disease with known details."""
+    table = _fragments(('quick',), quick_service.disease_index, 'Disease', lambda index: [
+        {'Disease': disease, 'Description': desc, 'Precautions': list(precautions)}
+        for disease, (desc, precautions) in index.items()
+    ])
+    return table.lookup(result) or result
+
+def _warm_up_services():
+    """Warm-up prediction per service, plus the JSON fragments its responses are served from."""
+    def classifier(name, service):
+        def warm():
+            result = service.warm_up()
+            _section_fragment(name, service, _section(name, result))
+            _service_fragment(name, service, result)
+        return warm
+
+    def quick():
+        _quick_fragment(quick_service.warm_up())
+
+    steps = (
+        ('diabetes', diabetes_service, classifier('Diabetes', diabetes_service)),
+        ('heart', heart_service, classifier('Heart Disease', heart_service)),
+        ('stroke', stroke_service, classifier('Stroke', stroke_service)),
+        ('quick_checkup', quick_service, quick),
+    )
+    for name, service, warm in steps:
+        if service is None:
+            continue
+        if WARMUP_ENABLED:
+            readiness.warm_up(name, warm)
+        else:
+            readiness.skip_warm_up(name, service.check_loaded)
+
+_warm_up_services()
+
+def _respond(payload, status=200, fragment=None):
+    """
+    JSON response assembled from pre-encoded fragments (Raw values) and the dynamic parts.
+
+    `fragment` optionally swaps the whole payload for its pre-encoded form. Stage timings
+    are added to the body first when asked to, so such a payload no longer matches.
+    """
+    timings = stage_timing.current()
+    if timings is not None and timings.debug_body:
+        payload['debug_timings'] = timings.snapshot()
+    if fragment is not None:
+        payload = fragment(payload)
+    with stage('serialize'):
+        body = dumps(payload) + b'\n'
+    return Response(body, status=status, mimetype='application/json')
 
 @bp.route('/full-checkup', methods=['POST'])
+@stage_timing.instrument
 def full_checkup():
     """
     Aggregates predictions from Stroke, Heart, and Diabetes models.
@@ -28,40 +259,98 @@ def full_checkup():
     if not request.is_json:
         return jsonify({"error": "Content-Type must be application/json"}), 400
         
-    data = request.get_json()
+    with stage('parse'):
+        # Validated and coerced once here instead of once per service
+        patient = PatientInput.parse(request.get_json())
     logger.info("Processing Full Checkup request...")
     
-    # Run predictions sequentially (could be parallelized if latency is an issue, 
-    # but for local ML models this is usually micro-seconds).
-    
-    stroke_res = stroke_service.predict(data)
-    heart_res = heart_service.predict(data)
-    diabetes_res = diabetes_service.predict(data)
-    
+    # Run the three models concurrently; a model that misses the deadline is reported
+    # as timed out instead of holding up the other two.
+    start = time.perf_counter()
+    results, timings_ms, timed_out = _fan_out({
+        'Stroke': (_predictor('Stroke', stroke_service), patient),
+        'Heart Disease': (_predictor('Heart Disease', heart_service), patient),
+        'Diabetes': (_predictor('Diabetes', diabetes_service), patient),
+    }, FULL_CHECKUP_DEADLINE_MS)
+    g.model_ms, g.timed_out = timings_ms, timed_out
+
+    combined = _combine_results(
+        results.get('Stroke', {}),
+        results.get('Heart Disease', {}),
+        results.get('Diabetes', {})
+    )
+    for name in timed_out:
+        combined[name]['Prediksi'] = 'Timeout'
+        combined[name]['timed_out'] = True
+    for name, service in (('Stroke', stroke_service), ('Heart Disease', heart_service), ('Diabetes', diabetes_service)):
+        if service is not None and name not in timed_out:
+            combined[name] = _section_fragment(name, service, combined[name]) or combined[name]
+    if timed_out:
+        logger.warning(f"Full Checkup models timed out after {FULL_CHECKUP_DEADLINE_MS:.0f} ms: {', '.join(timed_out)}")
+
     # Structure the response to match what the frontend expects
     response_payload = {
-        'results': {
-            'Stroke': {
-                'Prediksi': stroke_res.get('prediksi_stroke', 'Error'),
-                'Saran': stroke_res.get('saran_stroke', 'N/A'),
-                'Faktor Risiko': stroke_res.get('faktor_risiko_stroke', 'N/A')
-            },
-            'Heart Disease': {
-                'Prediksi': heart_res.get('prediksi_heartd', 'Error'),
-                'Saran': heart_res.get('saran_heartd', 'N/A'),
-                'Faktor Risiko': heart_res.get('faktor_risiko_heartd', 'N/A')
-            },
-            'Diabetes': {
-                'Prediksi': diabetes_res.get('prediksi_diabetes', 'Error'),
-                'Saran': diabetes_res.get('saran_diabetes', 'N/A'),
-                'Faktor Risiko': diabetes_res.get('faktor_risiko_diabetes', 'N/A')
-            }
+        'results': combined,
+        'meta': {
+            'timings_ms': timings_ms,
+            'timed_out': timed_out,
+            'deadline_ms': FULL_CHECKUP_DEADLINE_MS,
+            'total_ms': round((time.perf_counter() - start) * 1000.0, 3)
         }
     }
     
-    return jsonify(response_payload), 200
+    return _respond(response_payload, 200)
+
+@bp.route('/full-checkup/batch', methods=['POST'])
+def full_checkup_batch():
+    """
+    Scores a JSON array of patient payloads (e.g. a clinic screening roster).
+    Each model runs once over the whole batch; results come back in input order.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 400
+
+    rows = request.get_json()
+    if not isinstance(rows, list):
+        return jsonify({"error": "Request body must be a JSON array of patient objects."}), 400
+    if len(rows) > BATCH_MAX_ROWS:
+        return jsonify({"error": f"Batch too large ({len(rows)} rows, max {BATCH_MAX_ROWS})."}), 413
+
+    logger.info(f"Processing Full Checkup batch of {len(rows)} patients...")
+    # Parse each patient once for all three models; non-objects are reported by predict_batch
+    rows = [PatientInput.parse(row) if isinstance(row, dict) else row for row in rows]
+
+    # No deadline here: a roster is scored as a whole, the fan-out just overlaps the models.
+    batch_results, timings_ms, _ = _fan_out({
+        'Stroke': (_predictor('Stroke', stroke_service, 'predict_batch'), rows),
+        'Heart Disease': (_predictor('Heart Disease', heart_service, 'predict_batch'), rows),
+        'Diabetes': (_predictor('Diabetes', diabetes_service, 'predict_batch'), rows),
+    })
+    g.model_ms = timings_ms
+    # A service that raised (or failed to load) returns one error dict; spread it over every row
+    for name, res in batch_results.items():
+        if not isinstance(res, list):
+            batch_results[name] = [res] * len(rows)
+    stroke_results = batch_results['Stroke']
+    heart_results = batch_results['Heart Disease']
+    diabetes_results = batch_results['Diabetes']
+
+    results = []
+    for i, (stroke_res, heart_res, diabetes_res) in enumerate(zip(stroke_results, heart_results, diabetes_results)):
+        row = {'index': i, 'results': _combine_results(stroke_res, heart_res, diabetes_res)}
+        errors = {
+            name: _row_error(res)
+            for name, res in (('Stroke', stroke_res), ('Heart Disease', heart_res), ('Diabetes', diabetes_res))
+            if 'error' in res
+        }
+        if errors:
+            row['errors'] = errors
+        results.append(row)
+
+    return jsonify({'results': results, 'meta': {'timings_ms': timings_ms}}), 200
 
 @bp.route('/quick-checkup', methods=['POST'])
+@stage_timing.instrument
 def quick_checkup():
     """
     Simple symptom-based checkup.
@@ -69,7 +358,8 @@ def quick_checkup():
     if not request.is_json:
         return jsonify({"error": "Content-Type must be application/json"}), 400
         
-    data = request.get_json()
+    with stage('parse'):
+        data = request.get_json()
     
     # Extract known symptom keys (Symptom_1 ... Symptom_17)
     # The frontend usually sends up to 4 or 5, but our model supports 17 slots.
@@ -81,25 +371,60 @@ def quick_checkup():
     
     if not symptoms:
          return jsonify({"error": "No symptoms provided."}), 400
+    if quick_service is None:
+        return _unavailable('Quick Checkup')
          
-    result = quick_service.predict(symptoms)
+    result = _model_call('Quick Checkup', quick_service.predict, symptoms)
     
     if result.get('error'):
-        return jsonify(result), 500
+        return _respond(result, 500)
         
-    return jsonify(result), 200
+    return _respond(result, 200, _quick_fragment)
 
 # -- Legacy / Individual Endpoints for Debugging --
 # These can be useful if we want to test models in isolation without running the full aggregator.
 
 @bp.route('/fc-stroke', methods=['POST'])
 def check_stroke_only():
-    return jsonify(stroke_service.predict(request.get_json() or {}))
+    if stroke_service is None:
+        return _unavailable('Stroke')
+    result = _model_call('Stroke', stroke_service.predict, request.get_json() or {})
+    return _respond(result, fragment=lambda r: _service_fragment('Stroke', stroke_service, r))
 
 @bp.route('/fc-heartd', methods=['POST'])
 def check_heart_only():
-    return jsonify(heart_service.predict(request.get_json() or {}))
+    if heart_service is None:
+        return _unavailable('Heart Disease')
+    result = _model_call('Heart Disease', heart_service.predict, request.get_json() or {})
+    return _respond(result, fragment=lambda r: _service_fragment('Heart Disease', heart_service, r))
 
 @bp.route('/fc-diabetes', methods=['POST'])
 def check_diabetes_only():
-    return jsonify(diabetes_service.predict(request.get_json() or {}))
+    if diabetes_service is None:
+        return _unavailable('Diabetes')
+    result = _model_call('Diabetes', diabetes_service.predict, request.get_json() or {})
+    return _respond(result, fragment=lambda r: _service_fragment('Diabetes', diabetes_service, r))
+
+@bp.route('/risk-factors/stats', methods=['GET'])
+def risk_factor_stats():
+    """Hit/reload counters of the shared risk factor catalog(s)."""
+    return jsonify(RiskFactorCatalog.all_stats())
+
+@bp.route('/micro-batching/stats', methods=['GET'])
+def micro_batching_stats():
+    """Batch-size and queue-depth histograms of every model's micro-batcher."""
+    return jsonify(MicroBatcher.all_stats())
+
+@bp.route('/result-cache/stats', methods=['GET'])
+def result_cache_stats():
+    """Hit/miss/eviction counters of every service's prediction result cache."""
+    return jsonify(ResultCache.all_stats())
+
+@bp.route('/ready', methods=['GET'])
+def ready():
+    """
+    Per-service load and warm-up state. 200 once every model is loaded and warmed up,
+    503 otherwise (unlike `/health`, which only says the process is up).
+    """
+    report = readiness.report()
+    return jsonify(report), 200 if report['status'] == 'ready' else 503
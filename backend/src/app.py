@@ -1,6 +1,8 @@
-from flask import Flask
+import time
+from flask import Flask, Response, g, request
 from flask_cors import CORS
-from src.utils.logger import setup_logger
+from src.utils import access_log, metrics
+from src.utils.logger import clear_request_route, set_request_route, setup_logger
 from src.api.routes import bp
 
 logger = setup_logger(__name__)
@@ -11,12 +13,44 @@ def create_app():
     
     # Enable CORS for all routes (Unified)
     # allowing 3000 (React devs), 3001 (Next.js fallback), 5000 (self)
-    CORS(app, resources={r"/*": {"origins": "*"}}) # Allow all for simplicity in dev/competition env, or strict list
+    CORS(app, resources={r"/*": {"origins": "*"}}, # Allow all for simplicity in dev/competition env, or strict list
+         expose_headers=[access_log.REQUEST_ID_HEADER])
     
     app.register_blueprint(bp)
     
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.request_started_at = time.time()
+        g.request_id = access_log.request_id(request.headers.get(access_log.REQUEST_ID_HEADER))
+        # Per-route sampling of hot-path info logs (src/utils/logger.py)
+        set_request_route(request.url_rule.rule if request.url_rule is not None else None)
+
+    @app.teardown_request
+    def unbind_route(exc=None):
+        clear_request_route()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            duration = time.perf_counter() - start
+            # Label by URL rule, not raw path, so label cardinality stays bounded
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.observe_request(route, request.method, response.status_code, duration)
+            # Per-model timings are noted by the routes that call models
+            access_log.log_request(g.request_id, request.method, route, response.status_code,
+                                   g.request_started_at, duration, g.get('model_ms'), g.get('timed_out'))
+            response.headers[access_log.REQUEST_ID_HEADER] = g.request_id
+        return response
+
     @app.route('/health')
     def health():
         return {"status": "ok"}
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        # With `main.py serve` any worker may answer; each reports the sum over all workers
+        return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
         
     return app
@@ -0,0 +1,192 @@
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from werkzeug.serving import make_server
+from src.utils import metrics
+from src.utils.logger import collect_worker_logs, flush_logging, setup_logger
+
+logger = setup_logger(__name__)
+
+# A worker that dies sooner than this after being forked is restarted with a delay,
+# so a crash loop does not spin the supervisor.
+MIN_WORKER_UPTIME = 1.0
+RESTART_DELAY = 1.0
+
+
+def read_memory(pid):
+    """
+    RSS / PSS / USS / shared (KiB) of a process from /proc/<pid>/smaps_rollup.
+
+    PSS splits shared pages between the processes mapping them, so summing PSS across the
+    workers shows whether the model memory is really shared. Returns None off Linux.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'uss_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+    }
+
+
+class PreforkServer:
+    """
+    Production server: loads the app once, then forks workers that share it copy-on-write.
+
+    The parent binds the listening socket, freezes every object created while loading the
+    models into the permanent GC generation (so collections in the workers do not write to
+    those pages), and forks `workers` children. Each child runs a threaded werkzeug server
+    on the inherited socket; the kernel spreads incoming connections across them. The
+    parent only supervises: it writes the log files for every worker, restarts crashed
+    workers and logs a per-worker memory report on SIGUSR1 or every `report_interval` seconds.
+    """
+
+    def __init__(self, app, host='0.0.0.0', port=5000, workers=2, report_interval=0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, int(workers))
+        self.report_interval = report_interval
+
+        self.sock = None
+        self.workers = {}       # pid -> fork timestamp
+        self._stopping = False
+        self._report_requested = False
+
+    def run(self):
+        if not hasattr(os, 'fork'):
+            logger.warning("os.fork is not available on this platform, serving from a single process.")
+            make_server(self.host, self.port, self.app, threaded=True).serve_forever()
+            return
+
+        self.sock = socket.create_server((self.host, self.port), reuse_port=False, backlog=1024)
+        self.sock.set_inheritable(True)
+
+        # Everything allocated so far (models, catalogs, answer tables) is shared with the workers.
+        gc.collect()
+        gc.freeze()
+
+        # The workers send their log records here, so only this process writes and rotates the files
+        collect_worker_logs()
+        # A scrape of /metrics reaches any one worker; each answers with the sum over all of them
+        metrics_dir = tempfile.mkdtemp(prefix='backend-metrics-')
+        metrics.registry.share_across_workers(metrics_dir)
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, self._handle_report)
+
+        logger.info(f"Prefork server listening on {self.host}:{self.port} with {self.num_workers} workers (parent pid {os.getpid()}).")
+        try:
+            for _ in range(self.num_workers):
+                self._spawn()
+            self._supervise()
+        finally:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()  # never returns
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}.")
+
+    def _run_worker(self):
+        # Default signal handling in the child: SIGTERM stops it, SIGINT is left to the parent.
+        # SIGUSR1 is ignored: only the parent writes the memory report, and the default
+        # action would kill a worker sent it (e.g. `pkill -USR1 -f "main.py serve"`).
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        code = 0
+        try:
+            server = make_server(self.host, self.port, self.app, threaded=True, fd=self.sock.fileno())
+            server.serve_forever()
+        except BaseException:
+            logger.exception(f"Worker {os.getpid()} crashed")
+            code = 1
+        finally:
+            flush_logging()     # os._exit skips atexit, which would drain the log queue
+            os._exit(code)
+
+    def _supervise(self):
+        next_report = time.monotonic() + self.report_interval if self.report_interval > 0 else None
+        while self.workers:
+            if self._report_requested:
+                self._report_requested = False
+                self.log_memory_report()
+            if next_report is not None and time.monotonic() >= next_report:
+                next_report = time.monotonic() + self.report_interval
+                self.log_memory_report()
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+
+            started = self.workers.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            logger.error(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting.")
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(RESTART_DELAY)
+            self._spawn()
+
+        logger.info("All workers stopped.")
+
+    def _handle_stop(self, signum, frame):
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"Received signal {signum}, stopping {len(self.workers)} workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _handle_report(self, signum, frame):
+        self._report_requested = True
+
+    def memory_report(self):
+        """Per-process memory of the parent and every worker."""
+        report = {'parent': {'pid': os.getpid(), **(read_memory(os.getpid()) or {})}, 'workers': []}
+        for pid in sorted(self.workers):
+            report['workers'].append({'pid': pid, **(read_memory(pid) or {})})
+        workers = report['workers']
+        report['total_worker_rss_kb'] = sum(w.get('rss_kb', 0) for w in workers)
+        report['total_worker_pss_kb'] = sum(w.get('pss_kb', 0) for w in workers)
+        return report
+
+    def log_memory_report(self):
+        report = self.memory_report()
+        parent = report['parent']
+        logger.info(f"Memory parent {parent['pid']}: rss={parent.get('rss_kb', '?')} KiB pss={parent.get('pss_kb', '?')} KiB")
+        for w in report['workers']:
+            logger.info(
+                f"Memory worker {w['pid']}: rss={w.get('rss_kb', '?')} KiB pss={w.get('pss_kb', '?')} KiB "
+                f"uss={w.get('uss_kb', '?')} KiB shared={w.get('shared_kb', '?')} KiB"
+            )
+        logger.info(f"Memory workers total: rss={report['total_worker_rss_kb']} KiB pss={report['total_worker_pss_kb']} KiB")
+        return report
+
+
+def serve(app, host='0.0.0.0', port=5000, workers=2, report_interval=0):
+    PreforkServer(app, host, port, workers, report_interval).run()
+    sys.exit(0)
@@ -0,0 +1,68 @@
+import os
+import threading
+from src.services.result_cache import artifact_version
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ArtifactWatcher:
+    """
+    Reloads a service's model when the files it was loaded from change on disk.
+
+    Like RiskFactorCatalog's watcher: a daemon thread compares artifact_version() of the
+    files every $MODEL_POLL_SECONDS (0 disables it) and calls `reload()` when it differs,
+    so request threads never stat or load files. The service swaps the new artifacts in
+    and bumps its model_version, which drops its result cache. Under `main.py serve` each
+    worker reloads its own copy, so a reloaded model is no longer shared copy-on-write.
+    """
+    _instances = []
+    _instances_lock = threading.Lock()
+
+    def __init__(self, name, paths, reload, poll_interval=None):
+        self.name = name
+        self.paths = tuple(paths)
+        self.reload = reload
+        if poll_interval is None:
+            poll_interval = float(os.getenv('MODEL_POLL_SECONDS', '5'))
+        self.poll_interval = poll_interval
+
+        self._seen = artifact_version(*self.paths)
+        self._stop = threading.Event()
+        self._start()
+        with ArtifactWatcher._instances_lock:
+            ArtifactWatcher._instances.append(self)
+
+    def _start(self):
+        if self.poll_interval <= 0:
+            return
+        threading.Thread(target=self._watch, name=f'{self.name}-artifacts', daemon=True).start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            version = artifact_version(*self.paths)
+            if version == self._seen:
+                continue
+            # Not retried until the files change again (e.g. a half-written file is completed)
+            self._seen = version
+            logger.info(f"{self.name} model artifacts changed on disk, reloading.")
+            try:
+                self.reload()
+            except Exception:
+                logger.exception(f"Failed to reload the {self.name} model, keeping the loaded one.")
+
+    def close(self):
+        """Stops the background watcher."""
+        self._stop.set()
+
+    @classmethod
+    def _after_fork(cls):
+        # The watcher threads do not survive fork
+        cls._instances_lock = threading.Lock()
+        for watcher in cls._instances:
+            if not watcher._stop.is_set():
+                watcher._start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=ArtifactWatcher._after_fork)
@@ -0,0 +1,54 @@
+import numpy as np
+from src.services.patient_input import PatientInput, PatientInputError
+
+
+def predict_batch(rows, encode, predict_matrix, format_result):
+    """
+    Scores many payloads with a single model call.
+
+    Each payload is encoded on its own so a bad row only fails itself. Identical feature
+    vectors are deduplicated before they are stacked into one matrix, and the predictions
+    are fanned back out in input order.
+
+    Args:
+        rows: List of patient payload dicts (or already parsed PatientInputs).
+        encode: Callable turning one payload into a flat list of floats. Raises on invalid input.
+        predict_matrix: Callable running the model on a 2D array and returning one label per row.
+        format_result: Callable turning one predicted label into the service's response dict.
+
+    Returns:
+        List of response dicts (or {'error': ...} dicts), one per input row.
+    """
+    results = [None] * len(rows)
+    unique_index = {}   # encoded vector -> position in `unique_vectors`
+    unique_vectors = []
+    row_slots = []      # (row position, unique position)
+
+    for i, data in enumerate(rows):
+        if not isinstance(data, (dict, PatientInput)):
+            results[i] = {'error': 'Invalid input: each patient must be a JSON object.'}
+            continue
+        try:
+            vector = tuple(encode(data))
+        except PatientInputError as e:
+            results[i] = {'error': f"Invalid input: {e}", 'fields': e.errors}
+            continue
+        except (TypeError, ValueError) as e:
+            results[i] = {'error': f"Invalid input: {e}"}
+            continue
+
+        slot = unique_index.get(vector)
+        if slot is None:
+            slot = len(unique_vectors)
+            unique_index[vector] = slot
+            unique_vectors.append(vector)
+        row_slots.append((i, slot))
+
+    if unique_vectors:
+        predictions = predict_matrix(np.array(unique_vectors, dtype=float))
+        formatted = [format_result(pred) for pred in predictions]
+        for i, slot in row_slots:
+            # Copy so callers can mutate one row without touching its duplicates
+            results[i] = dict(formatted[slot])
+
+    return results
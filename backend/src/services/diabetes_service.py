@@ -3,7 +3,16 @@ import joblib
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
+from src.services.artifact_watcher import ArtifactWatcher
+from src.services.batch import predict_batch
+from src.services.micro_batcher import MicroBatcher
+from src.services.patient_input import WARMUP_PAYLOAD, PatientInput, PatientInputError
+from src.services.response_table import ResponseTable
+from src.services.result_cache import ResultCache, artifact_version, cached
+from src.services.risk_factor_catalog import RiskFactorCatalog
 from src.utils.logger import setup_logger
+from src.utils.metrics import timed_predict
+from src.utils.stage_timing import stage
 
 logger = setup_logger(__name__)
 
@@ -11,89 +20,187 @@ class DiabetesService:
     """
     Handles Diabetes prediction logic using SVC model.
     """
+    # Artifact layout versions this service knows how to load (see export_diabetes_pipeline.py)
+    SUPPORTED_PIPELINE_VERSIONS = (1,)
+
     def __init__(self):
         cwd = os.getcwd()
-        self.model_path = os.path.join(cwd, 'assets', 'models', 'full_checkup', 'diabetes_models', 'svc_diabetes.joblib')
+        models_dir = os.path.join(cwd, 'assets', 'models', 'full_checkup', 'diabetes_models')
+        self.pipeline_path = os.path.join(models_dir, 'diabetes_pipeline.joblib')
+        self.model_path = os.path.join(models_dir, 'svc_diabetes.joblib')
         self.dataset_path = os.path.join(cwd, 'notebooks', 'datasets', 'full_checkup', 'diabetes-dataset.csv')
         self.risk_factors_path = os.path.join(cwd, 'notebooks', 'datasets', 'full_checkup', 'disease_riskFactors.csv')
         
+        self.catalog = RiskFactorCatalog.shared(self.risk_factors_path)
+
         self.model = None
         self.scaler = None
+        self.model_version = None
         
-        self._init_service()
+        self._install(*self._init_service())
+        self.batcher = MicroBatcher.from_env('diabetes', 'DIABETES', self._predict_matrix)
+        self.cache = ResultCache.from_env('diabetes', 'DIABETES', self._cache_generation)
+        self.responses = ResponseTable(self._render, self._model_classes, self._cache_generation)
+        self.watcher = ArtifactWatcher('diabetes', [self.pipeline_path, self.model_path, self.dataset_path],
+                                       self.reload_model)
 
     def _init_service(self):
-        """Loads model and fits the scaler based on the original dataset."""
+        """
+        Loads the persisted scaler+SVC pipeline, or falls back to refitting the scaler.
+        Returns (model, scaler, model_version); whatever could not be loaded is None.
+        """
         try:
-            if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
+            if os.path.exists(self.pipeline_path):
+                loaded = self._load_pipeline()
+                if loaded is not None:
+                    return loaded
             else:
-                logger.error(f"Diabetes model missing at {self.model_path}")
-                return
-
-            if os.path.exists(self.dataset_path):
-                # We need to recreate the scaler state used during training
-                # This seems inefficient to do on every startup, but necessary if the scaler wasn't saved.
-                # Ideally, we should save/load the scaler object itself (todo for future).
-                raw_df = pd.read_csv(self.dataset_path)
-                # Columns used: [Glucose, BloodPressure, BMI, Age] -> Indices [1, 2, 5, 7]
-                # Double check dataset columns if index based!
-                # Assuming legacy code index [1, 2, 5, 7] is correct for that specific CSV structure.
-                X = raw_df.iloc[:, [1, 2, 5, 7]].values
-                self.scaler = MinMaxScaler(feature_range=(0, 1))
-                self.scaler.fit(X)
-                logger.info("Diabetes service initialized (Model + Scaler).")
-            else:
-                logger.error(f"Training dataset missing at {self.dataset_path}. Cannot initialize scaler.")
+                logger.warning(f"Diabetes pipeline artifact missing at {self.pipeline_path}, falling back to refitting the scaler.")
+            return self._init_legacy()
 
         except Exception as e:
             logger.error(f"Failed to initialize DiabetesService: {e}")
+            return None, None, None
+
+    def _load_pipeline(self):
+        """Loads the versioned artifact written by export_diabetes_pipeline.py. Never reads the dataset."""
+        artifact = joblib.load(self.pipeline_path)
+        version = artifact.get('format_version')
+        if version not in self.SUPPORTED_PIPELINE_VERSIONS:
+            logger.error(f"Unsupported diabetes pipeline format version {version}.")
+            return None
+
+        pipeline = artifact['pipeline']
+        logger.info(f"Diabetes service initialized from pipeline artifact v{version} (sklearn {artifact.get('sklearn_version')}).")
+        return pipeline.named_steps['svc'], pipeline.named_steps['scaler'], artifact_version(self.pipeline_path)
+
+    def _init_legacy(self):
+        """Loads the bare SVC and refits the scaler on the training CSV."""
+        if os.path.exists(self.model_path):
+            model = joblib.load(self.model_path)
+        else:
+            logger.error(f"Diabetes model missing at {self.model_path}")
+            return None, None, None
+
+        if os.path.exists(self.dataset_path):
+            # We need to recreate the scaler state used during training
+            raw_df = pd.read_csv(self.dataset_path)
+            # Columns used: [Glucose, BloodPressure, BMI, Age] -> Indices [1, 2, 5, 7]
+            X = raw_df.iloc[:, [1, 2, 5, 7]].values
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaler.fit(X)
+            logger.info("Diabetes service initialized (Model + Scaler).")
+            return model, scaler, artifact_version(self.model_path, self.dataset_path)
+        else:
+            logger.error(f"Training dataset missing at {self.dataset_path}. Cannot initialize scaler.")
+            return model, None, None
+
+    def _install(self, model, scaler, model_version):
+        # One store swaps the pair _predict_matrix uses, so a reload never mixes old and new
+        self._fitted = (scaler, model)
+        self.model = model
+        self.scaler = scaler
+        # Version last, so nothing predicted by the old model is cached under the new version
+        self.model_version = model_version
 
+    def reload_model(self):
+        """Loads the artifacts again (ArtifactWatcher); keeps serving the current ones on failure."""
+        model, scaler, model_version = self._init_service()
+        if model is None or scaler is None:
+            logger.error("Failed to reload the diabetes model, keeping the loaded one.")
+            return
+        self._install(model, scaler, model_version)
+
+    @timed_predict('diabetes')
     def predict(self, data: dict):
         if not self.model or not self.scaler:
             return {'error': 'Service not fully initialized (Model or Scaler missing).'}
 
         try:
-            # Inputs
-            val_glucose = float(data.get('glucose', 0))
-            val_bp = float(data.get('bloodpressure', 0))
-            val_bmi = float(data.get('bmi', 0))
-            val_age = float(data.get('age', 0))
-
-            # Scale
-            raw_input = np.array([[val_glucose, val_bp, val_bmi, val_age]])
-            scaled_input = self.scaler.transform(raw_input)
-            
-            # Predict
-            # Model returns 1 for Diabetes, 0 for healthy usually
-            pred = self.model.predict(scaled_input)[0]
-            
-            precautions, risk_factors = self._get_context()
-
-            if pred == 1:
-                return {
-                    'prediksi_diabetes': "Anda berkemungkinan terkena Diabetes, harap konsultasikan dengan dokter.",
-                    'saran_diabetes': f"Anda dapat melakukan beberapa hal berikut untuk menurunkan risiko diabetes: {precautions}",
-                    'faktor_risiko_diabetes': f"Hal-hal yang menyebabkan dapat terkena diabetes: {risk_factors}"
-                }
-            else:
-                return {
-                    'prediksi_diabetes': "Anda tidak berkemungkinan terkena Diabetes.",
-                    'saran_diabetes': f"Anda tetap dapat melakukan hal ini untuk mencegah terkena diabetes: {precautions}",
-                    'faktor_risiko_diabetes': f"Hal-hal yang menyebabkan dapat terkena diabetes: {risk_factors}"
-                }
+            with stage('diabetes_encode'):
+                row = self._encode(data)
+            return cached(self.cache, row, lambda: self._format(self._predict_one(row)))
 
+        except PatientInputError as e:
+            return {'error': f"Invalid input: {e}", 'fields': e.errors}
         except Exception as e:
             logger.exception("Diabetes prediction error")
             return {'error': str(e)}
 
-    def _get_context(self):
+    def predict_batch(self, rows: list):
+        """
+        Scores a list of payloads with one scaler transform and one model call.
+        Invalid rows get their own {'error': ...} entry instead of failing the batch.
+        """
+        if not self.model or not self.scaler:
+            return [{'error': 'Service not fully initialized (Model or Scaler missing).'}] * len(rows)
+
         try:
-            if os.path.exists(self.risk_factors_path):
-                df = pd.read_csv(self.risk_factors_path, encoding='latin1')
-                row = df[df['DNAME'] == 'Diabetes']
-                if not row.empty:
-                    return row.iloc[0]['PRECAU'], row.iloc[0]['RISKFAC']
-        except:
-            pass
+            return predict_batch(rows, self._encode, self._predict_matrix, self._format)
+        except Exception as e:
+            logger.exception("Diabetes batch prediction error")
+            return [{'error': str(e)}] * len(rows)
+
+    def check_loaded(self):
+        """Raises if the service cannot predict; cheap, no model call (used when warm-up is off)."""
+        if not self.model or not self.scaler:
+            raise RuntimeError('Service not fully initialized (Model or Scaler missing).')
+
+    def warm_up(self):
+        """
+        Runs one prediction of a fixed sample patient, bypassing the result cache and the
+        request metrics, so the model, micro-batcher and response table are initialised
+        before the first real request. Raises if the service cannot predict.
+        """
+        self.check_loaded()
+        return self._format(self._predict_one(self._encode(WARMUP_PAYLOAD)))
+
+    def _encode(self, data):
+        """Raw (unscaled) feature row: [Glucose, BloodPressure, BMI, Age]."""
+        return PatientInput.coerce(data).diabetes_row()
+
+    def _cache_generation(self):
+        # Cached responses embed the model's prediction and the catalog's advice text
+        return self.model_version, self.catalog.generation
+
+    def _predict_one(self, row):
+        """Single-row predict, coalesced with concurrent requests when micro-batching is on."""
+        with stage('diabetes_predict'):
+            if self.batcher is not None:
+                return self.batcher.predict_row(row)
+            return self._predict_matrix(np.array([row], dtype=float))[0]
+
+    def _predict_matrix(self, X):
+        # Model returns 1 for Diabetes, 0 for healthy usually
+        scaler, model = self._fitted
+        return model.predict(scaler.transform(X))
+
+    def _format(self, prediction):
+        """Response for a predicted class, served from the pre-rendered response table."""
+        return self.responses.format(prediction)
+
+    def _model_classes(self):
+        return self.model.classes_.tolist() if self.model is not None else []
+
+    def _render(self, pred):
+        with stage('diabetes_risk_factors'):
+            precautions, risk_factors = self._get_context()
+
+        if pred == 1:
+            return {
+                'prediksi_diabetes': "Anda berkemungkinan terkena Diabetes, harap konsultasikan dengan dokter.",
+                'saran_diabetes': f"Anda dapat melakukan beberapa hal berikut untuk menurunkan risiko diabetes: {precautions}",
+                'faktor_risiko_diabetes': f"Hal-hal yang menyebabkan dapat terkena diabetes: {risk_factors}"
+            }
+        else:
+            return {
+                'prediksi_diabetes': "Anda tidak berkemungkinan terkena Diabetes.",
+                'saran_diabetes': f"Anda tetap dapat melakukan hal ini untuk mencegah terkena diabetes: {precautions}",
+                'faktor_risiko_diabetes': f"Hal-hal yang menyebabkan dapat terkena diabetes: {risk_factors}"
+            }
+
+    def _get_context(self):
+        entry = self.catalog.lookup('Diabetes')
+        if entry is not None:
+            return entry
         return "Info tidak tersedia", "Info tidak tersedia"
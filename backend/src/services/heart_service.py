@@ -1,32 +1,79 @@
 import os
 import joblib
-import pandas as pd
 import numpy as np
+from src.services.artifact_watcher import ArtifactWatcher
+from src.services.batch import predict_batch
+from src.services.micro_batcher import MicroBatcher
+from src.services.patient_input import WARMUP_PAYLOAD, PatientInput, PatientInputError
+from src.services.response_table import ResponseTable
+from src.services.result_cache import ResultCache, artifact_version, cached
+from src.services.risk_factor_catalog import RiskFactorCatalog
+from src.services.tree_engine import compile_model
 from src.utils.logger import setup_logger
+from src.utils.metrics import timed_predict
+from src.utils.stage_timing import stage
 
 logger = setup_logger(__name__)
 
 class HeartService:
     """
     Service responsible for Heart Disease predictions.
+
+    `engine` selects how the GradientBoosting model is evaluated: 'sklearn' (default) or
+    'compiled' for the flat-array tree engine. Defaults to $HEART_INFERENCE_ENGINE.
     """
-    def __init__(self):
+    def __init__(self, engine=None):
         cwd = os.getcwd()
         self.model_path = os.path.join(cwd, 'assets', 'models', 'full_checkup', 'heartd_models', 'heartD_model.joblib')
         self.risk_factors_path = os.path.join(cwd, 'notebooks', 'datasets', 'full_checkup', 'disease_riskFactors.csv')
         
+        self.catalog = RiskFactorCatalog.shared(self.risk_factors_path)
+
         self.model = None
+        self.engine = engine or os.getenv('HEART_INFERENCE_ENGINE', 'sklearn')
+        self.compiled = None
+        self.model_version = None
         
         # Load immediately on init
         if os.path.exists(self.model_path):
             try:
                 self.model = joblib.load(self.model_path)
+                self.model_version = artifact_version(self.model_path)
                 logger.info(f"Heart disease model loaded.")
             except Exception as e:
                 logger.error(f"Failed to load heart model: {e}")
+
+            if self.model is not None and self.engine == 'compiled':
+                self.compiled = compile_model(self.model)
+                if self.compiled is None:
+                    logger.warning("Heart model cannot be compiled, using sklearn predict.")
+                else:
+                    logger.info(f"Heart model compiled ({self.compiled.n_trees} trees).")
         else:
             logger.error(f"Heart model missing at {self.model_path}")
 
+        self.batcher = MicroBatcher.from_env('heart', 'HEART', self._predict_matrix)
+        self.cache = ResultCache.from_env('heart', 'HEART', self._cache_generation)
+        self.responses = ResponseTable(self._render, self._model_classes, self._cache_generation)
+        self.watcher = ArtifactWatcher('heart', [self.model_path], self.reload_model)
+
+    def reload_model(self):
+        """Loads the model artifact again (ArtifactWatcher); keeps serving the current one on failure."""
+        try:
+            model = joblib.load(self.model_path)
+        except Exception as e:
+            logger.error(f"Failed to reload heart model, keeping the loaded one: {e}")
+            return
+        compiled = compile_model(model) if self.engine == 'compiled' else None
+        if self.engine == 'compiled' and compiled is None:
+            logger.warning("Heart model cannot be compiled, using sklearn predict.")
+        self.model = model
+        self.compiled = compiled
+        # Version last, so nothing predicted by the old model is cached under the new version
+        self.model_version = artifact_version(self.model_path)
+        logger.info("Heart disease model reloaded.")
+
+    @timed_predict('heart')
     def predict(self, data: dict):
         """
         Runs the heart disease prediction model.
@@ -35,61 +82,95 @@ class HeartService:
             return {'error': 'Heart Disease model is not loaded.'}
 
         try:
-            # Extract features safely with defaults
-            # Note: We trust the frontend to send mostly correct types, 
-            # but using safe conversions prevents 500 crashes on bad input.
-            features = [
-                float(data.get('age', 0)),
-                float(data.get('sex', 0)),
-                float(data.get('cp', 0)),
-                float(data.get('bloodpressure', 0)),
-                float(data.get('chol', 0)),
-                float(data.get('fbs', 0)),       # Fasting blood sugar
-                float(data.get('restecg', 0)),   # Resting ECG
-                float(data.get('thalach', 0)),   # Max Heart Rate
-                float(data.get('exang', 0)),     # Angina
-                float(data.get('oldpeak', 0)),   # ST Depression
-                float(data.get('slope', 0)),     # ST Slope
-                float(data.get('ca', 0)),        # Major Vessels
-                float(data.get('thal', 0))       # Thalassemia
-            ]
-            
-            # Scikit-learn expects 2D array
-            input_vector = np.array(features).reshape(1, -1)
-            
-            prediction = self.model.predict(input_vector)[0]
-            
-            # Retrieve advice text
-            precautions, risk_factors = self._get_context_data()
-
-            # Interpret result
-            # Based on existing logic: 1 = Healthy, 0 = Disease? (Or vice versa, sticking to legacy logic)
-            # Legacy logic: if prediction == 1 -> "Tidak memiliki penyakit jantung" (Healthy)
-            if prediction == 1:
-                return {
-                    'prediksi_heartd': 'Pasien kemungkinan besar tidak memiliki penyakit jantung.',
-                    'saran_heartd': f"Anda dapat melakukan beberapa hal berikut untuk mencegah penyakit jantung: {precautions}",
-                    'faktor_risiko_heartd': f"Faktor-faktor risiko untuk penyakit jantung: {risk_factors}"
-                }
-            else:
-                return {
-                    'prediksi_heartd': 'Pasien kemungkinan besar memiliki penyakit jantung.',
-                    'saran_heartd': f"Beberapa langkah pencegahan untuk mengurangi risiko penyakit jantung: {precautions}",
-                    'faktor_risiko_heartd': f"Faktor-faktor risiko untuk penyakit jantung: {risk_factors}"
-                }
+            with stage('heart_encode'):
+                row = self._encode(data)
+            return cached(self.cache, row, lambda: self._format(self._predict_one(row)))
 
+        except PatientInputError as e:
+            return {'error': f"Invalid input: {e}", 'fields': e.errors}
         except Exception as e:
             logger.exception("Unexpected error in HeartService prediction")
             return {'error': "An internal error occurred."}
 
-    def _get_context_data(self):
+    def predict_batch(self, rows: list):
+        """
+        Scores a list of payloads with a single model call.
+        Invalid rows get their own {'error': ...} entry instead of failing the batch.
+        """
+        if not self.model:
+            return [{'error': 'Heart Disease model is not loaded.'}] * len(rows)
+
         try:
-            if os.path.exists(self.risk_factors_path):
-                df = pd.read_csv(self.risk_factors_path, encoding='latin1')
-                row = df[df['DNAME'] == 'Heart attack'] # Using 'Heart attack' as proxy for Heart Disease based on legacy
-                if not row.empty:
-                    return row.iloc[0]['PRECAU'], row.iloc[0]['RISKFAC']
+            return predict_batch(rows, self._encode, self._predict_matrix, self._format)
         except Exception:
-            pass # Silent fail for aux data
+            logger.exception("Unexpected error in HeartService batch prediction")
+            return [{'error': "An internal error occurred."}] * len(rows)
+
+    def check_loaded(self):
+        """Raises if the service cannot predict; cheap, no model call (used when warm-up is off)."""
+        if not self.model:
+            raise RuntimeError('Heart Disease model is not loaded.')
+
+    def warm_up(self):
+        """
+        Runs one prediction of a fixed sample patient, bypassing the result cache and the
+        request metrics, so the model, micro-batcher and response table are initialised
+        before the first real request. Raises if the service cannot predict.
+        """
+        self.check_loaded()
+        return self._format(self._predict_one(self._encode(WARMUP_PAYLOAD)))
+
+    def _encode(self, data):
+        """Model feature row (13 floats); accepts a payload dict or an already parsed PatientInput."""
+        return PatientInput.coerce(data).heart_row()
+
+    def _cache_generation(self):
+        # Cached responses embed the model's prediction and the catalog's advice text
+        return self.model_version, self.catalog.generation
+
+    def _predict_one(self, row):
+        """Single-row predict, coalesced with concurrent requests when micro-batching is on."""
+        with stage('heart_predict'):
+            if self.batcher is not None:
+                return self.batcher.predict_row(row)
+            return self._predict_matrix(np.array([row], dtype=float))[0]
+
+    def _predict_matrix(self, X):
+        if self.compiled is not None:
+            return self.compiled.predict(X)
+        return self.model.predict(X)
+
+    def _format(self, prediction):
+        """Response for a predicted class, served from the pre-rendered response table."""
+        return self.responses.format(prediction)
+
+    def _model_classes(self):
+        return self.model.classes_.tolist() if self.model is not None else []
+
+    def _render(self, prediction):
+        # Retrieve advice text
+        with stage('heart_risk_factors'):
+            precautions, risk_factors = self._get_context_data()
+
+        # Interpret result
+        # Based on existing logic: 1 = Healthy, 0 = Disease? (Or vice versa, sticking to legacy logic)
+        # Legacy logic: if prediction == 1 -> "Tidak memiliki penyakit jantung" (Healthy)
+        if prediction == 1:
+            return {
+                'prediksi_heartd': 'Pasien kemungkinan besar tidak memiliki penyakit jantung.',
+                'saran_heartd': f"Anda dapat melakukan beberapa hal berikut untuk mencegah penyakit jantung: {precautions}",
+                'faktor_risiko_heartd': f"Faktor-faktor risiko untuk penyakit jantung: {risk_factors}"
+            }
+        else:
+            return {
+                'prediksi_heartd': 'Pasien kemungkinan besar memiliki penyakit jantung.',
+                'saran_heartd': f"Beberapa langkah pencegahan untuk mengurangi risiko penyakit jantung: {precautions}",
+                'faktor_risiko_heartd': f"Faktor-faktor risiko untuk penyakit jantung: {risk_factors}"
+            }
+
+    def _get_context_data(self):
+        entry = self.catalog.lookup('Heart attack') # Using 'Heart attack' as proxy for Heart Disease based on legacy
+        if entry is not None:
+            return entry
             
         return "Informasi tidak tersedia.", "Informasi tidak tersedia."
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+import numpy as np
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Upper bounds of the batch-size / queue-depth histogram buckets (last bucket is +Inf)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class _Histogram:
+    """Fixed-bucket counter; callers hold the batcher lock while observing."""
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(SIZE_BUCKETS) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(SIZE_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        labels = [str(b) for b in SIZE_BUCKETS] + ['+Inf']
+        return {'buckets': dict(zip(labels, self.counts)), 'sum': self.total, 'count': self.count}
+
+
+class _Pending:
+    __slots__ = ('row', 'enqueued', 'event', 'result', 'error')
+
+    def __init__(self, row):
+        self.row = row
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one batched model call.
+
+    Rows are queued and flushed together when `max_batch_size` rows are waiting or
+    `window_ms` has passed since the oldest one arrived; each caller gets its own
+    prediction back. When nothing else is queued or running, the row is predicted inline
+    so an idle server pays no batching latency.
+    """
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name, predict_matrix, max_batch_size=32, window_ms=2.0):
+        self.name = name
+        self.predict_matrix = predict_matrix
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._active = 0        # model calls currently running (inline or batched)
+        self._worker = None
+
+        self.inline_calls = 0
+        self.batched_calls = 0
+        self.batch_sizes = _Histogram()
+        self.queue_depths = _Histogram()
+
+        with MicroBatcher._registry_lock:
+            MicroBatcher._registry[name] = self
+
+    @classmethod
+    def from_env(cls, name, prefix, predict_matrix):
+        """
+        Builds a batcher configured from `<prefix>_MICROBATCH_WINDOW_MS` and
+        `<prefix>_MICROBATCH_MAX_SIZE`. Returns None when MICROBATCH_ENABLED=0.
+        """
+        if os.getenv('MICROBATCH_ENABLED', '1') == '0':
+            return None
+        return cls(
+            name,
+            predict_matrix,
+            max_batch_size=int(os.getenv(f'{prefix}_MICROBATCH_MAX_SIZE', '32')),
+            window_ms=float(os.getenv(f'{prefix}_MICROBATCH_WINDOW_MS', '2')),
+        )
+
+    @classmethod
+    def all_stats(cls):
+        with cls._registry_lock:
+            batchers = dict(cls._registry)
+        return {name: batcher.stats() for name, batcher in batchers.items()}
+
+    def predict_row(self, row):
+        """Predicts a single feature row, batching it with concurrent callers if any."""
+        with self._cond:
+            depth = len(self._queue)
+            self.queue_depths.observe(depth)
+            inline = depth == 0 and self._active == 0
+            if inline:
+                self._active += 1
+                self.inline_calls += 1
+                self.batch_sizes.observe(1)
+            else:
+                pending = _Pending(row)
+                self._queue.append(pending)
+                self._ensure_worker()
+                self._cond.notify_all()
+
+        if inline:
+            try:
+                return self.predict_matrix(np.array([row], dtype=float))[0]
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify_all()
+
+        pending.event.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        # Started lazily (and again in a forked child, where the old thread is gone)
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=f'microbatch-{self.name}', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                flush_at = self._queue[0].enqueued + self.window
+                while len(self._queue) < self.max_batch_size:
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._queue[:self.max_batch_size]
+                del self._queue[:self.max_batch_size]
+                self._active += 1
+                self.batched_calls += 1
+                self.batch_sizes.observe(len(batch))
+
+            try:
+                predictions = self.predict_matrix(np.array([p.row for p in batch], dtype=float))
+                for pending, prediction in zip(batch, predictions):
+                    pending.result = prediction
+            except Exception as e:
+                logger.error(f"Batched predict failed for {self.name} ({len(batch)} rows): {e}")
+                for pending in batch:
+                    pending.error = e
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify_all()
+                for pending in batch:
+                    pending.event.set()
+
+    @classmethod
+    def _after_fork(cls):
+        # Rows queued by parent threads will never be answered in the child, and the
+        # condition may be held by a thread that was not copied; start from a clean slate.
+        cls._registry_lock = threading.Lock()
+        for batcher in cls._registry.values():
+            batcher._cond = threading.Condition()
+            batcher._queue = []
+            batcher._active = 0
+            batcher._worker = None
+
+    def stats(self):
+        with self._cond:
+            return {
+                'window_ms': self.window * 1000.0,
+                'max_batch_size': self.max_batch_size,
+                'inline_calls': self.inline_calls,
+                'batched_calls': self.batched_calls,
+                'queued': len(self._queue),
+                'batch_size': self.batch_sizes.snapshot(),
+                'queue_depth': self.queue_depths.snapshot(),
+            }
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=MicroBatcher._after_fork)
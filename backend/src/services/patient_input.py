@@ -0,0 +1,177 @@
+from operator import itemgetter
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# -- Categorical mappings defined during model training (stroke model) --
+# Built once at import; values are the codes the model expects.
+
+# 1 = Male, 0 = Female. Legacy frontend might send '1'/'0' strings or 'Male'/'Female'
+SEX_MAP = {'Male': 1, 'Female': 0, '1': 1, '0': 0}
+# 1 = Urban, 0 = Rural
+RESIDENCE_MAP = {'urban': 1, 'rural': 0}
+# 1 = Married, 0 = Not Married. page.tsx: "yes" -> "Pernah Menikah", "no" -> "Tidak Pernah"
+MARITAL_MAP = {'married': 1, 'not married': 0, 'yes': 1, 'no': 0}
+# Job types: 0=NoJob, 1=Gov, 2=Private, 3=Self, 4=Children(Age)
+WORK_MAP = {'nojob': 0, 'govtemp': 1, 'privatejob': 2, 'selfemp': 3, 'age': 4}
+# Smoking: 1=Formerly, 2=Non, 3=Smoker
+SMOKE_MAP = {
+    'formerly-smoked': 1, 'formerly_smoked': 1,
+    'non-smoker': 2, 'non_smoker': 2,
+    'smoker': 3
+}
+# Frontend sends 'hypten'/'nohypten' and 'heartdis'/'noheartdis' based on checkboxes
+HYPERTENSION_MAP = {'hypten': 1, 'nohypten': 0, 'true': 1, 'false': 0}
+HEART_DISEASE_MAP = {'heartdis': 1, 'noheartdis': 0, 'true': 1, 'false': 0}
+
+# attribute -> payload key, for fields coerced with float() (missing -> 0)
+NUMERIC_FIELDS = (
+    ('age', 'age'), ('sex', 'sex'), ('bmi', 'bmi'), ('glucose', 'glucose'),
+    ('bloodpressure', 'bloodpressure'), ('cp', 'cp'), ('chol', 'chol'), ('fbs', 'fbs'),
+    ('restecg', 'restecg'), ('thalach', 'thalach'), ('exang', 'exang'), ('oldpeak', 'oldpeak'),
+    ('slope', 'slope'), ('ca', 'ca'), ('thal', 'thal'),
+)
+
+# attribute -> (payload key, mapping, accepted numeric codes, default code)
+CATEGORICAL_FIELDS = tuple(
+    (attr, key, mapping, frozenset(mapping.values()), default)
+    for attr, key, mapping, default in (
+        ('sex_code', 'sex', SEX_MAP, 1),
+        ('hypertension', 'hypertension', HYPERTENSION_MAP, 0),
+        ('heart_disease', 'heartdisease', HEART_DISEASE_MAP, 0),
+        ('marital_status', 'maritalstatus', MARITAL_MAP, 0),
+        ('work_type', 'worktype', WORK_MAP, 2),    # default to Private
+        ('residence', 'residence', RESIDENCE_MAP, 1),
+        ('smoke', 'smoke', SMOKE_MAP, 2),
+    )
+)
+
+# Model feature order per service (attribute names)
+STROKE_FEATURES = ('sex_code', 'age', 'hypertension', 'heart_disease', 'marital_status',
+                   'work_type', 'residence', 'glucose', 'bmi', 'smoke')
+HEART_FEATURES = ('age', 'sex', 'cp', 'bloodpressure', 'chol', 'fbs', 'restecg', 'thalach',
+                  'exang', 'oldpeak', 'slope', 'ca', 'thal')
+DIABETES_FEATURES = ('glucose', 'bloodpressure', 'bmi', 'age')   # raw, scaled by the pipeline
+
+# A plausible patient, used for the startup warm-up prediction of every model
+WARMUP_PAYLOAD = {
+    'age': 54, 'sex': 1, 'bmi': 27.5, 'glucose': 105.0, 'bloodpressure': 80,
+    'hypertension': 'nohypten', 'heartdisease': 'noheartdis', 'maritalstatus': 'yes',
+    'worktype': 'privatejob', 'residence': 'urban', 'smoke': 'non_smoker',
+    'cp': 0, 'chol': 210, 'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+    'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+class PatientInputError(ValueError):
+    """Invalid payload; `errors` maps each offending payload key to a message."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f"{key}: {msg}" for key, msg in errors.items()))
+
+
+class PatientInput:
+    """
+    A full-checkup payload validated and coerced once, shared by every service.
+
+    Parsing never raises: fields that cannot be coerced are collected in `errors`, and
+    only a service whose feature row needs one of them fails. That keeps the old
+    behaviour of /full-checkup where a bad cholesterol value breaks the heart prediction
+    but not the stroke or diabetes ones.
+
+    All coerced values live in one flat tuple (`values`, in FIELD_NAMES order); each
+    service's feature row is a precompiled itemgetter over it, so building a row is a
+    single C call and allocates nothing but the row itself.
+    """
+    __slots__ = ('values', 'errors')
+
+    def __init__(self, values, errors):
+        self.values = values
+        self.errors = errors
+
+    @classmethod
+    def parse(cls, data):
+        if not isinstance(data, dict):
+            return cls(None, {'payload': 'expected a JSON object'})
+
+        get = data.get
+        errors = _NO_ERRORS
+        try:
+            values = [float(get(key, 0)) for key in _NUMERIC_KEYS]
+        except (TypeError, ValueError):
+            # Slow path only for bad input: find every offending field
+            errors = {}
+            values = []
+            for key in _NUMERIC_KEYS:
+                raw = get(key, 0)
+                try:
+                    values.append(float(raw))
+                except (TypeError, ValueError):
+                    errors[key] = f"expected a number, got {raw!r}"
+                    values.append(None)
+
+        for key, mapping, codes, default in _CATEGORICAL_SPECS:
+            raw = get(key, default)
+            if raw.__class__ is str:
+                value = mapping.get(raw)
+            elif isinstance(raw, (int, float)) and raw in codes:
+                # Numbers are accepted when they already are one of the model's codes
+                value = int(raw)
+            else:
+                value = mapping.get(str(raw))
+            if value is None:
+                logger.warning(f"Unknown value '{raw}' for field '{key}'. Using default.")
+                value = default
+            values.append(value)
+
+        return cls(tuple(values), errors)
+
+    @classmethod
+    def coerce(cls, data):
+        """Returns `data` if it already is a PatientInput, otherwise parses it."""
+        return data if isinstance(data, cls) else cls.parse(data)
+
+    def get(self, name):
+        """Coerced value of one field by attribute name (e.g. 'age', 'sex_code')."""
+        if self.values is None:
+            return None
+        return self.values[_INDEX[name]]
+
+    def _row(self, getter, payload_keys):
+        if self.errors:
+            relevant = {k: v for k, v in self.errors.items() if k == 'payload' or k in payload_keys}
+            if relevant:
+                raise PatientInputError(relevant)
+        return getter(self.values)
+
+    def stroke_row(self):
+        return self._row(_STROKE_ROW, _STROKE_KEYS)
+
+    def heart_row(self):
+        return self._row(_HEART_ROW, _HEART_KEYS)
+
+    def diabetes_row(self):
+        return self._row(_DIABETES_ROW, _DIABETES_KEYS)
+
+
+_NO_ERRORS = {}     # shared, never mutated
+_NUMERIC_KEYS = tuple(key for _, key in NUMERIC_FIELDS)
+_CATEGORICAL_SPECS = tuple((key, mapping, codes, default) for _, key, mapping, codes, default in CATEGORICAL_FIELDS)
+
+FIELD_NAMES = tuple(attr for attr, _ in NUMERIC_FIELDS) + tuple(f[0] for f in CATEGORICAL_FIELDS)
+_INDEX = {name: i for i, name in enumerate(FIELD_NAMES)}
+_KEY_OF = dict(NUMERIC_FIELDS)
+_KEY_OF.update({f[0]: f[1] for f in CATEGORICAL_FIELDS})
+_NUMERIC_ATTRS = frozenset(attr for attr, _ in NUMERIC_FIELDS)
+
+
+def _row_spec(features):
+    """itemgetter building the row, and the payload keys whose coercion errors fail it."""
+    keys = frozenset(_KEY_OF[a] for a in features if a in _NUMERIC_ATTRS)
+    return itemgetter(*[_INDEX[a] for a in features]), keys
+
+
+_STROKE_ROW, _STROKE_KEYS = _row_spec(STROKE_FEATURES)
+_HEART_ROW, _HEART_KEYS = _row_spec(HEART_FEATURES)
+_DIABETES_ROW, _DIABETES_KEYS = _row_spec(DIABETES_FEATURES)
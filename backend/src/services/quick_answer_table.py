@@ -0,0 +1,93 @@
+import hashlib
+import os
+from itertools import combinations_with_replacement
+
+import joblib
+import numpy as np
+
+# Bump when the stored layout changes; older tables are rebuilt instead of loaded.
+FORMAT_VERSION = 1
+
+# Symptom slots the model takes (Symptom_1 ... Symptom_17)
+VECTOR_LENGTH = 17
+
+# The quick-checkup UI offers four symptom pickers
+DEFAULT_MAX_SYMPTOMS = 4
+
+
+def enumerate_vectors(symptom_weights, max_symptoms=DEFAULT_MAX_SYMPTOMS):
+    """
+    Every sorted-weight vector QuickCheckupService.predict can build from up to
+    `max_symptoms` symptoms.
+
+    A vector only depends on the multiset of weights (sorted descending, zero padded), and
+    unknown symptoms weigh 0, so the multisets of size `max_symptoms` over {0} + distinct
+    weights cover every smaller count as well.
+    """
+    levels = sorted({int(w) for w in symptom_weights.values()} | {0}, reverse=True)
+    vectors = []
+    for combo in combinations_with_replacement(levels, max_symptoms):
+        if not any(combo):
+            continue  # no symptoms at all is rejected before prediction
+        vectors.append(tuple(combo) + (0,) * (VECTOR_LENGTH - max_symptoms))
+    return vectors
+
+
+def fingerprint(*paths):
+    """sha256 over the given files, used to detect a table built for other artifacts."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_answer_table(predict_matrix, symptom_weights, details, max_symptoms=DEFAULT_MAX_SYMPTOMS):
+    """
+    Runs the model once over every reachable vector.
+
+    Args:
+        predict_matrix: Callable mapping a 2D array of weight vectors to predicted diseases.
+        symptom_weights: Symptom -> severity weight map used by the service.
+        details: Callable mapping a disease name to (description, precautions).
+        max_symptoms: Largest symptom count to enumerate.
+
+    Returns:
+        Dict of weight vector (tuple of ints) -> (disease, description, precautions tuple).
+    """
+    vectors = enumerate_vectors(symptom_weights, max_symptoms)
+    predictions = predict_matrix(np.array(vectors))
+
+    answers = {}
+    disease_details = {}
+    for vector, disease in zip(vectors, predictions):
+        if disease not in disease_details:
+            desc, precautions = details(disease)
+            disease_details[disease] = (disease, desc, tuple(precautions))
+        answers[vector] = disease_details[disease]
+    return answers
+
+
+def save_answer_table(path, answers, source_fingerprint, max_symptoms):
+    joblib.dump({
+        'format_version': FORMAT_VERSION,
+        'fingerprint': source_fingerprint,
+        'max_symptoms': max_symptoms,
+        'answers': answers,
+    }, path)
+
+
+def load_answer_table(path, source_fingerprint, max_symptoms=DEFAULT_MAX_SYMPTOMS):
+    """
+    Returns the stored answers, or None if missing, unreadable, built for other artifacts or
+    for another symptom count (its vectors would not be the ones requests look up).
+    """
+    if not os.path.exists(path):
+        return None
+    artifact = joblib.load(path)
+    if artifact.get('format_version') != FORMAT_VERSION or artifact.get('fingerprint') != source_fingerprint:
+        return None
+    if artifact.get('max_symptoms') != max_symptoms:
+        return None
+    return artifact['answers']
@@ -1,16 +1,62 @@
 import os
+from types import MappingProxyType
 import joblib
 import pandas as pd
 import numpy as np
+from src.services import quick_answer_table
+from src.services.artifact_watcher import ArtifactWatcher
+from src.services.micro_batcher import MicroBatcher
+from src.services.result_cache import ResultCache, artifact_version, cached
+from src.services.tree_engine import compile_model
 from src.utils.logger import setup_logger
+from src.utils.metrics import timed_predict
+from src.utils.stage_timing import stage
 
 logger = setup_logger(__name__)
 
+def build_disease_index(desc_path, precaution_path):
+    """
+    Compiles the description and precaution CSVs into an immutable
+    disease -> (description, precautions tuple) mapping.
+
+    Mirrors the old per-request lookups: first matching row wins, precautions are
+    columns 1 onwards with NaNs dropped, and missing entries fall back to defaults.
+    """
+    descriptions = {}
+    if os.path.exists(desc_path):
+        desc_df = pd.read_csv(desc_path)
+        for disease, desc in zip(desc_df['Disease'], desc_df['Description']):
+            descriptions.setdefault(disease, desc)
+
+    precautions = {}
+    if os.path.exists(precaution_path):
+        prec_df = pd.read_csv(precaution_path)
+        for row in prec_df.itertuples(index=False):
+            disease, raw_p = row[0], row[1:]
+            if disease not in precautions:
+                precautions[disease] = tuple(str(p) for p in raw_p if pd.notna(p))
+
+    index = {}
+    for disease in descriptions.keys() | precautions.keys():
+        index[disease] = (
+            descriptions.get(disease, "Deskripsi tidak tersedia."),
+            precautions.get(disease, ())
+        )
+    return MappingProxyType(index)
+
+
 class QuickCheckupService:
     """
     Service for Quick Symptom-based Disease Prediction using Random Forest.
+
+    `engine` selects how the forest is evaluated: 'sklearn' (default) or 'compiled' for
+    the flat-array tree engine. Defaults to $QUICK_CHECKUP_INFERENCE_ENGINE.
+
+    With `answer_table` enabled (default, $QUICK_CHECKUP_ANSWER_TABLE), every reachable
+    input of up to $QUICK_CHECKUP_TABLE_SYMPTOMS symptoms is answered from a precomputed
+    table and the forest only runs for vectors outside it.
     """
-    def __init__(self):
+    def __init__(self, engine=None, answer_table=None):
         # cwd = os.getcwd()
         # Use relative path from this file to ensure stability regardless of run location
         # File is in backend/src/services/
@@ -26,39 +72,108 @@ class QuickCheckupService:
 
         self.desc_path = os.path.join(base_data, 'symptom_Description.csv')
         self.precaution_path = os.path.join(base_data, 'symptom_precaution.csv')
+        self.answer_table_path = os.path.join(base_assets, 'quick_answer_table.joblib')
         
         self.model = None
-        self.model = None
+        self.engine = engine or os.getenv('QUICK_CHECKUP_INFERENCE_ENGINE', 'sklearn')
+        self.compiled = None
         self.symptom_weights = None
-        self.desc_df = None
-        self.prec_df = None
+        self.disease_index = MappingProxyType({})
+
+        if answer_table is None:
+            answer_table = os.getenv('QUICK_CHECKUP_ANSWER_TABLE', '1') != '0'
+        self.use_answer_table = answer_table
+        self.table_max_symptoms = int(os.getenv('QUICK_CHECKUP_TABLE_SYMPTOMS', quick_answer_table.DEFAULT_MAX_SYMPTOMS))
+        self.answers = {}
         
-        self._load()
+        self.model, self.compiled, self.symptom_weights, self.disease_index = self._load()
+        self.batcher = MicroBatcher.from_env('quick_checkup', 'QUICK_CHECKUP', self._predict_matrix)
+        # Only vectors outside the answer table reach the cache
+        self.artifact_paths = (self.model_path, self.weights_path, self.desc_path, self.precaution_path)
+        self.model_version = artifact_version(*self.artifact_paths)
+        self.cache = ResultCache.from_env('quick_checkup', 'QUICK_CHECKUP', lambda: self.model_version)
+        if self.use_answer_table:
+            self._load_answer_table()
+        self.watcher = ArtifactWatcher('quick_checkup', self.artifact_paths, self.reload_model)
 
     def _load(self):
+        """(model, compiled engine, symptom weights, disease index); whatever fails to load is None."""
+        model, compiled, symptom_weights = None, None, None
+        disease_index = MappingProxyType({})
         try:
             if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
+                model = joblib.load(self.model_path)
+                if self.engine == 'compiled':
+                    compiled = compile_model(model)
+                    if compiled is None:
+                        logger.warning("QuickCheckup model cannot be compiled, using sklearn predict.")
             else:
                 logger.error(f"QuickCheckup model missing at {self.model_path}")
             
             if os.path.exists(self.weights_path):
-                self.symptom_weights = joblib.load(self.weights_path)
+                symptom_weights = joblib.load(self.weights_path)
             else:
                 logger.error(f"QuickCheckup weights missing at {self.weights_path}")
 
-            # Load Metadata
-            if os.path.exists(self.desc_path):
-                self.desc_df = pd.read_csv(self.desc_path)
-            
-            if os.path.exists(self.precaution_path):
-                self.prec_df = pd.read_csv(self.precaution_path)
+            # Load Metadata: compiled once, the DataFrames are dropped right after
+            disease_index = build_disease_index(self.desc_path, self.precaution_path)
             
             logger.info("QuickCheckup resources initialized.")
 
         except Exception as e:
             logger.error(f"Partial failure initializing QuickCheckup: {e}")
+        return model, compiled, symptom_weights, disease_index
 
+    def reload_model(self):
+        """
+        Loads the model, weights and disease CSVs again (ArtifactWatcher) and rebuilds the
+        answer table for them; keeps serving the current ones on failure.
+        """
+        model, compiled, symptom_weights, disease_index = self._load()
+        if not model or not symptom_weights:
+            logger.error("Failed to reload the QuickCheckup model, keeping the loaded one.")
+            return
+        # The forest answers every request until the table matches the new artifacts
+        self.answers = {}
+        self.model, self.compiled = model, compiled
+        self.symptom_weights, self.disease_index = symptom_weights, disease_index
+        # Version after the artifacts, so nothing the old model predicted is cached under it
+        self.model_version = artifact_version(*self.artifact_paths)
+        if self.use_answer_table:
+            self._load_answer_table()
+        logger.info("QuickCheckup model reloaded.")
+
+    def source_fingerprint(self):
+        """Hash of every file the answers depend on (model, weights, description/precaution CSVs)."""
+        paths = [self.model_path, self.weights_path, self.desc_path, self.precaution_path]
+        return quick_answer_table.fingerprint(*[p for p in paths if os.path.exists(p)])
+
+    def build_answer_table(self, max_symptoms=None):
+        """Runs the forest once over every reachable sorted-weight vector."""
+        return quick_answer_table.build_answer_table(
+            self._predict_matrix,
+            self.symptom_weights,
+            self._disease_details,
+            max_symptoms or self.table_max_symptoms
+        )
+
+    def _load_answer_table(self):
+        """Loads the persisted answer table, or builds it in memory if missing or stale."""
+        if not self.model or not self.symptom_weights:
+            return
+        try:
+            fingerprint = self.source_fingerprint()
+            answers = quick_answer_table.load_answer_table(self.answer_table_path, fingerprint, self.table_max_symptoms)
+            if answers is None:
+                answers = self.build_answer_table()
+                logger.info(f"QuickCheckup answer table built in memory ({len(answers)} vectors).")
+            else:
+                logger.info(f"QuickCheckup answer table loaded ({len(answers)} vectors).")
+            self.answers = answers
+        except Exception as e:
+            logger.error(f"Could not prepare QuickCheckup answer table, using the forest for every request: {e}")
+
+    @timed_predict('quick_checkup')
     def predict(self, symptoms: list):
         """
         Predicts disease from a list of symptom strings.
@@ -68,53 +183,89 @@ class QuickCheckupService:
 
         try:
             # 1. Convert to Sorted Weights
-            input_weights = []
-            
-            for s in symptoms:
-                s_clean = str(s).strip().replace('_', ' ')
-                if s_clean in self.symptom_weights:
-                    input_weights.append(self.symptom_weights[s_clean])
-                else:
-                    input_weights.append(0)
-            
-            # SORT DESCENDING: High severity first
-            # This ensures [A, B] and [B, A] provide same vector
-            input_weights.sort(reverse=True)
-            
-            # Pad to 17
-            while len(input_weights) < 17:
-                input_weights.append(0)
-            
-            # Truncate if too long (unlikely but safe)
-            input_weights = input_weights[:17]
+            with stage('quick_checkup_encode'):
+                input_weights = self._encode(symptoms)
 
-            # 2. Predict
-            vector_np = np.array([input_weights])
-            prediction = self.model.predict(vector_np)[0]
-            
-            # 4. Get Details
-            desc = "Deskripsi tidak tersedia."
-            precautions = []
-            
-            if self.desc_df is not None:
-                row = self.desc_df[self.desc_df['Disease'] == prediction]
-                if not row.empty:
-                    desc = row.iloc[0]['Description']
-            
-            if self.prec_df is not None:
-                row = self.prec_df[self.prec_df['Disease'] == prediction]
-                if not row.empty:
-                    # Precautions occupy columns 1 onwards
-                    raw_p = row.iloc[0, 1:].tolist()
-                    # Filter out NaNs if any
-                    precautions = [str(p) for p in raw_p if pd.notna(p)]
-
-            return {
-                "Disease": prediction,
-                "Description": desc,
-                "Precautions": precautions
-            }
+            # 2. Answer table hit: no model inference needed
+            answer = self.answers.get(tuple(input_weights))
+            if answer is not None:
+                disease, desc, precautions = answer
+                return {
+                    "Disease": disease,
+                    "Description": desc,
+                    "Precautions": list(precautions)
+                }
+
+            # 3. Predict (repeated vectors come from the result cache)
+            return cached(self.cache, tuple(input_weights), lambda: self._predict_and_describe(input_weights))
 
         except Exception as e:
             logger.exception("Error in QuickCheckup predict")
             return {'error': f"Prediction error: {str(e)}"}
+
+    def check_loaded(self):
+        """Raises if the service cannot predict; cheap, no model call (used when warm-up is off)."""
+        if not self.model or not self.symptom_weights:
+            raise RuntimeError('Model or weights not loaded.')
+
+    def warm_up(self):
+        """
+        Runs the forest once on a few known symptoms, bypassing the answer table and the
+        result cache, so the first real request outside the table pays no first-call cost.
+        Raises if the service cannot predict.
+        """
+        self.check_loaded()
+        symptoms = list(self.symptom_weights)[:3]
+        return self._predict_and_describe(self._encode(symptoms))
+
+    def _encode(self, symptoms):
+        """Sorted, zero-padded severity-weight vector of the 17 symptom slots."""
+        input_weights = []
+        
+        for s in symptoms:
+            s_clean = str(s).strip().replace('_', ' ')
+            if s_clean in self.symptom_weights:
+                input_weights.append(self.symptom_weights[s_clean])
+            else:
+                input_weights.append(0)
+        
+        # SORT DESCENDING: High severity first
+        # This ensures [A, B] and [B, A] provide same vector
+        input_weights.sort(reverse=True)
+        
+        # Pad to 17
+        while len(input_weights) < 17:
+            input_weights.append(0)
+        
+        # Truncate if too long (unlikely but safe)
+        return input_weights[:17]
+
+    def _predict_and_describe(self, input_weights):
+        prediction = self._predict_one(input_weights)
+
+        # 4. Get Details
+        with stage('quick_checkup_details'):
+            desc, precautions = self._disease_details(prediction)
+
+        return {
+            "Disease": prediction,
+            "Description": desc,
+            "Precautions": precautions
+        }
+
+    def _disease_details(self, prediction):
+        """Description and precaution list for a predicted disease."""
+        desc, precautions = self.disease_index.get(prediction, ("Deskripsi tidak tersedia.", ()))
+        return desc, list(precautions)
+
+    def _predict_one(self, row):
+        """Single-row predict, coalesced with concurrent requests when micro-batching is on."""
+        with stage('quick_checkup_predict'):
+            if self.batcher is not None:
+                return self.batcher.predict_row(row)
+            return self._predict_matrix(np.array([row], dtype=float))[0]
+
+    def _predict_matrix(self, X):
+        if self.compiled is not None:
+            return self.compiled.predict(X)
+        return self.model.predict(X)
@@ -0,0 +1,84 @@
+import threading
+import time
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Per-service lifecycle: loading -> warming -> ready, or failed at either step
+LOADING, WARMING, READY, FAILED = 'loading', 'warming', 'ready', 'failed'
+
+
+class ServiceReadiness:
+    """
+    Load and warm-up state of every model service, reported by GET /ready.
+
+    `/health` only says the process is up; readiness additionally requires that each
+    service constructed without raising and ran one warm-up prediction, so the first real
+    request does not pay for lazy initialisation (response tables, micro-batcher thread,
+    sklearn's first-call overhead).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def _set(self, name, **fields):
+        with self._lock:
+            state = self._states.setdefault(name, {'status': LOADING, 'error': None,
+                                                   'load_ms': None, 'warmup_ms': None})
+            state.update(fields)
+
+    def load(self, name, factory):
+        """Constructs a service with `factory()`; returns None (and records why) if it raises."""
+        self._set(name, status=LOADING)
+        start = time.perf_counter()
+        try:
+            service = factory()
+        except Exception as e:
+            logger.critical(f"Failed to initialize {name} service: {e}")
+            self._set(name, status=FAILED, error=f"init: {e}")
+            return None
+        self._set(name, status=WARMING, load_ms=round((time.perf_counter() - start) * 1000.0, 3))
+        return service
+
+    def warm_up(self, name, warm):
+        """Runs `warm()` for a loaded service; the service is ready only if it returns normally."""
+        with self._lock:
+            if self._states.get(name, {}).get('status') != WARMING:
+                return
+        start = time.perf_counter()
+        try:
+            warm()
+        except Exception as e:
+            logger.error(f"Warm-up of {name} service failed: {e}")
+            self._set(name, status=FAILED, error=f"warm-up: {e}")
+            return
+        elapsed_ms = round((time.perf_counter() - start) * 1000.0, 3)
+        self._set(name, status=READY, warmup_ms=elapsed_ms)
+        logger.info(f"{name} service ready (warm-up {elapsed_ms} ms).")
+
+    def skip_warm_up(self, name, check):
+        """
+        Marks a loaded service ready without a warm-up prediction, provided `check()` (the
+        service's cheap can-it-predict test, e.g. its model was found) returns normally.
+        """
+        with self._lock:
+            if self._states.get(name, {}).get('status') != WARMING:
+                return
+        try:
+            check()
+        except Exception as e:
+            logger.error(f"{name} service cannot predict: {e}")
+            self._set(name, status=FAILED, error=f"check: {e}")
+            return
+        self._set(name, status=READY)
+
+    def is_ready(self):
+        with self._lock:
+            return bool(self._states) and all(s['status'] == READY for s in self._states.values())
+
+    def report(self):
+        with self._lock:
+            services = {name: dict(state) for name, state in self._states.items()}
+        ready = bool(services) and all(s['status'] == READY for s in services.values())
+        return {'status': 'ready' if ready else 'not_ready', 'services': services}
@@ -0,0 +1,36 @@
+class ResponseTable:
+    """
+    Every response a classifier service can give, rendered once per generation.
+
+    The advice text only depends on the predicted class and the risk factor catalog, so
+    instead of formatting it per request the service renders one response per model
+    class and serves copies. When the catalog or the model reloads (the generation
+    changes) the table is re-rendered on next use.
+
+    Args:
+        render: Callable turning a predicted class into the service's response dict.
+        classes: Callable returning the model's classes (empty if no model is loaded).
+        generation: Callable returning the current (model version, catalog generation).
+    """
+
+    def __init__(self, render, classes, generation):
+        self.render = render
+        self.classes = classes
+        self.generation = generation
+        self._current = None    # (generation, {class: response}), swapped atomically
+
+    def responses(self):
+        """class -> response dict for the current generation. Treat as read-only."""
+        generation = self.generation()
+        current = self._current
+        if current is None or current[0] != generation:
+            current = (generation, {c: self.render(c) for c in self.classes()})
+            self._current = current
+        return current[1]
+
+    def format(self, prediction):
+        """A fresh copy of the response for `prediction` (rendered on the fly for unknown classes)."""
+        response = self.responses().get(prediction)
+        if response is None:
+            return self.render(prediction)
+        return dict(response)
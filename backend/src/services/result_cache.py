@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def artifact_version(*paths):
+    """
+    Cheap identity of the files a model was loaded from: (path, mtime_ns, size) per file.
+    Taken when the service loads its artifacts and again when ArtifactWatcher reloads them,
+    so a redeployed model invalidates the service's cached responses.
+    """
+    version = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            version.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+class _Entry:
+    __slots__ = ('value', 'expires')
+
+    def __init__(self, value, expires):
+        self.value = value
+        self.expires = expires
+
+
+class ResultCache:
+    """
+    Bounded LRU + TTL cache of formatted prediction responses.
+
+    Keys are the canonical encoded feature vector (a tuple of floats), so payloads that only
+    differ in formatting (e.g. "1" vs 1.0) share an entry. `generation` is a callable
+    returning whatever the cached responses depend on besides the vector (model artifact
+    version, risk factor catalog reload count); when it changes the whole cache is dropped.
+    Error responses are never cached. Thread-safe; the model call runs outside the lock.
+    """
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name, max_entries=4096, ttl_seconds=300.0, generation=None):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self.generation = generation
+
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._generation = generation() if generation else None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        with ResultCache._registry_lock:
+            ResultCache._registry[name] = self
+
+    @classmethod
+    def from_env(cls, name, prefix, generation=None):
+        """
+        Builds a cache sized from `<prefix>_CACHE_MAX_ENTRIES` and `<prefix>_CACHE_TTL_SECONDS`.
+        Returns None when RESULT_CACHE_ENABLED=0.
+        """
+        if os.getenv('RESULT_CACHE_ENABLED', '1') == '0':
+            return None
+        return cls(
+            name,
+            max_entries=int(os.getenv(f'{prefix}_CACHE_MAX_ENTRIES', '4096')),
+            ttl_seconds=float(os.getenv(f'{prefix}_CACHE_TTL_SECONDS', '300')),
+            generation=generation,
+        )
+
+    @classmethod
+    def all_stats(cls):
+        with cls._registry_lock:
+            caches = dict(cls._registry)
+        return {name: cache.stats() for name, cache in caches.items()}
+
+    def get_or_compute(self, key, compute):
+        """Returns a copy of the cached response for `key`, or calls `compute()` and caches its result."""
+        generation = self.generation() if self.generation else None
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                self._invalidate(generation)
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry.expires > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return dict(entry.value)
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute()
+        if isinstance(value, dict) and 'error' not in value:
+            with self._lock:
+                # Skip results computed against a generation that was replaced meanwhile
+                if generation == self._generation:
+                    self._data[key] = _Entry(dict(value), now + self.ttl)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.max_entries:
+                        self._data.popitem(last=False)
+                        self.evictions += 1
+        return value
+
+    def _invalidate(self, generation):
+        # Caller holds the lock
+        if self._data:
+            logger.info(f"Result cache '{self.name}' invalidated ({len(self._data)} entries dropped).")
+        self._data.clear()
+        self._generation = generation
+        self.invalidations += 1
+
+    @classmethod
+    def _after_fork(cls):
+        # A lock held by a parent thread at fork time would never be released in the child
+        cls._registry_lock = threading.Lock()
+        for cache in cls._registry.values():
+            cache._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=ResultCache._after_fork)
+
+
+def cached(cache, key, compute):
+    """`cache.get_or_compute(key, compute)`, or just `compute()` when caching is disabled."""
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,193 @@
+import os
+import threading
+import pandas as pd
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Terms the full-checkup services look up by substring; their matches are resolved at load time.
+PRECOMPUTED_TERMS = ('Stroke', 'Heart', 'Diabetes')
+
+
+class _Snapshot:
+    """Immutable parsed view of the risk factor CSV. Swapped atomically on reload."""
+    __slots__ = ('exact', 'names', 'contains', 'mtime')
+
+    def __init__(self, exact, names, contains, mtime):
+        self.exact = exact          # DNAME -> (PRECAU, RISKFAC)
+        self.names = names          # ((lowercase DNAME, DNAME), ...) in file order
+        self.contains = contains    # lowercase term -> (PRECAU, RISKFAC) or None
+        self.mtime = mtime
+
+
+_EMPTY = _Snapshot({}, (), {}, None)
+
+
+class RiskFactorCatalog:
+    """
+    In-memory catalog of disease_riskFactors.csv shared by all full-checkup services.
+
+    The CSV is parsed once into a dict keyed by DNAME. A daemon thread watches the file's
+    mtime and re-parses it in the background only when it changes, so request threads
+    never touch pandas or the filesystem.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path, poll_interval=None):
+        self.path = path
+        if poll_interval is None:
+            poll_interval = float(os.getenv('RISK_FACTORS_POLL_SECONDS', '5'))
+        self.poll_interval = poll_interval
+
+        self._snapshot = _EMPTY
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._stop = threading.Event()
+        self._watcher = None
+
+        self._reload()
+        self._start_watcher()
+
+    @classmethod
+    def shared(cls, path):
+        """Returns the process-wide catalog for `path`, creating it on first use."""
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            catalog = cls._instances.get(path)
+            if catalog is None:
+                catalog = cls(path)
+                cls._instances[path] = catalog
+            return catalog
+
+    @classmethod
+    def all_stats(cls):
+        """Stats for every catalog created in this process, keyed by CSV path."""
+        with cls._instances_lock:
+            catalogs = dict(cls._instances)
+        return {path: catalog.stats() for path, catalog in catalogs.items()}
+
+    # -- Loading --
+
+    def _reload(self):
+        """Parses the CSV into a fresh snapshot. Keeps the previous snapshot on failure."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            logger.error(f"Risk factor catalog missing at {self.path}")
+            return False
+
+        try:
+            df = pd.read_csv(self.path, encoding='latin1')
+        except Exception as e:
+            logger.error(f"Failed to parse risk factor catalog: {e}")
+            return False
+
+        exact = {}
+        names = []
+        for name, precau, riskfac in zip(df['DNAME'], df['PRECAU'], df['RISKFAC']):
+            if pd.isna(name):
+                continue
+            name = str(name)
+            # Keep the first row for a duplicated DNAME, like `df[df['DNAME'] == x].iloc[0]`
+            if name not in exact:
+                exact[name] = (precau, riskfac)
+            names.append((name.lower(), name))
+        names = tuple(names)
+
+        contains = {}
+        for term in PRECOMPUTED_TERMS:
+            contains[term.lower()] = self._scan(exact, names, term.lower())
+
+        self._snapshot = _Snapshot(exact, names, contains, mtime)
+        with self._stats_lock:
+            self._reloads += 1
+        logger.info(f"Risk factor catalog loaded ({len(exact)} diseases).")
+        return True
+
+    @staticmethod
+    def _scan(exact, names, term):
+        for lowered, name in names:
+            if term in lowered:
+                return exact[name]
+        return None
+
+    def _start_watcher(self):
+        if self.poll_interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, name='risk-factor-catalog', daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                continue
+            if mtime != self._snapshot.mtime:
+                logger.info("Risk factor CSV changed on disk, reloading catalog.")
+                self._reload()
+
+    def close(self):
+        """Stops the background watcher."""
+        self._stop.set()
+
+    @classmethod
+    def _after_fork(cls):
+        # Only the forking thread survives in the child: locks may have been held by a
+        # thread that no longer exists and the watchers are gone, so rebuild both.
+        cls._instances_lock = threading.Lock()
+        for catalog in cls._instances.values():
+            catalog._stats_lock = threading.Lock()
+            if not catalog._stop.is_set():
+                catalog._start_watcher()
+
+    # -- Lookups --
+
+    @property
+    def available(self):
+        return self._snapshot.mtime is not None
+
+    @property
+    def generation(self):
+        """Bumped on every successful reload; cached responses built from older data are stale."""
+        return self._reloads
+
+    def lookup(self, name):
+        """Exact DNAME lookup. Returns (PRECAU, RISKFAC) or None."""
+        return self._record(self._snapshot.exact.get(name))
+
+    def search(self, term):
+        """Case-insensitive substring lookup on DNAME. Returns the first match or None."""
+        snapshot = self._snapshot
+        key = term.lower()
+        if key in snapshot.contains:
+            entry = snapshot.contains[key]
+        else:
+            entry = self._scan(snapshot.exact, snapshot.names, key)
+        return self._record(entry)
+
+    def _record(self, entry):
+        with self._stats_lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return entry
+
+    def stats(self):
+        snapshot = self._snapshot
+        with self._stats_lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'reloads': self._reloads,
+                'entries': len(snapshot.exact),
+                'mtime_ns': snapshot.mtime,
+            }
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=RiskFactorCatalog._after_fork)
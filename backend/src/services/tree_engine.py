@@ -0,0 +1,146 @@
+import numpy as np
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+
+class CompiledTreeEnsemble:
+    """
+    Flat-array evaluator for a fitted sklearn tree ensemble.
+
+    All trees are packed into contiguous node arrays (feature, threshold, children, leaf
+    value) and every tree is walked at once with vectorized numpy steps, skipping
+    sklearn's per-call validation and joblib dispatch. Arithmetic follows sklearn's own
+    order (float32 inputs, trees accumulated one after another), so predictions are
+    bit-identical to `model.predict`.
+
+    Supports GradientBoostingClassifier (with the default prior or zero init) and
+    RandomForestClassifier with a single output.
+    """
+
+    def __init__(self, model):
+        if isinstance(model, GradientBoostingClassifier):
+            self.kind = 'gradient_boosting'
+            trees = [est.tree_ for est in model.estimators_.ravel()]
+            self.n_per_stage = model.n_trees_per_iteration_
+            self.learning_rate = float(model.learning_rate)
+            self.init_raw = self._gb_init_raw(model)
+        elif isinstance(model, RandomForestClassifier):
+            if model.n_outputs_ != 1:
+                raise TypeError("Only single-output random forests can be compiled.")
+            self.kind = 'random_forest'
+            trees = [est.tree_ for est in model.estimators_]
+            self.n_classes = int(model.n_classes_)
+        else:
+            raise TypeError(f"Cannot compile {type(model).__name__}; expected a tree ensemble.")
+
+        self.classes_ = model.classes_
+        self.n_features = int(model.n_features_in_)
+        self.n_trees = len(trees)
+        self._pack(trees)
+
+    @staticmethod
+    def _gb_init_raw(model):
+        if model.init_ == 'zero':
+            return np.zeros(model.n_trees_per_iteration_, dtype=np.float64)
+        if not isinstance(model.init_, DummyClassifier):
+            # Any other init estimator depends on X and cannot be folded into a constant
+            raise TypeError(f"Unsupported init estimator {type(model.init_).__name__}.")
+        probe = np.zeros((1, model.n_features_in_), dtype=np.float32)
+        return model._raw_predict_init(probe)[0].copy()
+
+    def _pack(self, trees):
+        counts = [t.node_count for t in trees]
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+        self.roots = offsets
+        self.max_depth = max(t.max_depth for t in trees)
+
+        feature, threshold, left, right, missing_left, values = [], [], [], [], [], []
+        for offset, t in zip(offsets, trees):
+            is_leaf = t.children_left == -1
+            own = np.arange(t.node_count, dtype=np.intp) + offset
+            # Leaves point at themselves so extra traversal steps are no-ops
+            left.append(np.where(is_leaf, own, t.children_left + offset))
+            right.append(np.where(is_leaf, own, t.children_right + offset))
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(np.where(is_leaf, np.inf, t.threshold))
+            missing_left.append(t.missing_go_to_left.astype(bool))
+            if self.kind == 'gradient_boosting':
+                values.append(t.value[:, 0, 0])
+            else:
+                values.append(t.value[:, 0, :self.n_classes])
+
+        self.feature = np.ascontiguousarray(np.concatenate(feature), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(threshold), dtype=np.float64)
+        self.left = np.ascontiguousarray(np.concatenate(left), dtype=np.intp)
+        self.right = np.ascontiguousarray(np.concatenate(right), dtype=np.intp)
+        self.missing_left = np.ascontiguousarray(np.concatenate(missing_left))
+        self.values = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+
+    def apply(self, X):
+        """Leaf index (into the packed arrays) of every row in every tree, shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features}), got {X.shape}.")
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            go_left |= np.isnan(x) & self.missing_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict(self, X):
+        if self.kind == 'gradient_boosting':
+            return self._predict_gb(X)
+        return self._predict_rf(np.asarray(X, dtype=np.float64))
+
+    def decision_function(self, X):
+        """Raw boosting scores, same values and shape as GradientBoostingClassifier.decision_function."""
+        if self.kind != 'gradient_boosting':
+            raise AttributeError("decision_function is only available for gradient boosting models.")
+        X = np.asarray(X, dtype=np.float64)
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity.")
+
+        leaf_values = self.values[self.apply(X)]                   # (n_samples, n_trees)
+        n_samples = X.shape[0]
+        K = self.n_per_stage
+        raw = np.tile(self.init_raw, (n_samples, 1))
+        lr = self.learning_rate
+        if n_samples == 1:
+            # Plain float arithmetic is the same IEEE double math as numpy, without per-op overhead
+            acc = raw[0].tolist()
+            for i, v in enumerate(leaf_values[0].tolist()):
+                acc[i % K] += lr * v
+            raw[0] = acc
+        else:
+            # Stage by stage, like sklearn's predict_stages
+            for i in range(self.n_trees):
+                raw[:, i % K] += lr * leaf_values[:, i]
+        return raw.ravel() if K == 1 else raw
+
+    def _predict_gb(self, X):
+        raw = self.decision_function(X)
+        if raw.ndim == 1:
+            encoded = (raw >= 0).astype(int)
+        else:
+            encoded = np.argmax(raw, axis=1)
+        return self.classes_[encoded]
+
+    def _predict_rf(self, X):
+        leaves = self.apply(X)                                     # (n_samples, n_trees)
+        # Reducing over a leading axis adds the trees sequentially in estimator order,
+        # matching the forest's running `out += prediction`
+        proba = self.values[leaves.T].sum(axis=0)                  # (n_samples, n_classes)
+        proba /= self.n_trees
+        return self.classes_.take(np.argmax(proba, axis=1), axis=0)
+
+
+def compile_model(model):
+    """Returns a CompiledTreeEnsemble for `model`, or None if it is not a supported ensemble."""
+    try:
+        return CompiledTreeEnsemble(model)
+    except TypeError:
+        return None
@@ -0,0 +1,53 @@
+import os
+import re
+import time
+import uuid
+from src.utils.json_fragments import encode
+from src.utils.logger import setup_logger
+
+# One JSON object per request in logs/access.log (see scripts/access_log_report.py)
+ACCESS_LOG_ENABLED = os.getenv('ACCESS_LOG_ENABLED', '1') != '0'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Incoming IDs are echoed back, so only accept short, header- and log-safe ones
+_VALID_REQUEST_ID = re.compile(r'[A-Za-z0-9._:-]{1,128}')
+
+# Never sampled and kept out of stdout: these records are for analysis, not for reading
+_logger = setup_logger('access', log_file='access.log', console=False, sample=False, fmt='%(message)s')
+_logger.propagate = False
+
+
+def request_id(incoming=None):
+    """The caller's request ID if it is well-formed, otherwise a new one."""
+    if incoming and _VALID_REQUEST_ID.fullmatch(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def log_request(request_id, method, route, status, started, duration_s, model_ms=None, timed_out=None):
+    """
+    Writes the access record of one request.
+
+    Args:
+        started: time.time() when the request started (`ts`, plus an ISO `time` for people).
+        duration_s: Total handling time in seconds.
+        model_ms: Per-model durations in ms, for routes that call models.
+        timed_out: Models that missed the full-checkup deadline.
+    """
+    if not ACCESS_LOG_ENABLED:
+        return
+    started_ms = int(started * 1000)
+    record = {
+        'ts': started_ms / 1000,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(started)) + f'.{started_ms % 1000:03d}Z',
+        'request_id': request_id,
+        'method': method,
+        'route': route,
+        'status': status,
+        'duration_ms': round(duration_s * 1000.0, 3),
+    }
+    if model_ms:
+        record['model_ms'] = model_ms
+    if timed_out:
+        record['timed_out'] = timed_out
+    _logger.info(encode(record).decode())
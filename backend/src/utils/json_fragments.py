@@ -0,0 +1,81 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # in requirements.txt; without it the stdlib encoder produces equivalent JSON
+    orjson = None
+
+
+class Raw:
+    """Already encoded JSON, spliced into the output as-is by `dumps`."""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+def _default(obj):
+    # numpy scalars (e.g. the quick-checkup Disease label) and other objects with .item()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def encode(obj):
+        """Compact JSON bytes with sorted keys."""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+else:
+    _encoder = json.JSONEncoder(sort_keys=True, ensure_ascii=True, separators=(',', ':'), default=_default)
+
+    def encode(obj):
+        """Compact JSON bytes with sorted keys."""
+        return _encoder.encode(obj).encode('ascii')
+
+
+def _contains_raw(obj):
+    for value in obj.values():
+        if isinstance(value, Raw) or (isinstance(value, dict) and _contains_raw(value)):
+            return True
+    return False
+
+
+def dumps(obj):
+    """
+    Encodes `obj` like `encode`, splicing in the bytes of any Raw value.
+
+    Only dicts are walked (keys sorted, like jsonify); everything without a Raw inside is
+    handed to the encoder in one call.
+    """
+    if isinstance(obj, Raw):
+        return obj.data
+    if isinstance(obj, dict) and _contains_raw(obj):
+        parts = [encode(str(key)) + b':' + dumps(obj[key]) for key in sorted(obj)]
+        return b'{' + b','.join(parts) + b'}'
+    return encode(obj)
+
+
+class FragmentTable:
+    """
+    Pre-encoded JSON of a fixed set of dicts, recognised by one identifying field.
+
+    `lookup(d)` returns the Raw fragment when `d` equals one of the dicts the table was
+    built from, or None so the caller encodes it normally. The equality check compares
+    the same string objects in the common case, so it is cheap.
+    """
+
+    def __init__(self, key_field, dicts):
+        self.key_field = key_field
+        self._entries = {}
+        for d in dicts:
+            self._entries[d[key_field]] = (d, Raw(encode(d)))
+
+    def lookup(self, d):
+        entry = self._entries.get(d.get(self.key_field))
+        if entry is not None and entry[0] == d:
+            return entry[1]
+        return None
@@ -1,29 +1,342 @@
+import atexit
+import itertools
 import logging
 import os
+import pickle
+import queue
+import socket
 import sys
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name=__name__, log_file='app.log', level=logging.INFO):
+# Size-based rotation of each log file (LOG_MAX_BYTES=0 disables rotation)
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+# LOG_ASYNC=0 writes from the calling thread, as before (useful when debugging crashes)
+LOG_ASYNC = os.getenv('LOG_ASYNC', '1') != '0'
+# Opt-in share of INFO-and-below records kept per route while handling a request,
+# e.g. "/full-checkup=0.01,/quick-checkup=0.1"; warnings and errors are always kept.
+# Empty (the default) keeps every record.
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+FORMAT = '[%(asctime)s] %(levelname)s [%(name)s]: %(message)s'
+
+# Longest message a prefork worker forwards to the supervisor in one datagram
+_MAX_FORWARDED_MESSAGE = 64 * 1024
+
+
+def _parse_sample_rates(spec):
+    """'/route=rate,...' -> {route: keep 1 in N}."""
+    every = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        route, _, rate = item.rpartition('=')
+        rate = float(rate)
+        if route and 0 < rate < 1:
+            every[route] = max(1, round(1 / rate))
+    return every
+
+
+class RouteSampler(logging.Filter):
+    """
+    Keeps 1 in N of the INFO-and-below records logged while serving a sampled route.
+
+    Runs on the request thread before the record is queued. The route is the Flask URL
+    rule the app binds per request (`set_request_route`), read from a ContextVar since
+    going through flask.request costs several microseconds per log call; records logged
+    outside a request are always kept.
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self._counters = {route: itertools.count() for route in every}
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not self.every:
+            return True
+        route = _route.get()
+        if route is None:
+            return True
+        n = self.every.get(route)
+        if n is None:
+            return True
+        # next() on itertools.count is atomic under the GIL
+        return next(self._counters[route]) % n == 0
+
+
+_route = ContextVar('log_route', default=None)
+
+
+def set_request_route(route):
+    """Binds the URL rule of the request being handled (None when unmatched) for sampling."""
+    _route.set(route)
+
+
+def clear_request_route():
+    _route.set(None)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler that hands the record over as is: the listener formats it on its own thread."""
+
+    def prepare(self, record):
+        # Only freeze the message (its args could change after the call returns)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """
+    Stands in for a log file's handler in a prefork worker: sends each record to the
+    supervisor (one datagram, so workers never interleave), which does the file write.
+    """
+
+    def __init__(self, sock, path, fmt):
+        super().__init__()
+        self.sock = sock
+        self.path = path
+        self.fmt = fmt
+        self.addFilter(lambda record: getattr(record, 'log_path', path) == path)
+
+    def emit(self, record):
+        try:
+            fields = dict(record.__dict__)
+            fields['msg'] = record.getMessage()[:_MAX_FORWARDED_MESSAGE]
+            fields['args'] = None
+            if record.exc_info and not record.exc_text:
+                fields['exc_text'] = logging.Formatter().formatException(record.exc_info)
+            if fields.get('exc_text'):
+                fields['exc_text'] = fields['exc_text'][-_MAX_FORWARDED_MESSAGE:]
+            fields['exc_info'] = None
+            fields['log_path'] = self.path
+            fields['log_fmt'] = self.fmt
+            # The worker already wrote it to its own stdout
+            fields['log_console'] = False
+            self.sock.send(pickle.dumps(fields))
+        except Exception:
+            self.handleError(record)
+
+
+class _Pipeline:
+    """
+    One queue and one writer thread (QueueListener) for every logger in the process.
+
+    Request threads only enqueue records; the listener formats them and writes to the
+    rotating log file(s) and stdout. The listener thread does not survive fork, so a
+    forked child (src/serve.py) gets a fresh queue and listener. Fork waits until no thread
+    is writing through one of the handlers: a child inheriting a stream (file or stdout)
+    whose buffer lock another thread held would block on its first write to or close of it.
+
+    Once `start_collector()` has run, children forked afterwards do not write the log files
+    themselves: their file handlers are replaced by _ForwardHandlers that send each record
+    to this process, whose collector thread queues it for the one writer. Otherwise every
+    worker would rotate the shared files by its own byte count and keep appending to the
+    renamed file after another worker rotated it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.formatter = logging.Formatter(FORMAT)
+        self.console = logging.StreamHandler(sys.stdout)
+        self.console.setFormatter(self.formatter)
+        self.console.addFilter(lambda record: getattr(record, 'log_console', True))
+        self.files = {}         # log file path -> handler
+        self.formats = {}       # log file path -> line format
+        self.sampler = RouteSampler(_parse_sample_rates(LOG_SAMPLE_RATES))
+        self.queue = queue.SimpleQueue()
+        self.queue_handlers = {}    # (log file path, console) -> QueueHandler feeding this pipeline
+        self.listener = None
+        self.collector = None   # (receiving, sending) socket pair in the process that writes for its children
+        self.forward_to = None  # sending socket in a child whose records the parent writes
+
+    def _file_handler(self, path, fmt):
+        if self.forward_to is not None:
+            return _ForwardHandler(self.forward_to, path, fmt)
+        if LOG_MAX_BYTES > 0:
+            handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+        else:
+            handler = logging.FileHandler(path)
+        handler.setFormatter(self.formatter if fmt == FORMAT else logging.Formatter(fmt))
+        # Each file only takes the records of loggers set up for it
+        handler.addFilter(lambda record, path=path: getattr(record, 'log_path', path) == path)
+        return handler
+
+    def _add_file(self, path, fmt):
+        # Caller holds the lock
+        self.files[path] = self._file_handler(path, fmt)
+        self.formats[path] = fmt
+        self._restart_listener()
+
+    def handlers_for(self, path, console=True, fmt=FORMAT):
+        """
+        The handler(s) a logger writing to `path` (and stdout if `console`) attaches.
+        A file's format is set by the first logger that writes to it.
+        """
+        with self._lock:
+            if path not in self.files:
+                self._add_file(path, fmt)
+            elif self.listener is None:
+                self._restart_listener()
+            if not LOG_ASYNC:
+                return [self.files[path], self.console] if console else [self.files[path]]
+            handler = self.queue_handlers.get((path, console))
+            if handler is None:
+                handler = self.queue_handlers[(path, console)] = _InProcessQueueHandler(self.queue)
+                handler.addFilter(_tagger(path, console))
+            return [handler]
+
+    def _restart_listener(self):
+        # Caller holds the lock
+        if not LOG_ASYNC:
+            return
+        if self.listener is not None:
+            self.listener.stop()
+        self.listener = QueueListener(self.queue, self.console, *self.files.values(), respect_handler_level=True)
+        self.listener.start()
+
+    def start_collector(self):
+        """Makes this process write the log files for the children it forks from now on."""
+        with self._lock:
+            if self.collector is not None or self.forward_to is not None:
+                return
+            self.collector = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        threading.Thread(target=self._collect, args=(self.collector[0],), name='log-collector', daemon=True).start()
+
+    def _collect(self, receiver):
+        while True:
+            try:
+                data = receiver.recv(_MAX_FORWARDED_MESSAGE * 4)
+            except OSError:
+                return
+            self._write_forwarded(data)
+
+    def _drain_collector(self):
+        # Records the workers sent before exiting that the collector thread has not read yet
+        receiver = self.collector[0]
+        while True:
+            try:
+                data = receiver.recv(_MAX_FORWARDED_MESSAGE * 4, socket.MSG_DONTWAIT)
+            except OSError:
+                return
+            self._write_forwarded(data)
+
+    def _write_forwarded(self, data):
+        try:
+            record = logging.makeLogRecord(pickle.loads(data))
+        except Exception:
+            return
+        with self._lock:
+            if record.log_path not in self.files:
+                self._add_file(record.log_path, record.log_fmt)
+            handler = self.files[record.log_path]
+            queued = self.listener is not None
+        if queued:
+            self.queue.put(record)
+        else:
+            handler.handle(record)
+
+    def flush(self):
+        """Drains the queue and stops the writer thread (restarted on the next setup)."""
+        if self.collector is not None:
+            self._drain_collector()
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+            for handler in list(self.files.values()) + [self.console]:
+                handler.flush()
+
+    def before_fork(self):
+        # Handler locks are taken one at a time when writing, never nested, so any order works
+        self._forking = list(self.files.values()) + [self.console]
+        for handler in self._forking:
+            handler.acquire()
+
+    def after_fork_in_parent(self):
+        for handler in self._forking:
+            handler.release()
+
+    def after_fork(self):
+        # logging has already replaced the handler locks held by before_fork().
+        # Records still queued belong to the parent, which writes them itself.
+        self._lock = threading.Lock()
+        self.queue = queue.SimpleQueue()
+        for handler in self.queue_handlers.values():
+            handler.queue = self.queue
+        self.listener = None
+        if self.collector is not None:
+            receiver, self.forward_to = self.collector
+            receiver.close()
+            self.collector = None
+            self._forward_files()
+        if LOG_ASYNC and self.files:
+            self._restart_listener()
+
+    def _forward_files(self):
+        # Swap every file handler for a forwarder; loggers writing synchronously
+        # (LOG_ASYNC=0) hold the file handlers themselves, so swap theirs too.
+        forwarders = {id(handler): self._file_handler(path, self.formats[path]) for path, handler in self.files.items()}
+        for logger in list(logging.Logger.manager.loggerDict.values()):
+            if isinstance(logger, logging.Logger):
+                logger.handlers = [forwarders.get(id(handler), handler) for handler in logger.handlers]
+        for path, handler in list(self.files.items()):
+            self.files[path] = forwarders[id(handler)]
+            # Only closes this process's descriptor; the parent keeps writing the file
+            handler.close()
+
+
+def _tagger(path, console):
+    def tag(record):
+        record.log_path = path
+        record.log_console = console
+        return True
+    return tag
+
+
+_pipeline = _Pipeline()
+atexit.register(_pipeline.flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_pipeline.before_fork, after_in_parent=_pipeline.after_fork_in_parent,
+                        after_in_child=_pipeline.after_fork)
+
+
+def flush_logging():
+    """Writes out every queued record; call before os._exit() (e.g. prefork workers)."""
+    _pipeline.flush()
+
+
+def collect_worker_logs():
+    """
+    Call before forking workers (src/serve.py): the workers forked afterwards send their
+    file records to this process, which stays the only writer (and rotator) of each file.
+    """
+    _pipeline.start_collector()
+
+
+def setup_logger(name=__name__, log_file='app.log', level=logging.INFO, console=True, sample=True, fmt=FORMAT):
     """
     Setup a centralized logger.
+
+    All loggers share one queue and writer thread (see _Pipeline); the log file under
+    logs/ rotates by size (LOG_MAX_BYTES, LOG_BACKUP_COUNT). `console=False` keeps the
+    records out of stdout, `sample=False` exempts them from per-route sampling and `fmt`
+    sets the line format of a new log file.
     """
     # Create logs directory if it doesn't exist
     log_dir = os.path.join(os.getcwd(), 'logs')
     os.makedirs(log_dir, exist_ok=True)
-    
-    formatter = logging.Formatter('[%(asctime)s] %(levelname)s [%(name)s]: %(message)s')
-    
-    handler = logging.FileHandler(os.path.join(log_dir, log_file))
-    handler.setFormatter(formatter)
-    
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Avoid duplicate handlers
     if not logger.handlers:
-        logger.addHandler(handler)
-        logger.addHandler(console_handler)
-        
+        # Sampled on the logger, so a dropped record never reaches a handler
+        if sample:
+            logger.addFilter(_pipeline.sampler)
+        for handler in _pipeline.handlers_for(os.path.join(log_dir, log_file), console, fmt):
+            logger.addHandler(handler)
+
     return logger
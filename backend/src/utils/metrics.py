@@ -0,0 +1,276 @@
+import functools
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
+
+# Latency bucket upper bounds in seconds (last bucket is +Inf)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Prefork mode: how often each worker writes its totals for the scrapes the others answer
+METRICS_SYNC_SECONDS = float(os.getenv('METRICS_SYNC_SECONDS', '1'))
+
+# name -> (type, help, label names)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests handled, by route, method and status.', ('route', 'method', 'status')),
+    'http_request_errors_total': ('counter', 'HTTP requests answered with a 4xx/5xx status.', ('route', 'method')),
+    'http_request_duration_seconds': ('histogram', 'Time spent handling a request, by route.', ('route', 'method')),
+    'model_predict_total': ('counter', 'Single-payload predictions, by service.', ('service',)),
+    'model_predict_errors_total': ('counter', 'Predictions that returned an error response, by service.', ('service',)),
+    'model_predict_duration_seconds': ('histogram', 'Time spent in a service predict call, by service.', ('service',)),
+    # In-process full-checkup fan-out (src/api/routes.py)
+    'full_checkup_overdue_calls': ('gauge', 'Model calls still running past their full-checkup deadline, by model.', ('model',)),
+    'full_checkup_shed_total': ('counter', 'Model calls skipped because too many earlier ones were still overdue, by model.', ('model',)),
+    # Split-service fan-out (src/api/full_checkup.py)
+    'downstream_requests_total': ('counter', 'Calls to a downstream model service, by outcome (ok/error/rejected).', ('downstream', 'outcome')),
+    'downstream_request_duration_seconds': ('histogram', 'Latency of completed downstream calls.', ('downstream',)),
+    'downstream_hedges_total': ('counter', 'Hedged calls sent to a replica, by which copy answered first.', ('downstream', 'winner')),
+    'downstream_breaker_transitions_total': ('counter', 'Circuit breaker state changes, by new state.', ('downstream', 'state')),
+    'downstream_breaker_state': ('gauge', 'Circuit breaker state: 0 closed, 1 half-open, 2 open.', ('downstream',)),
+}
+
+
+class _Shard:
+    """Counters and histograms written by one thread only, so recording needs no lock."""
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = {}      # (name, label values) -> count
+        self.histograms = {}    # (name, label values) -> [bucket counts..., sum, count]
+
+    def merge_into(self, counters, histograms):
+        # list() snapshots the dicts in one step under the GIL, even while the owner writes
+        for key, value in list(self.counters.items()):
+            counters[key] = counters.get(key, 0) + value
+        for key, values in list(self.histograms.items()):
+            values = list(values)
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = values
+            else:
+                for i, v in enumerate(values):
+                    merged[i] += v
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics with per-thread shards.
+
+    Each thread records into its own shard (found via a thread-local), so the request path
+    never takes a shared lock; the only locking is once per new thread and at scrape time,
+    when shards are summed. Shards of finished threads are folded into a retired total so
+    werkzeug's thread-per-request model does not grow the shard list without bound.
+
+    Prefork workers (src/serve.py) share one listening socket, so a scrape reaches any one
+    of them. After `share_across_workers(directory)` in the supervisor, every forked worker
+    writes its totals to <directory>/<pid>-<fork time>.pickle every METRICS_SYNC_SECONDS, and a scrape
+    sums the files of all workers, past and present, so counters never go backwards when
+    a worker is restarted. Gauges are per worker state: the scrape reports the highest
+    value among the live workers.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []           # (thread, shard)
+        self._retired = _Shard()
+        self._gauges = {}           # name -> callable returning {label values: value}
+        self._directory = None      # prefork mode: where every worker writes its totals
+        self._file_name = None      # this process's file in the directory
+
+    def register_gauge(self, name, collect):
+        """Gauges are read at scrape time: `collect()` returns {label values tuple: value}."""
+        self._gauges[name] = collect
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) > 256:
+                    self._retire_dead()
+            return shard
+
+    def _retire_dead(self):
+        # Caller holds the lock. A finished thread will not write to its shard again.
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                shard.merge_into(self._retired.counters, self._retired.histograms)
+        self._shards = alive
+
+    def inc(self, name, labels, value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+        values[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    def collect(self):
+        """Summed counters and histograms of every shard."""
+        counters, histograms = {}, {}
+        with self._lock:
+            self._retire_dead()
+            self._retired.merge_into(counters, histograms)
+            for _, shard in self._shards:
+                shard.merge_into(counters, histograms)
+        return counters, histograms
+
+    def _collect_gauges(self):
+        return {name: dict(collect()) for name, collect in self._gauges.items()}
+
+    def share_across_workers(self, directory):
+        """
+        Call in the supervisor before forking workers. What it has recorded so far (the
+        warm-up predictions) is written once as its own file; each worker starts from zero.
+        """
+        self._directory = directory
+        self._file_name = 'supervisor.pickle'
+        self._write_totals()
+
+    def after_fork(self):
+        if self._directory is None:
+            return
+        # The supervisor's totals are already in its file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+        # The fork time keeps a reused pid from overwriting a dead worker's totals
+        self._file_name = f'{os.getpid()}-{time.time_ns()}.pickle'
+        threading.Thread(target=self._sync_forever, name='metrics-sync', daemon=True).start()
+
+    def _sync_forever(self):
+        while True:
+            time.sleep(METRICS_SYNC_SECONDS)
+            self._write_totals()
+
+    def _write_totals(self):
+        counters, histograms = self.collect()
+        path = os.path.join(self._directory, self._file_name)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((counters, histograms, self._collect_gauges()), f)
+        # Readers see either the previous or the new totals, never a partial file
+        os.replace(tmp, path)
+
+    def collect_all(self):
+        """collect() plus gauges, summed over every worker in prefork mode."""
+        if self._directory is None:
+            counters, histograms = self.collect()
+            return counters, histograms, self._collect_gauges()
+
+        # This worker's own numbers are current; the others' at most METRICS_SYNC_SECONDS old
+        self._write_totals()
+        total = _Shard()
+        gauges = {}
+        for entry in os.scandir(self._directory):
+            if not entry.name.endswith('.pickle'):
+                continue
+            try:
+                with open(entry.path, 'rb') as f:
+                    counters, histograms, worker_gauges = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+            shard = _Shard()
+            shard.counters, shard.histograms = counters, histograms
+            shard.merge_into(total.counters, total.histograms)
+            if _is_running(entry.name.split('-')[0]):
+                for name, values in worker_gauges.items():
+                    merged = gauges.setdefault(name, {})
+                    for labels, value in values.items():
+                        merged[labels] = max(value, merged.get(labels, value))
+        return total.counters, total.histograms, gauges
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        counters, histograms, gauges = self.collect_all()
+        lines = []
+        for name, (kind, help_text, label_names) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_labels(label_names, labels)} {value}')
+            elif kind == 'gauge':
+                for labels, value in sorted(gauges.get(name, {}).items()):
+                    lines.append(f'{name}{_labels(label_names, labels)} {value}')
+            else:
+                for (metric, labels), values in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), values[:-2]):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else repr(bound)
+                        lines.append(f'{name}_bucket{_labels(label_names + ("le",), labels + (le,))} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(label_names, labels)} {values[-2]}')
+                    lines.append(f'{name}_count{_labels(label_names, labels)} {values[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _is_running(pid):
+    if not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+registry = MetricsRegistry()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.after_fork)
+
+
+def observe_request(route, method, status, seconds):
+    labels = (route, method)
+    registry.inc('http_requests_total', (route, method, str(status)))
+    if status >= 400:
+        registry.inc('http_request_errors_total', labels)
+    registry.observe('http_request_duration_seconds', labels, seconds)
+
+
+def timed_predict(service):
+    """Decorator recording a service's predict latency and error responses under `service`."""
+    def decorator(fn):
+        labels = (service,)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            registry.observe('model_predict_duration_seconds', labels, time.perf_counter() - start)
+            registry.inc('model_predict_total', labels)
+            if isinstance(result, dict) and 'error' in result:
+                registry.inc('model_predict_errors_total', labels)
+            return result
+        return wrapper
+    return decorator
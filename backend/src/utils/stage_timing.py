@@ -0,0 +1,95 @@
+import contextvars
+import functools
+import os
+import time
+from contextlib import nullcontext
+from flask import make_response, request
+
+# Off by default: when disabled every `stage()` is one ContextVar lookup returning a no-op.
+ENABLED = os.getenv('SERVER_TIMING_ENABLED', '0') == '1'
+
+# Also copy the stage timings into the JSON body ("debug_timings"); per request with ?debug_timing=1
+BODY_ENABLED = os.getenv('SERVER_TIMING_BODY', '0') == '1'
+
+_current = contextvars.ContextVar('stage_timings', default=None)
+_NOOP = nullcontext()
+
+
+class StageTimings:
+    """Accumulated milliseconds per stage for one request."""
+    __slots__ = ('stages', 'start', 'debug_body')
+
+    def __init__(self, debug_body=False):
+        self.stages = {}
+        self.start = time.perf_counter()
+        self.debug_body = debug_body
+
+    def add(self, name, ms):
+        # Concurrent services record under distinct names, so no lock is needed
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def snapshot(self):
+        return {name: round(ms, 3) for name, ms in self.stages.items()}
+
+    def header(self):
+        """Server-Timing value, e.g. `parse;dur=0.04, stroke_predict;dur=0.61, total;dur=2.1`."""
+        parts = [f'{name};dur={ms:.3f}' for name, ms in self.stages.items()]
+        parts.append(f'total;dur={(time.perf_counter() - self.start) * 1000.0:.3f}')
+        return ', '.join(parts)
+
+
+class _Stage:
+    __slots__ = ('timings', 'name', 'start')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+def stage(name):
+    """Context manager timing one phase of the current request; a shared no-op when not timing."""
+    timings = _current.get()
+    if timings is None:
+        return _NOOP
+    return _Stage(timings, name)
+
+
+def current():
+    """StageTimings of the request being handled, or None when timing is off."""
+    return _current.get()
+
+
+def submit(executor, fn, *args):
+    """`executor.submit` that carries the request's timings into the worker thread."""
+    if _current.get() is None:
+        return executor.submit(fn, *args)
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def instrument(view):
+    """
+    Flask view decorator: collects the stages recorded while the view runs and emits them
+    as a `Server-Timing` header. A pass-through when SERVER_TIMING_ENABLED is not set.
+    """
+    if not ENABLED:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        timings = StageTimings(debug_body=BODY_ENABLED or request.args.get('debug_timing') == '1')
+        token = _current.set(timings)
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            _current.reset(token)
+        response.headers['Server-Timing'] = timings.header()
+        return response
+    return wrapper
@@ -0,0 +1,142 @@
+"""
+Vectorized encodings of the quick-checkup training data (symptom-disease.csv), shared by
+the training and analysis scripts instead of per-row iterrows() loops.
+
+    sorted_severity_matrix - per row, the severity weights of its symptoms sorted
+                             descending and zero-padded to 17 slots (the input of the
+                             deployed quick-checkup model)
+    bag_of_symptoms        - one 0/1 column per distinct symptom (multi-hot)
+
+Both produce exactly what the legacy loops produced and can return a scipy CSR matrix
+instead (`sparse=True`); most cells are zero, so that is the cheaper form at scale.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse as _sparse
+except ImportError:  # only needed for sparse=True
+    _sparse = None
+
+# Width of the sorted-severity vector the quick-checkup model takes
+SEVERITY_SLOTS = 17
+
+
+def symptom_columns(df):
+    """The Symptom_1 ... Symptom_17 columns of a symptom-disease frame."""
+    return [col for col in df.columns if 'Symptom' in col]
+
+
+def clean_symptom_frame(df):
+    """
+    Copy of `df` with '_' replaced by ' ' and surrounding whitespace stripped in every
+    column, the cleaning the sorted-severity training script applies to the dataset and
+    to Symptom-severity.csv.
+    """
+    return df.apply(lambda col: col.str.replace('_', ' ').str.strip())
+
+
+def _require_scipy():
+    if _sparse is None:
+        raise ImportError("scipy is required for sparse=True")
+    return _sparse
+
+
+def _column_codes(df, cols, translate, missing, dtype):
+    """
+    (n_rows, len(cols)) array with translate(distinct values of the column)[cell] per cell
+    and `missing` for empty cells. Each column is factorized first, so the per-value work
+    (string stripping, dictionary lookups) runs once per distinct symptom, not per cell.
+    """
+    out = np.empty((len(df), len(cols)), dtype=dtype)
+    for j, col in enumerate(cols):
+        codes, uniques = pd.factorize(df[col])
+        # Code -1 (empty cell) picks the appended `missing`
+        out[:, j] = np.append(translate(uniques), missing)[codes]
+    return out
+
+
+def sorted_severity_matrix(df, symptom_weights, symptom_cols=None, slots=SEVERITY_SLOTS, unknown_weight=0,
+                           sparse=False):
+    """
+    Sorted-severity encoding: row i holds the weights of row i's symptoms, largest first,
+    then zeros up to `slots` (truncated if a row has more).
+
+    Args:
+        df: Symptom-disease frame (clean it first if the weights are keyed on cleaned names).
+        symptom_weights: Symptom -> severity weight.
+        unknown_weight: Weight of a symptom missing from `symptom_weights`.
+        sparse: Return a scipy CSR matrix instead of a numpy array.
+
+    Returns:
+        (n_rows, slots) array with the dtype of the weights.
+    """
+    cols = symptom_columns(df) if symptom_cols is None else symptom_cols
+    n_rows = len(df)
+
+    names = pd.Index(list(symptom_weights))
+    weights = np.array(list(symptom_weights.values()))
+    dtype = weights.dtype if weights.size else np.dtype(np.int64)
+    # Index -1 (unknown symptom) picks the appended unknown weight
+    lookup = np.append(weights.astype(np.float64), float(unknown_weight))
+    # Empty cells sort after every real weight (even negative ones), then become padding
+    encoded = _column_codes(df, cols, lambda uniques: lookup[names.get_indexer(uniques)], -np.inf, np.float64)
+    encoded = -np.sort(-encoded, axis=1)
+    encoded[np.isinf(encoded)] = 0
+
+    if len(cols) >= slots:
+        encoded = encoded[:, :slots]
+    else:
+        encoded = np.hstack([encoded, np.zeros((n_rows, slots - len(cols)))])
+    matrix = encoded.astype(dtype)
+    return _require_scipy().csr_matrix(matrix) if sparse else matrix
+
+
+def _stripped(values):
+    return pd.Series(values).astype(str).str.strip().to_numpy(dtype=object)
+
+
+def symptom_vocabulary(df, symptom_cols=None):
+    """Sorted distinct symptoms, whitespace-stripped, blank cells ignored."""
+    cols = symptom_columns(df) if symptom_cols is None else symptom_cols
+    vocabulary = set()
+    for col in cols:
+        vocabulary.update(_stripped(df[col].dropna().unique()))
+    vocabulary.discard('')
+    return sorted(vocabulary)
+
+
+def bag_of_symptoms(df, symptom_cols=None, vocabulary=None, sparse=False):
+    """
+    Bag-of-symptoms encoding: cell (i, j) is 1 when row i lists vocabulary[j] (after
+    stripping whitespace), else 0. Symptoms outside `vocabulary` are ignored.
+
+    Args:
+        vocabulary: Feature order; defaults to symptom_vocabulary(df).
+        sparse: Return a scipy CSR matrix instead of a DataFrame.
+
+    Returns:
+        (matrix, vocabulary): an int64 DataFrame indexed like `df` with one column per
+        symptom (or a CSR matrix), and the vocabulary list.
+    """
+    cols = symptom_columns(df) if symptom_cols is None else symptom_cols
+    if vocabulary is None:
+        vocabulary = symptom_vocabulary(df, cols)
+    n_rows = len(df)
+
+    index = pd.Index(vocabulary)
+    # Vocabulary column of every cell, -1 for empty cells and unknown symptoms
+    columns = _column_codes(df, cols, lambda uniques: index.get_indexer(_stripped(uniques)), -1, np.int64)
+    rows, slots = np.nonzero(columns >= 0)
+    columns = columns[rows, slots]
+
+    if sparse:
+        matrix = _require_scipy().csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, columns)),
+                                             shape=(n_rows, len(vocabulary)))
+        # A symptom listed twice in a row is still a single 1
+        matrix.data[:] = 1
+        return matrix, vocabulary
+
+    matrix = np.zeros((n_rows, len(vocabulary)), dtype=np.int64)
+    matrix[rows, columns] = 1
+    return pd.DataFrame(matrix, index=df.index, columns=vocabulary), vocabulary
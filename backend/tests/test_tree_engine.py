@@ -0,0 +1,73 @@
+"""
+Differential test: CompiledTreeEnsemble must reproduce sklearn's predictions exactly.
+
+The same check as scripts/verify_tree_engine.py, over the heart disease GradientBoosting
+model and the quick-checkup RandomForest: every training row plus rows sitting exactly on
+split thresholds, predicted as one batch and one row at a time.
+
+Run from the backend folder:
+    python -m pytest tests
+"""
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from scripts.verify_tree_engine import HEART_MODEL, QUICK_MODEL, heart_inputs, quick_inputs, threshold_inputs
+from src.services.tree_engine import CompiledTreeEnsemble
+
+# The heart model was fitted on a DataFrame; both sides get the same plain arrays here
+pytestmark = pytest.mark.filterwarnings('ignore:X does not have valid feature names')
+
+
+def _case(model, X):
+    engine = CompiledTreeEnsemble(model)
+    return model, engine, np.vstack([X, threshold_inputs(engine, X)])
+
+
+@pytest.fixture(scope='module')
+def heart():
+    return _case(joblib.load(HEART_MODEL), heart_inputs())
+
+
+@pytest.fixture(scope='module')
+def quick():
+    X, y = quick_inputs()
+    if os.path.exists(QUICK_MODEL):
+        rf = joblib.load(QUICK_MODEL)
+    else:
+        # rf_QuickCheckup.joblib is not checked in; fit a forest on the same data instead
+        from sklearn.ensemble import RandomForestClassifier
+        rf = RandomForestClassifier(random_state=42).fit(X, y)
+    return _case(rf, X)
+
+
+@pytest.fixture(params=['heart', 'quick'])
+def case(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_batch_predict_matches_sklearn(case):
+    model, engine, X = case
+    np.testing.assert_array_equal(engine.predict(X), model.predict(X))
+
+
+def test_single_row_predict_matches_sklearn(case):
+    model, engine, X = case
+    single = np.array([engine.predict(X[i:i + 1])[0] for i in range(len(X))])
+    np.testing.assert_array_equal(single, model.predict(X))
+
+
+def test_gradient_boosting_scores_match_sklearn(heart):
+    model, engine, X = heart
+    np.testing.assert_array_equal(engine.decision_function(X), model.decision_function(X))
+    # One row at a time takes the engine's scalar accumulation path
+    for i in range(len(X)):
+        np.testing.assert_array_equal(engine.decision_function(X[i:i + 1]), model.decision_function(X[i:i + 1]))
+
+
+def test_rejects_wrong_feature_count(heart):
+    _, engine, X = heart
+    with pytest.raises(ValueError):
+        engine.predict(X[:, :-1])
@@ -1,15 +1,134 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from types import MappingProxyType
 import joblib
-import pandas as pd
 import numpy as np
 import streamlit as st
-from sklearn.preprocessing import MinMaxScaler
+from services.remote_services import BackendClient, BackendUnavailable, RemoteQuickCheckupService, remote_full_checkup
+from utils.translations import SYMPTOM_TRANSLATIONS
+# pandas and scikit-learn are imported where the local services are built, so the remote
+# mode does not load them unless it has to fall back to local models.
 
 # Define paths relative to frontend-st folder
 # Assuming we run: streamlit run main_st.py inside frontend-st
 BACKEND_DIR = os.path.abspath(os.path.join(os.getcwd(), '..', 'backend'))
 ASSETS_DIR = os.path.join(BACKEND_DIR, 'assets')
 NOTEBOOKS_DIR = os.path.join(BACKEND_DIR, 'notebooks')
+RISK_FACTORS_PATH = os.path.join(NOTEBOOKS_DIR, 'datasets', 'full_checkup', 'disease_riskFactors.csv')
+
+# Full checkup: the three models run concurrently on one long-lived pool (shared by all
+# sessions), and results are memoized per normalized payload with a size bound and TTL.
+FULL_CHECKUP_WORKERS = int(os.getenv('FULL_CHECKUP_WORKERS', '6'))
+FULL_CHECKUP_DEADLINE_MS = float(os.getenv('FULL_CHECKUP_DEADLINE_MS', '5000'))
+FULL_CHECKUP_CACHE_ENTRIES = int(os.getenv('FULL_CHECKUP_CACHE_ENTRIES', '512'))
+FULL_CHECKUP_CACHE_TTL_SECONDS = int(os.getenv('FULL_CHECKUP_CACHE_TTL_SECONDS', '3600'))
+
+UNAVAILABLE = "Informasi tidak tersedia."
+
+# 'local' loads every model into this process; 'remote' sends predictions to the backend
+# (services/remote_services.py) and only loads local models while it is unreachable.
+INFERENCE_MODE = os.getenv('STREAMLIT_INFERENCE_MODE', 'local')
+
+def build_disease_index(desc_path, precaution_path):
+    """
+    Compiles the description and precaution CSVs into an immutable
+    disease -> (description, precautions tuple) mapping (same as the backend's index).
+    """
+    import pandas as pd
+
+    descriptions = {}
+    if os.path.exists(desc_path):
+        desc_df = pd.read_csv(desc_path)
+        for disease, desc in zip(desc_df['Disease'], desc_df['Description']):
+            descriptions.setdefault(disease, desc)
+
+    precautions = {}
+    if os.path.exists(precaution_path):
+        prec_df = pd.read_csv(precaution_path)
+        for row in prec_df.itertuples(index=False):
+            disease, raw_p = row[0], row[1:]
+            if disease not in precautions:
+                precautions[disease] = tuple(str(p) for p in raw_p if pd.notna(p))
+
+    index = {}
+    for disease in descriptions.keys() | precautions.keys():
+        index[disease] = (
+            descriptions.get(disease, "Deskripsi tidak tersedia."),
+            precautions.get(disease, ())
+        )
+    return MappingProxyType(index)
+
+def build_risk_factor_catalog(path):
+    """
+    Reads disease_riskFactors.csv once into an immutable DNAME -> (PRECAU, RISKFAC)
+    mapping (first row wins for a duplicated DNAME), in file order.
+    """
+    import pandas as pd
+
+    catalog = {}
+    try:
+        if os.path.exists(path):
+            df = pd.read_csv(path, encoding='latin1')
+            for name, precau, riskfac in zip(df['DNAME'], df['PRECAU'], df['RISKFAC']):
+                if pd.notna(name):
+                    catalog.setdefault(str(name), (precau, riskfac))
+    except Exception as e:
+        st.error(f"Error loading risk factors: {e}")
+    return MappingProxyType(catalog)
+
+def risk_factor_context(catalog, term, exact=False):
+    """
+    (precautions, risk factors) for a disease: exact DNAME match, or the first DNAME
+    containing `term` case-insensitively (like `df['DNAME'].str.contains(term, case=False)`).
+    """
+    if exact:
+        entry = catalog.get(term)
+    else:
+        entry = next((v for name, v in catalog.items() if term.lower() in name.lower()), None)
+    return entry if entry is not None else (UNAVAILABLE, UNAVAILABLE)
+
+def model_row(model, feature_names, values):
+    """
+    Single-row model input for `values` (in `feature_names` order). A model fitted with
+    feature names gets a DataFrame with its `feature_names_in_` columns, so sklearn can check
+    them; any other model, or one whose names are not all in `feature_names`, a plain array.
+    """
+    columns = getattr(model, 'feature_names_in_', None)
+    if columns is None or not set(columns) <= set(feature_names):
+        return np.array([values], dtype=float)
+    import pandas as pd
+    return pd.DataFrame([[values[feature_names.index(c)] for c in columns]], columns=columns, dtype=float)
+
+class SymptomCatalog:
+    """
+    The quick-checkup symptom picker's options: Indonesian labels sorted once, with the
+    label -> symptom key map. Built once per process (get_symptom_catalog) instead of on
+    every rerun of the page.
+    """
+    def __init__(self, symptom_keys):
+        options = [(SYMPTOM_TRANSLATIONS.get(key, key.replace("_", " ").title()), key) for key in symptom_keys]
+        # Sort by Label (Indonesian)
+        options.sort(key=lambda x: x[0])
+        self.label_to_key = MappingProxyType({label: key for label, key in options})
+        # "" is the empty choice and always stays first
+        self.all_labels = ("",) + tuple(self.label_to_key)
+        self._position = {label: i for i, label in enumerate(self.all_labels) if label}
+        self.options_excluding = lru_cache(maxsize=4096)(self._options_excluding)
+
+    def _options_excluding(self, chosen: frozenset):
+        """All labels except the chosen ones, in catalog order (memoized per selection)."""
+        positions = sorted(self._position[label] for label in chosen & self._position.keys())
+        options, start = [], 0
+        for position in positions:
+            options.extend(self.all_labels[start:position])
+            start = position + 1
+        options.extend(self.all_labels[start:])
+        return tuple(options)
+
+    def keys_for(self, labels):
+        """Symptom keys of the non-empty labels, in order."""
+        return [self.label_to_key[label] for label in labels if label]
 
 class QuickCheckupService:
     def __init__(self):
@@ -23,21 +142,23 @@ class QuickCheckupService:
         
         self.model = None
         self.symptom_weights = {}
-        self.desc_df = None
-        self.prec_df = None
+        self.disease_index = MappingProxyType({})
         
         self._load()
 
+    @property
+    def available(self):
+        return self.model is not None
+
     def _load(self):
+        import pandas as pd
+
         try:
             if os.path.exists(self.model_path):
                 self.model = joblib.load(self.model_path)
             
-            if os.path.exists(self.desc_path):
-                self.desc_df = pd.read_csv(self.desc_path)
-            
-            if os.path.exists(self.precaution_path):
-                self.prec_df = pd.read_csv(self.precaution_path)
+            # Compiled once; the description/precaution DataFrames are not kept
+            self.disease_index = build_disease_index(self.desc_path, self.precaution_path)
                 
             if os.path.exists(self.severity_path):
                 sev_df = pd.read_csv(self.severity_path)
@@ -67,20 +188,8 @@ class QuickCheckupService:
             vector_np = np.array([input_vector])
             prediction = self.model.predict(vector_np)[0]
             
-            desc = "Deskripsi tidak tersedia."
-            precautions = []
-            
-            if self.desc_df is not None:
-                row = self.desc_df[self.desc_df['Disease'] == prediction]
-                if not row.empty:
-                    desc = row.iloc[0]['Description']
-            
-            if self.prec_df is not None:
-                row = self.prec_df[self.prec_df['Disease'] == prediction]
-                if not row.empty:
-                    # Precautions occupy columns 1 onwards
-                    raw_p = row.iloc[0, 1:].tolist()
-                    precautions = [str(p) for p in raw_p if pd.notna(p)]
+            desc, precautions = self.disease_index.get(prediction, ("Deskripsi tidak tersedia.", ()))
+            precautions = list(precautions)
 
             return {
                 "Disease": prediction,
@@ -94,23 +203,42 @@ class QuickCheckupService:
     # ... (QuickCheckupService remains same)
 
 class DiabetesService:
+    # Artifact layout versions written by notebooks/notebook/export_diabetes_pipeline.py
+    SUPPORTED_PIPELINE_VERSIONS = (1,)
+
     def __init__(self):
-        self.model_path = os.path.join(ASSETS_DIR, 'models', 'full_checkup', 'diabetes_models', 'svc_diabetes.joblib')
+        models_dir = os.path.join(ASSETS_DIR, 'models', 'full_checkup', 'diabetes_models')
+        self.pipeline_path = os.path.join(models_dir, 'diabetes_pipeline.joblib')
+        self.model_path = os.path.join(models_dir, 'svc_diabetes.joblib')
         self.dataset_path = os.path.join(NOTEBOOKS_DIR, 'datasets', 'full_checkup', 'diabetes-dataset.csv')
-        self.risk_factors_path = os.path.join(NOTEBOOKS_DIR, 'datasets', 'full_checkup', 'disease_riskFactors.csv')
+        self.risk_factors_path = RISK_FACTORS_PATH
         
         self.model = None
         self.scaler = None
         self.feature_names = ['Glucose', 'BloodPressure', 'BMI', 'Age']
+        # Resolved once from the shared catalog instead of re-reading the CSV per call
+        self.context = risk_factor_context(get_risk_factor_catalog(), 'Diabetes', exact=True)
         
         self._init_service()
 
     def _init_service(self):
         try:
+            # Preferred: persisted scaler+SVC pipeline, no training CSV needed
+            if os.path.exists(self.pipeline_path):
+                artifact = joblib.load(self.pipeline_path)
+                if artifact.get('format_version') in self.SUPPORTED_PIPELINE_VERSIONS:
+                    pipeline = artifact['pipeline']
+                    self.scaler = pipeline.named_steps['scaler']
+                    self.model = pipeline.named_steps['svc']
+                    return
+
             if os.path.exists(self.model_path):
                 self.model = joblib.load(self.model_path)
             
             if os.path.exists(self.dataset_path):
+                import pandas as pd
+                from sklearn.preprocessing import MinMaxScaler
+
                 raw_df = pd.read_csv(self.dataset_path)
                 # Columns: [Glucose, BloodPressure, BMI, Age] -> Indices [1, 2, 5, 7]
                 # We fit on these columns
@@ -144,7 +272,7 @@ class DiabetesService:
             # For SVC, usually array is fine if scaler returned array.
             pred = self.model.predict(scaled_input)[0]
             
-            precautions, risk_factors = self._get_context()
+            precautions, risk_factors = self.context
 
             if pred == 1:
                 return {
@@ -162,24 +290,14 @@ class DiabetesService:
         except Exception as e:
             return {'error': str(e)}
 
-    def _get_context(self):
-        try:
-            if os.path.exists(self.risk_factors_path):
-                df = pd.read_csv(self.risk_factors_path, encoding='latin1')
-                row = df[df['DNAME'] == 'Diabetes']
-                if not row.empty:
-                    return row.iloc[0]['PRECAU'], row.iloc[0]['RISKFAC']
-        except Exception:
-            pass
-        return "Informasi tidak tersedia.", "Informasi tidak tersedia."
-
 class HeartService:
     def __init__(self):
         self.model_path = os.path.join(ASSETS_DIR, 'models', 'full_checkup', 'heartd_models', 'heartD_model.joblib')
-        self.risk_factors_path = os.path.join(NOTEBOOKS_DIR, 'datasets', 'full_checkup', 'disease_riskFactors.csv')
+        self.risk_factors_path = RISK_FACTORS_PATH
         self.model = None
         # Heart dataset cols: age,sex,cp,trestbps,chol,fbs,restecg,thalach,exang,oldpeak,slope,ca,thal
         self.feature_names = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+        self.context = risk_factor_context(get_risk_factor_catalog(), 'Heart')
         
         if os.path.exists(self.model_path):
             self.model = joblib.load(self.model_path)
@@ -189,28 +307,26 @@ class HeartService:
             return {'error': 'Model not loaded.'}
 
         try:
-            features_dict = {
-                'age': float(data.get('age', 0)),
-                'sex': float(data.get('sex', 0)),
-                'cp': float(data.get('cp', 0)),
-                'trestbps': float(data.get('bloodpressure', 0)), # Note mapping: bloodpressure -> trestbps
-                'chol': float(data.get('chol', 0)),
-                'fbs': float(data.get('fbs', 0)),
-                'restecg': float(data.get('restecg', 0)),
-                'thalach': float(data.get('thalach', 0)),
-                'exang': float(data.get('exang', 0)),
-                'oldpeak': float(data.get('oldpeak', 0)),
-                'slope': float(data.get('slope', 0)),
-                'ca': float(data.get('ca', 0)),
-                'thal': float(data.get('thal', 0))
-            }
-            
-            # Create DataFrame
-            input_df = pd.DataFrame([features_dict], columns=self.feature_names)
+            # Same order as self.feature_names
+            values = [
+                float(data.get('age', 0)),
+                float(data.get('sex', 0)),
+                float(data.get('cp', 0)),
+                float(data.get('bloodpressure', 0)), # Note mapping: bloodpressure -> trestbps
+                float(data.get('chol', 0)),
+                float(data.get('fbs', 0)),
+                float(data.get('restecg', 0)),
+                float(data.get('thalach', 0)),
+                float(data.get('exang', 0)),
+                float(data.get('oldpeak', 0)),
+                float(data.get('slope', 0)),
+                float(data.get('ca', 0)),
+                float(data.get('thal', 0))
+            ]
             
-            prediction = self.model.predict(input_df)[0]
+            prediction = self.model.predict(model_row(self.model, self.feature_names, values))[0]
             
-            precautions, risk_factors = self._get_context_data()
+            precautions, risk_factors = self.context
 
             if prediction == 1:
                 return {
@@ -228,23 +344,12 @@ class HeartService:
         except Exception as e:
             return {'error': str(e)}
 
-    def _get_context_data(self):
-        try:
-            if os.path.exists(self.risk_factors_path):
-                df = pd.read_csv(self.risk_factors_path, encoding='latin1')
-                # Try finding Heart
-                row = df[df['DNAME'].str.contains('Heart', case=False, na=False)]
-                if not row.empty:
-                    return row.iloc[0]['PRECAU'], row.iloc[0]['RISKFAC']
-        except Exception:
-            pass
-        return "Informasi tidak tersedia.", "Informasi tidak tersedia."
-
 class StrokeService:
     def __init__(self):
         self.model_path = os.path.join(ASSETS_DIR, 'models', 'full_checkup', 'stroke_model.joblib')
-        self.risk_factors_path = os.path.join(NOTEBOOKS_DIR, 'datasets', 'full_checkup', 'disease_riskFactors.csv')
+        self.risk_factors_path = RISK_FACTORS_PATH
         self.model = None
+        self.context = risk_factor_context(get_risk_factor_catalog(), 'Stroke')
         # Stroke cols: gender,age,hypertension,heart_disease,ever_married,work_type,Residence_type,avg_glucose_level,bmi,smoking_status
         self.feature_names = [
             'gender', 'age', 'hypertension', 'heart_disease', 'ever_married', 
@@ -269,27 +374,31 @@ class StrokeService:
             w_val = w_map.get(data.get('worktype'), 3) # default Private
             s_val = s_map.get(data.get('smoke'), 2)    # default never_smoked
             
-            # Map backend inputs to model features
-            row = {
-                'gender': int(data.get('sex', 1)), # 1=Male
-                'age': float(data.get('age', 0)),
-                'hypertension': int(data.get('hypertension', 0)),
-                'heart_disease': int(data.get('heartdisease', 0)),
-                'ever_married': int(data.get('maritalstatus', 0)), # 1=Married
-                'work_type': int(w_val),
-                'Residence_type': int(data.get('residence', 1)), # 1=Urban
-                'avg_glucose_level': float(data.get('glucose', 0)),
-                'bmi': float(data.get('bmi', 0)),
-                'smoking_status': int(s_val)
-            }
-            
-            # Construct DataFrame with proper feature names
-            input_df = pd.DataFrame([row], columns=self.feature_names)
+            # Map backend inputs to model features (same order as self.feature_names)
+            values = [
+                int(data.get('sex', 1)), # 1=Male
+                float(data.get('age', 0)),
+                int(data.get('hypertension', 0)),
+                int(data.get('heartdisease', 0)),
+                int(data.get('maritalstatus', 0)), # 1=Married
+                int(w_val),
+                int(data.get('residence', 1)), # 1=Urban
+                float(data.get('glucose', 0)),
+                float(data.get('bmi', 0)),
+                int(s_val)
+            ]
     
-            prediction_raw = self.model.predict(input_df)[0]
+            try:
+                prediction_raw = self.model.predict(model_row(self.model, self.feature_names, values))[0]
+            except Exception as e:
+                # Fallback if model was trained on array
+                try:
+                    prediction_raw = self.model.predict(np.array([values], dtype=float))[0]
+                except Exception as e2:
+                    return {'error': f"Main: {str(e)} | Backup: {str(e2)}"}
             is_stroke_risk = int(prediction_raw) == 1
             
-            precautions, risk_factors = self._get_advice_context()
+            precautions, risk_factors = self.context
 
             if is_stroke_risk:
                 return {
@@ -305,44 +414,28 @@ class StrokeService:
                 }
 
         except Exception as e:
-            # Fallback if model was trained on array
-            try:
-                features = np.array([list(row.values())], dtype=float)
-                prediction_raw = self.model.predict(features)[0]
-                is_stroke_risk = int(prediction_raw) == 1
-                precautions, risk_factors = self._get_advice_context()
-                if is_stroke_risk:
-                    return {
-                        'prediksi_stroke': "Anda berkemungkinan terkena Stroke.",
-                        'saran_stroke': f"Saran: {precautions}",
-                        'faktor_risiko_stroke': f"Faktor Risiko: {risk_factors}"
-                    }
-                else:
-                    return {
-                        'prediksi_stroke': "Anda tidak berkemungkinan terkena Stroke.",
-                        'saran_stroke': f"Pencegahan: {precautions}",
-                        'faktor_risiko_stroke': f"Faktor Risiko: {risk_factors}"
-                    }
-            except Exception as e2:
-                return {'error': f"Main: {str(e)} | Backup: {str(e2)}"}
-
-    def _get_advice_context(self):
-        try:
-            if os.path.exists(self.risk_factors_path):
-                df = pd.read_csv(self.risk_factors_path, encoding='latin1')
-                # Try finding Stroke
-                row = df[df['DNAME'].str.contains('Stroke', case=False, na=False)]
-                if not row.empty:
-                    return row.iloc[0]['PRECAU'], row.iloc[0]['RISKFAC']
-        except Exception:
-            pass
-        return "Informasi tidak tersedia.", "Informasi tidak tersedia."
+            return {'error': str(e)}
 
 # Singleton instances wrapped for caching
 @st.cache_resource
-def get_quick_checkup_service():
+def get_backend_client():
+    return BackendClient()
+
+@st.cache_resource
+def get_local_quick_checkup_service():
     return QuickCheckupService()
 
+@st.cache_resource
+def get_quick_checkup_service():
+    if INFERENCE_MODE == 'remote':
+        severity_path = os.path.join(NOTEBOOKS_DIR, 'datasets', 'quick_checkup', 'Symptom-severity.csv')
+        return RemoteQuickCheckupService(get_backend_client(), severity_path, get_local_quick_checkup_service)
+    return get_local_quick_checkup_service()
+
+@st.cache_resource
+def get_symptom_catalog():
+    return SymptomCatalog(get_quick_checkup_service().symptom_weights.keys())
+
 @st.cache_resource
 def get_diabetes_service():
     return DiabetesService()
@@ -354,3 +447,95 @@ def get_heart_service():
 @st.cache_resource
 def get_stroke_service():
     return StrokeService()
+
+@st.cache_resource
+def get_risk_factor_catalog():
+    return build_risk_factor_catalog(RISK_FACTORS_PATH)
+
+# --- Full checkup ---
+
+_model_executor = ThreadPoolExecutor(max_workers=FULL_CHECKUP_WORKERS, thread_name_prefix='full-checkup')
+
+class _UncachedResults(Exception):
+    """Carries results out of the cached function without caching them (st.cache_data skips raises)."""
+    def __init__(self, results):
+        super().__init__('not cached')
+        self.results = results
+
+def normalize_payload(data: dict):
+    """
+    Hashable canonical form of a full-checkup payload: keys sorted, numbers (and bools)
+    as floats, strings stripped, so equal submissions share one cache entry.
+    """
+    items = []
+    for key in sorted(data):
+        value = data[key]
+        if isinstance(value, (bool, int, float, np.integer, np.floating)):
+            value = float(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        items.append((key, value))
+    return tuple(items)
+
+def run_full_checkup(services: dict, data: dict, deadline_ms=None):
+    """
+    Runs every service's predict on `data` concurrently; a model that misses the shared
+    deadline gets an {'error': ...} result instead of holding up the others.
+    """
+    deadline_ms = FULL_CHECKUP_DEADLINE_MS if deadline_ms is None else deadline_ms
+    futures = {name: _model_executor.submit(service.predict, data) for name, service in services.items()}
+    wait(futures.values(), timeout=deadline_ms / 1000.0)
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            results[name] = {'error': f"Waktu pemrosesan habis ({deadline_ms:.0f} ms)."}
+        else:
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {'error': str(e)}
+    return results
+
+def load_full_checkup_services():
+    """Loads the three local models ahead of the first submission (nothing to load in remote mode)."""
+    if INFERENCE_MODE != 'remote':
+        get_diabetes_service()
+        get_heart_service()
+        get_stroke_service()
+
+def _local_full_checkup(data: dict):
+    # Services are st.cache_resource singletons, resolved on the script thread
+    services = {
+        'diabetes': get_diabetes_service(),
+        'heart': get_heart_service(),
+        'stroke': get_stroke_service(),
+    }
+    return run_full_checkup(services, data)
+
+@st.cache_data(max_entries=FULL_CHECKUP_CACHE_ENTRIES, ttl=FULL_CHECKUP_CACHE_TTL_SECONDS, show_spinner=False)
+def _cached_full_checkup(payload: tuple):
+    data = dict(payload)
+    if INFERENCE_MODE == 'remote':
+        try:
+            results = remote_full_checkup(get_backend_client(), data)
+        except BackendUnavailable:
+            # Not cached, so answers come from the backend again once it is back
+            raise _UncachedResults(_local_full_checkup(data))
+    else:
+        results = _local_full_checkup(data)
+    if any('error' in r for r in results.values()):
+        # Errors and timeouts may be transient: recompute them on the next submission
+        raise _UncachedResults(results)
+    return results
+
+def predict_full_checkup(data: dict):
+    """
+    Diabetes, heart disease and stroke results for one payload, keyed 'diabetes', 'heart'
+    and 'stroke'. Identical submissions (after normalize_payload) are served from the
+    cache across reruns and sessions until FULL_CHECKUP_CACHE_TTL_SECONDS.
+    """
+    try:
+        return _cached_full_checkup(normalize_payload(data))
+    except _UncachedResults as e:
+        return e.results
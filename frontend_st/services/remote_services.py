@@ -0,0 +1,147 @@
+import csv
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Backend the remote mode sends predictions to (backend/main.py, /full-checkup and /quick-checkup)
+BACKEND_URL = os.getenv('BACKEND_URL', f"http://127.0.0.1:{os.getenv('BACKEND_PORT', '5000')}")
+REMOTE_CONNECT_TIMEOUT_SECONDS = float(os.getenv('REMOTE_CONNECT_TIMEOUT_SECONDS', '1'))
+REMOTE_READ_TIMEOUT_SECONDS = float(os.getenv('REMOTE_READ_TIMEOUT_SECONDS', '10'))
+REMOTE_POOL_SIZE = int(os.getenv('REMOTE_POOL_SIZE', '10'))
+# After a connection failure, how long calls go straight to the local fallback
+REMOTE_RETRY_SECONDS = float(os.getenv('REMOTE_RETRY_SECONDS', '15'))
+
+# The form's categorical values -> the backend's (backend/src/services/patient_input.py);
+# values not listed are spelled the same. 'Unknown' smoking has no backend code, so it is
+# left out and the backend applies its default.
+BACKEND_WORKTYPE = {'children': 'age', 'never_worked': 'nojob'}
+BACKEND_SMOKE = {'never_smoked': 'non_smoker', 'smokes': 'smoker'}
+
+# Result key used by the views -> (backend section name, suffix of the service's keys)
+FULL_CHECKUP_SECTIONS = {
+    'diabetes': ('Diabetes', 'diabetes'),
+    'heart': ('Heart Disease', 'heartd'),
+    'stroke': ('Stroke', 'stroke'),
+}
+
+
+class BackendUnavailable(Exception):
+    """The backend could not answer (unreachable, timeout, 5xx or a non-JSON body)."""
+
+
+class BackendClient:
+    """
+    Keep-alive HTTP client for the backend, one per Streamlit process.
+
+    A single Session whose urllib3 pool is shared by every session's script thread, so
+    predictions reuse TCP connections. After a connection failure the backend is treated
+    as down for `retry_seconds`: callers fall back to local models immediately instead of
+    each waiting for the connect timeout.
+    """
+    def __init__(self, base_url=BACKEND_URL, connect_timeout=REMOTE_CONNECT_TIMEOUT_SECONDS,
+                 read_timeout=REMOTE_READ_TIMEOUT_SECONDS, pool_size=REMOTE_POOL_SIZE,
+                 retry_seconds=REMOTE_RETRY_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry_seconds = retry_seconds
+        self.session = requests.Session()
+        # No transparent retries: a failed call goes to the local fallback instead
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._down_until = 0.0
+
+    @property
+    def reachable(self):
+        """False while a recent connection failure is being waited out."""
+        return time.monotonic() >= self._down_until
+
+    def post(self, path, payload):
+        """Decoded JSON body of a POST (also for 4xx answers). Raises BackendUnavailable."""
+        if not self.reachable:
+            raise BackendUnavailable(f"{self.base_url} unreachable, retrying after {self.retry_seconds:.0f}s")
+        try:
+            response = self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self._down_until = time.monotonic() + self.retry_seconds
+            raise BackendUnavailable(str(e)) from e
+        if response.status_code >= 500:
+            raise BackendUnavailable(f"HTTP {response.status_code} from {path}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise BackendUnavailable(f"Invalid JSON from {path}") from e
+
+
+def read_symptom_weights(path):
+    """Symptom -> weight from Symptom-severity.csv, read without pandas."""
+    weights = {}
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                weights[row['Symptom']] = int(row['weight'])
+    return weights
+
+
+class RemoteQuickCheckupService:
+    """
+    QuickCheckupService that predicts through the backend's /quick-checkup.
+
+    Only the symptom list is loaded here (the view builds its options from it); the local
+    model is built by `local_service()` the first time the backend cannot be reached.
+    """
+    def __init__(self, client, severity_path, local_service):
+        self.client = client
+        self.symptom_weights = read_symptom_weights(severity_path)
+        self._local_service = local_service
+
+    @property
+    def available(self):
+        return bool(self.symptom_weights)
+
+    def predict(self, symptoms: list):
+        # The backend reads up to 17 slots named Symptom_1 ... Symptom_17
+        payload = {f"Symptom_{i}": str(s).strip() for i, s in enumerate(symptoms[:17], start=1)}
+        try:
+            return self.client.post('/quick-checkup', payload)
+        except BackendUnavailable:
+            return self._local_service().predict(symptoms)
+
+
+def to_backend_payload(data: dict):
+    """A full-checkup form payload in the backend's vocabulary."""
+    payload = dict(data)
+    if 'worktype' in payload:
+        payload['worktype'] = BACKEND_WORKTYPE.get(payload['worktype'], payload['worktype'])
+    if payload.get('smoke') == 'Unknown':
+        del payload['smoke']
+    elif 'smoke' in payload:
+        payload['smoke'] = BACKEND_SMOKE.get(payload['smoke'], payload['smoke'])
+    return payload
+
+
+def from_backend_results(body: dict):
+    """
+    /full-checkup response -> {'diabetes': ..., 'heart': ..., 'stroke': ...} in the shape the
+    local services return (prediksi_/saran_/faktor_risiko_<suffix> keys, or {'error': ...}).
+    """
+    sections = body.get('results') or {}
+    results = {}
+    for key, (name, suffix) in FULL_CHECKUP_SECTIONS.items():
+        section = sections.get(name)
+        if not section or section.get('timed_out') or section.get('Prediksi') in ('Error', 'Timeout'):
+            reason = 'Timeout' if section and section.get('timed_out') else body.get('error', 'Error')
+            results[key] = {'error': f"Backend: {reason}"}
+        else:
+            results[key] = {
+                f'prediksi_{suffix}': section['Prediksi'],
+                f'saran_{suffix}': section['Saran'],
+                f'faktor_risiko_{suffix}': section['Faktor Risiko'],
+            }
+    return results
+
+
+def remote_full_checkup(client, data: dict):
+    """All three predictions with one /full-checkup call. Raises BackendUnavailable."""
+    return from_backend_results(client.post('/full-checkup', to_backend_payload(data)))
@@ -1,5 +1,5 @@
 import streamlit as st
-from services.checkup_services import get_diabetes_service, get_heart_service, get_stroke_service
+from services.checkup_services import load_full_checkup_services, predict_full_checkup
 
 def render_page():
     # --- Custom CSS for Full Checkup ---
@@ -43,10 +43,8 @@ def render_page():
     st.title("🩺 Full Health Checkup")
     st.markdown("Isi data kesehatan lengkap Anda untuk mendapatkan prediksi risiko **Diabetes**, **Penyakit Jantung**, dan **Stroke** secara bersamaan.")
 
-    # Instantiate Services
-    diabetes_service = get_diabetes_service()
-    heart_service = get_heart_service()
-    stroke_service = get_stroke_service()
+    # Load the models before the first submission (local inference mode)
+    load_full_checkup_services()
 
     # --- Form Input Section ---
     with st.form("full_checkup_form"):
@@ -136,9 +134,11 @@ def render_page():
                 "thal": thal
             }
             
-            res_diabetes = diabetes_service.predict(data_payload)
-            res_heart = heart_service.predict(data_payload)
-            res_stroke = stroke_service.predict(data_payload)
+            # Concurrent, and memoized per payload across reruns
+            results = predict_full_checkup(data_payload)
+            res_diabetes = results['diabetes']
+            res_heart = results['heart']
+            res_stroke = results['stroke']
             
             # --- Display Results ---
             st.markdown("### 📊 Hasil Analisis")
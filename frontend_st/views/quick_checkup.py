@@ -1,6 +1,5 @@
 import streamlit as st
-from services.checkup_services import get_quick_checkup_service
-from utils.translations import SYMPTOM_TRANSLATIONS
+from services.checkup_services import get_quick_checkup_service, get_symptom_catalog
 
 def render_page():
     # --- Custom CSS for Quick Checkup ---
@@ -67,24 +66,30 @@ def render_page():
     # Instantiate Service
     checkup = get_quick_checkup_service()
 
-    if not checkup.model:
+    if not checkup.available:
         st.error("Model Quick Checkup tidak dapat dimuat. Harap periksa konfigurasi backend.")
         return
 
     # --- Symptom Selection Logic ---
-    # Get all symptoms from the service (which matches the model features)
-    symptom_options = []
-    for key in checkup.symptom_weights.keys():
-        label = SYMPTOM_TRANSLATIONS.get(key, key.replace("_", " ").title())
-        symptom_options.append((label, key))
-    
-    # Sort by Label (Indonesian)
-    symptom_options.sort(key=lambda x: x[0])
-    
-    # Map labels back to keys
-    options_map = {label: key for label, key in symptom_options}
-    all_labels = [""] + list(options_map.keys())
+    # Translated, sorted options built once per process (see SymptomCatalog)
+    catalog = get_symptom_catalog()
+    symptom_picker(checkup, catalog)
+
+    # --- Footer UBM Ancol ---
+    st.markdown("""
+    <div class="footer-ubm">
+        <p><strong>Universitas Bunda Mulia Kampus Ancol</strong></p>
+        <p>MediScope V1 - TSDN 2024 Competition Project</p>
+    </div>
+    """, unsafe_allow_html=True)
 
+# Partial reruns: st.fragment (Streamlit >= 1.37) or st.experimental_fragment (1.33 - 1.36);
+# older versions rerun the whole page as before.
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda f: f)
+
+@fragment
+def symptom_picker(checkup, catalog):
+    """Symptom selectboxes, analyze button and result; choosing a symptom reruns only this."""
     # Form Container
     with st.container():
         c1, c2 = st.columns(2, gap="large")
@@ -96,19 +101,19 @@ def render_page():
         
         with c1:
             # Symptom 1
-            s1_label = st.selectbox("Gejala Utama", all_labels, key="s1", help="Pilih gejala yang paling dominan Anda rasakan.")
+            s1_label = st.selectbox("Gejala Utama", catalog.all_labels, key="s1", help="Pilih gejala yang paling dominan Anda rasakan.")
             
             # Symptom 2 options = All - S1
-            ops2 = [x for x in all_labels if x == "" or x != s1_label]
+            ops2 = catalog.options_excluding(frozenset({s1_label}))
             s2_label = st.selectbox("Gejala Tambahan 1", ops2, key="s2")
 
         with c2:
             # Symptom 3 options = All - S1 - S2
-            ops3 = [x for x in all_labels if x == "" or x not in [s1_label, s2_label]]
+            ops3 = catalog.options_excluding(frozenset({s1_label, s2_label}))
             s3_label = st.selectbox("Gejala Tambahan 2", ops3, key="s3")
             
             # Symptom 4 options = All - S1 - S2 - S3
-            ops4 = [x for x in all_labels if x == "" or x not in [s1_label, s2_label, s3_label]]
+            ops4 = catalog.options_excluding(frozenset({s1_label, s2_label, s3_label}))
             s4_label = st.selectbox("Gejala Tambahan 3", ops4, key="s4")
 
     # --- Prediction Logic ---
@@ -121,8 +126,7 @@ def render_page():
 
     if analyze_btn:
         # Resolve labels back to keys
-        selected_labels = [s for s in [s1_label, s2_label, s3_label, s4_label] if s != ""]
-        selected_keys = [options_map[l] for l in selected_labels]
+        selected_keys = catalog.keys_for([s1_label, s2_label, s3_label, s4_label])
 
         if not selected_keys:
             st.warning("⚠️ Harap pilih setidaknya satu gejala untuk memulai analisis.")
@@ -155,11 +159,3 @@ def render_page():
                                 st.info(f"**{idx+1}.** {p.title()}") 
                     else:
                         st.info(str(precautions))
-
-    # --- Footer UBM Ancol ---
-    st.markdown("""
-    <div class="footer-ubm">
-        <p><strong>Universitas Bunda Mulia Kampus Ancol</strong></p>
-        <p>MediScope V1 - TSDN 2024 Competition Project</p>
-    </div>
-    """, unsafe_allow_html=True)
@@ -2,14 +2,59 @@ import subprocess
 import sys
 import os
 import shutil
+import json
 import logging
 import platform
 import time
+import urllib.error
+import urllib.request
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+BACKEND_PORT = int(os.getenv('BACKEND_PORT', '5000'))
+# How long to wait for every model to load and warm up before giving up on the backend
+BACKEND_READY_TIMEOUT = float(os.getenv('BACKEND_READY_TIMEOUT', '120'))
+
+def wait_for_backend(process, timeout=BACKEND_READY_TIMEOUT, interval=0.5):
+    """
+    Polls the backend's /ready endpoint until every service reports ready.
+
+    Returns True when ready, False if a service failed to load or the timeout expired
+    (the per-service report is logged). Raises RuntimeError if the backend process exits.
+    """
+    url = f"http://127.0.0.1:{BACKEND_PORT}/ready"
+    deadline = time.monotonic() + timeout
+    report = None
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {process.returncode} during startup")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                report = json.load(response)
+            if report.get('status') == 'ready':
+                return True
+        except urllib.error.HTTPError as e:
+            # 503 while loading/warming; the body says which service is not ready yet
+            try:
+                report = json.load(e)
+            except ValueError:
+                report = None
+        except (urllib.error.URLError, OSError, ValueError):
+            pass    # not listening yet
+
+        services = (report or {}).get('services', {})
+        failed = {name: s.get('error') for name, s in services.items() if s.get('status') == 'failed'}
+        if failed:
+            # A failed service will not recover by waiting
+            logger.error(f"Backend started with failed services: {failed}")
+            return False
+        time.sleep(interval)
+
+    logger.error(f"Backend not ready after {timeout:.0f}s. Last report: {report}")
+    return False
+
 def main():
     logger.info("Starting MediSCope-V1 Orchestrator (Enterprise Edition)...")
     
@@ -24,22 +69,32 @@ def main():
     )
     processes.append(backend_process)
     
-    # Wait for backend to be somewhat ready (optional, but good practice)
-    time.sleep(2)
-    
-    # 2. Start Frontend
-    logger.info("Launching Frontend...")
-    # Using shell=True for npm/bun commands on Windows
-    web_process = subprocess.Popen(
-        ["bun", "run", "dev"], # Or "npm run dev"
-        cwd="web",
-        shell=True
-    )
-    processes.append(web_process)
-    
-    logger.info("Services started. Press Ctrl+C to stop.")
-    
+    # Everything after the backend launch sits in the try, so Ctrl+C while waiting for it
+    # to become ready (up to BACKEND_READY_TIMEOUT) still terminates it.
     try:
+        # Wait until every model is loaded and warmed up instead of guessing a delay
+        start = time.monotonic()
+        try:
+            if wait_for_backend(backend_process):
+                logger.info(f"Backend ready in {time.monotonic() - start:.1f}s.")
+            else:
+                logger.warning("Continuing with a degraded backend.")
+        except RuntimeError as e:
+            logger.error(str(e))
+            return
+
+        # 2. Start Frontend
+        logger.info("Launching Frontend...")
+        # Using shell=True for npm/bun commands on Windows
+        web_process = subprocess.Popen(
+            ["bun", "run", "dev"], # Or "npm run dev"
+            cwd="web",
+            shell=True
+        )
+        processes.append(web_process)
+
+        logger.info("Services started. Press Ctrl+C to stop.")
+
         while True:
             time.sleep(1)
             if backend_process.poll() is not None: